@@ -3,6 +3,8 @@ from django.contrib import admin
 from .models import (
     Inventory,
     Invoice,
+    InvoiceLine,
+    Job,
     Owner,
     Part,
     Report,
@@ -23,3 +25,5 @@ admin.site.register(TaskTemplate)
 admin.site.register(Part)
 admin.site.register(Inventory)
 admin.site.register(Invoice)
+admin.site.register(InvoiceLine)
+admin.site.register(Job)
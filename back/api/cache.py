@@ -0,0 +1,88 @@
+"""
+Whole-response caching for list endpoints whose data rarely changes.
+
+Entries live in the "responses" cache (settings.CACHES) under
+`<list>:<generation>:<hash of host and query string>`. A write to the models
+behind a list bumps its generation (signals in api/models.py), so all of its
+entries stop matching at once and simply expire; nothing has to find and
+delete them.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import transaction
+
+# The cached lists, by name
+CACHED_LISTS = ("inventory", "task-templates")
+
+
+def _cache():
+    return caches["responses"]
+
+
+def _increment(key, initial):
+    """Atomically add one to `key`, starting it at `initial` if it is missing."""
+    cache = _cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, timeout=None)
+        return cache.get(key, initial)
+
+
+def generation(name):
+    """
+    The current generation of list `name`.
+
+    A missing generation (never set, or evicted) starts from the clock, not
+    from 0, so it cannot fall back onto a generation used before.
+    """
+    cache = _cache()
+    value = cache.get(f"{name}:generation")
+    if value is None:
+        cache.add(f"{name}:generation", time.time_ns(), timeout=None)
+        value = cache.get(f"{name}:generation")
+    return value
+
+
+def lookup(name, request):
+    """
+    The cache key for this request to list `name`, and the cached response
+    data or None. Counts the hit or miss.
+    """
+    params = sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+    )
+    digest = hashlib.sha256(f"{request.get_host()}?{urlencode(params)}".encode()).hexdigest()
+    key = f"{name}:{generation(name)}:{digest[:32]}"
+    data = _cache().get(key)
+    _increment(f"{name}:{'hits' if data is not None else 'misses'}", 1)
+    return key, data
+
+
+def store(key, data):
+    _cache().set(key, data)
+
+
+def invalidate(name):
+    """
+    Stop serving the cached responses of list `name`.
+
+    Bumped now, so this request's own next read misses, and again once the
+    transaction commits: a response cached by another request from the old
+    rows in between is dropped too.
+    """
+    _increment(f"{name}:generation", time.time_ns())
+    transaction.on_commit(lambda: _increment(f"{name}:generation", time.time_ns()))
+
+
+def stats():
+    """Hits and misses per cached list, as counted by this cache backend."""
+    cache = _cache()
+    return {
+        name: {"hits": cache.get(f"{name}:hits", 0), "misses": cache.get(f"{name}:misses", 0)}
+        for name in CACHED_LISTS
+    }
@@ -0,0 +1,54 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db.models import Count
+from django.utils import timezone
+
+# What each counted object contributes to `DashboardCounter`, as
+# {(metric, key): amount}. Migration 0017 keeps its own copy of `tally`, so
+# these can change without altering what the migration computed.
+
+
+def period(moment):
+    """The revenue period (calendar month, local time) of `moment`: "2025-03"."""
+    return timezone.localtime(moment).strftime("%Y-%m")
+
+
+def report_counts(report):
+    return {("reports", report.status): 1}
+
+
+def invoice_counts(invoice):
+    month = period(invoice.issued_date)
+    return {("invoices", month): 1, ("revenue", month): Decimal(invoice.gross_total)}
+
+
+def task_counts(task):
+    if task.task_template_id is None:
+        return {}
+    return {("tasks", str(task.task_template_id)): 1}
+
+
+def changes(old, new):
+    """The counter deltas that turn `old` contributions into `new` ones, zeros dropped."""
+    deltas = Counter()
+    for counter, amount in old.items():
+        deltas[counter] -= amount
+    for counter, amount in new.items():
+        deltas[counter] += amount
+    return {counter: amount for counter, amount in deltas.items() if amount}
+
+
+def tally(reports, tasks, invoices):
+    """Every counter, recomputed from scratch over the three querysets."""
+    totals = Counter()
+    for row in reports.values("status").annotate(count=Count("id")):
+        totals["reports", row["status"]] += row["count"]
+    used = tasks.exclude(task_template=None).values("task_template_id")
+    for row in used.annotate(count=Count("id")):
+        totals["tasks", str(row["task_template_id"])] += row["count"]
+    # Months are local-time calendar months, bucketed here rather than in SQL
+    # so the result does not depend on the database's time zone tables.
+    for invoice in invoices.only("issued_date", "gross_total").iterator():
+        totals.update(invoice_counts(invoice))
+    return totals
@@ -9,3 +9,25 @@ class ConflictException(APIException):
         if detail is None:
             detail = "This data has been modified by someone else. Please refresh."
         super().__init__(detail)
+
+
+class TooManyRowsException(APIException):
+    status_code = 400
+    default_code = "too_many_rows"
+
+    def __init__(self, limit):
+        super().__init__(
+            f"This list has more than {limit} rows. "
+            "Request it in pages with limit/offset or cursor."
+        )
+
+
+class CursorExpiredException(APIException):
+    status_code = 410
+    default_code = "cursor_expired"
+
+    def __init__(self):
+        super().__init__(
+            "This cursor is older than the change feed keeps. "
+            "Reload the lists and start again without `since`."
+        )
@@ -1,17 +1,96 @@
+from math import ceil
+
 import django_filters
+from django.db.models import Count
 
-from .models import Owner
+from .models import Invoice, Owner, Vehicle
+from .search import compact, prefix_match, tokenize, trigrams
 
 
 class OwnerFilter(django_filters.FilterSet):
+    # Both run the same ranked search over names, e-mail and phone.
     full_name = django_filters.CharFilter(method="filter_full_name")
+    search = django_filters.CharFilter(method="filter_full_name")
 
     class Meta:
         model = Owner
         fields = ["email"]
 
     def filter_full_name(self, queryset, name, value):
-        # Custom filter logic to filter by full_name (concatenation of first_name + last_name)
-        return queryset.filter(first_name__icontains=value) | queryset.filter(
-            last_name__icontains=value
+        """
+        Ranked prefix search over the owner's name, e-mail and phone tokens.
+
+        Every word of the query must start one of the owner's search tokens
+        (`OwnerSearchToken`), so "ada love" finds Ada Lovelace. It is one
+        grouped query over the token index: the WHERE keeps only tokens that
+        match some word (`token LIKE 'ada%'` range scans), and the HAVING
+        requires every word to have matched. Exact word matches count twice
+        in `search_rank`; best matches come first unless the caller asked
+        for an explicit ordering.
+        """
+        terms = tokenize(value)
+        if not terms:
+            return queryset
+
+        where, having, rank = prefix_match("search_tokens__token", terms)
+        queryset = (
+            queryset.filter(where)
+            .annotate(**having, search_rank=rank)
+            .filter(**{name: 1 for name in having})
+        )
+        if queryset.query.order_by:
+            return queryset
+        return queryset.order_by("-search_rank", "full_name", "id")
+
+
+class VehicleFilter(django_filters.FilterSet):
+    # Plate lookups that ignore case and separators ("vd12 3" finds "VD 12 345").
+    license_plate__startswith = django_filters.CharFilter(method="filter_plate_prefix")
+    license_plate__fuzzy = django_filters.CharFilter(method="filter_plate_fuzzy")
+
+    # Share of the query's trigrams a plate must contain to be a fuzzy match
+    FUZZY_MATCH_RATIO = 0.5
+
+    class Meta:
+        model = Vehicle
+        fields = ["brand", "model", "year", "license_plate", "owner"]
+
+    def filter_plate_prefix(self, queryset, name, value):
+        # A range scan on the indexed plate_key: plate_key LIKE 'vd123%'
+        key = compact(value)
+        return queryset.filter(plate_key__startswith=key) if key else queryset
+
+    def filter_plate_fuzzy(self, queryset, name, value):
+        """
+        Plates sharing most of the query's trigrams, closest first.
+
+        Catches partial plates and typos ("12354" for "VD 12 345"). Only the
+        (trigram, vehicle) index is read to find candidates; unless the
+        caller asked for an ordering, results are sorted by shared trigrams.
+        """
+        key = compact(value)
+        if not key:
+            return queryset
+        grams = trigrams(key)
+        queryset = (
+            queryset.filter(plate_trigrams__trigram__in=grams)
+            .annotate(plate_similarity=Count("plate_trigrams"))
+            .filter(plate_similarity__gte=ceil(len(grams) * self.FUZZY_MATCH_RATIO))
         )
+        if queryset.query.order_by:
+            return queryset
+        return queryset.order_by("-plate_similarity", "plate_key", "id")
+
+
+class InvoiceFilter(django_filters.FilterSet):
+    # Range over the frozen, indexed gross_total column.
+    min_total = django_filters.NumberFilter(field_name="gross_total", lookup_expr="gte")
+    max_total = django_filters.NumberFilter(field_name="gross_total", lookup_expr="lte")
+
+    class Meta:
+        model = Invoice
+        fields = {
+            "invoice_number": ["exact"],
+            "pdf_status": ["exact"],
+            "report": ["exact", "in"],
+        }
@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from api.views import ReportViewSet
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Time a request's queries with a new, a kept and a pooled database connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=200, help="Timed runs per mode")
+
+    def handle(self, *args, **options):
+        if not hasattr(connection, "pool"):
+            raise CommandError("The default database does not use backend.db.mysql.")
+
+        runs = options["runs"]
+        settings_dict = connection.settings_dict
+        pool_size = settings_dict["POOL_SIZE"]
+        self.stdout.write(f"{runs} runs per mode of the first page of the report list.")
+        try:
+            # What every request paid before CONN_MAX_AGE: TCP and auth handshakes
+            settings_dict["POOL_SIZE"] = 0
+            opened = self.time(runs, close=True)
+            # A connection kept by the thread between requests
+            kept = self.time(runs, close=False)
+            # Closed after each request, but into the pool
+            settings_dict["POOL_SIZE"] = max(pool_size, 1)
+            pooled = self.time(runs, close=True)
+        finally:
+            connection.close()
+            settings_dict["POOL_SIZE"] = pool_size
+
+        self.stdout.write(f"{'mode':<8}{'median':>10}{'p95':>10}")
+        for label, samples in (("opened", opened), ("kept", kept), ("pooled", pooled)):
+            self.stdout.write(
+                f"{label:<8}{statistics.median(samples):>8.2f}ms{self.p95(samples):>8.2f}ms"
+            )
+        setup = statistics.median(opened) - statistics.median(kept)
+        self.stdout.write(
+            self.style.SUCCESS(f"Opening a connection adds {setup:.2f}ms to the median.")
+        )
+
+    def time(self, runs, close):
+        """Milliseconds per run of the report list's first page, connecting as `close` implies."""
+        queryset = ReportViewSet.queryset.order_by("-id")
+        list(queryset[:20])
+        samples = []
+        for _ in range(runs):
+            if close:
+                connection.close()
+            started = time.perf_counter()
+            list(queryset[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    @staticmethod
+    def p95(samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
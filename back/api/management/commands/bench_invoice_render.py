@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from api.models import Invoice
+from api.services import rendering
+from api.services.invoices import generate_invoice_pdf
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Time invoice PDF renders with cold and with warm render caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--invoice", type=int, help="Invoice id to render (default: the newest invoice)"
+        )
+        parser.add_argument("--runs", type=int, default=20, help="Timed renders per mode")
+
+    def handle(self, *args, **options):
+        queryset = Invoice.objects.select_related("report__vehicle__owner")
+        if options["invoice"]:
+            invoice = queryset.filter(pk=options["invoice"]).first()
+        else:
+            invoice = queryset.order_by("-id").first()
+        if invoice is None:
+            raise CommandError("No invoice to render; export a report first.")
+
+        runs = options["runs"]
+        self.stdout.write(f"Rendering {invoice.invoice_number} {runs} times per mode.")
+
+        # Cold reproduces the pre-cache behaviour: template, stylesheet, fonts
+        # and assets are all rebuilt for every invoice.
+        cold = [self.time_render(invoice, reset=True) for _ in range(runs)]
+
+        # Warm is what a long-lived worker process sees after its first job.
+        rendering.reset()
+        self.time_render(invoice, reset=False)
+        warm = [self.time_render(invoice, reset=False) for _ in range(runs)]
+
+        self.stdout.write(f"{'mode':<6}{'median':>10}{'mean':>10}{'p95':>10}")
+        for label, samples in (("cold", cold), ("warm", warm)):
+            self.stdout.write(
+                f"{label:<6}{statistics.median(samples):>8.1f}ms"
+                f"{statistics.fmean(samples):>8.1f}ms{self.p95(samples):>8.1f}ms"
+            )
+        speedup = statistics.median(cold) / statistics.median(warm)
+        self.stdout.write(self.style.SUCCESS(f"Warm renders are {speedup:.1f}x faster (median)."))
+
+    def time_render(self, invoice, reset):
+        if reset:
+            rendering.reset()
+        started = time.perf_counter()
+        rendering.render_pdf(generate_invoice_pdf(invoice))
+        return (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def p95(samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
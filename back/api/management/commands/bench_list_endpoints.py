@@ -0,0 +1,101 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from api.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+# The lists served by async views under SERVER_MODE=asgi
+ENDPOINTS = ["reports/", "inventory/", "invoices/"]
+
+
+class Command(BaseCommand):
+    help = "Load-test the report, inventory and invoice lists of running API servers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            action="append",
+            required=True,
+            help="API root of a running server, e.g. http://backend:8000/api (repeat to compare)",
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=0,
+            help="Extra clients that read the report list slowly throughout",
+        )
+        parser.add_argument("--email", help="User to mint a token for (default: a superuser)")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options["email"]:
+            user = users.filter(email=options["email"]).first()
+        else:
+            user = users.filter(is_superuser=True).order_by("id").first()
+        if user is None:
+            raise CommandError("No user to authenticate as; pass --email.")
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        self.stdout.write(
+            f"{options['requests']} requests per endpoint, {options['concurrency']} in flight, "
+            f"{options['slow_clients']} slow clients."
+        )
+        self.stdout.write(f"{'server':<32}{'endpoint':<12}{'req/s':>8}{'median':>10}{'p99':>10}")
+        for url in options["url"]:
+            stop = threading.Event()
+            slow = [
+                threading.Thread(target=self.read_slowly, args=(url, headers, stop), daemon=True)
+                for _ in range(options["slow_clients"])
+            ]
+            for thread in slow:
+                thread.start()
+            try:
+                for endpoint in ENDPOINTS:
+                    self.report(url, endpoint, *self.load(url + "/" + endpoint, headers, options))
+            finally:
+                stop.set()
+                for thread in slow:
+                    thread.join()
+
+    def load(self, url, headers, options):
+        """Latencies of `--requests` GETs of `url`, and the wall time they took."""
+        local = threading.local()
+
+        def fetch(_):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            started = time.perf_counter()
+            response = local.session.get(url, headers=headers, timeout=60)
+            response.raise_for_status()
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            samples = list(pool.map(fetch, range(options["requests"])))
+        return samples, time.perf_counter() - started
+
+    @staticmethod
+    def read_slowly(url, headers, stop):
+        """Read the report list a kilobyte at a time, ten times a second, until stopped."""
+        while not stop.is_set():
+            with requests.get(url + "/reports/", headers=headers, stream=True, timeout=60) as r:
+                for _ in r.iter_content(1024):
+                    if stop.wait(0.1):
+                        break
+
+    def report(self, url, endpoint, samples, elapsed):
+        self.stdout.write(
+            f"{url:<32}{endpoint:<12}{len(samples) / elapsed:>8.1f}"
+            f"{statistics.median(samples):>8.1f}ms{self.p99(samples):>8.1f}ms"
+        )
+
+    @staticmethod
+    def p99(samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, round(0.99 * (len(ordered) - 1)))]
@@ -0,0 +1,114 @@
+import random
+import statistics
+import time
+
+from api.filters import OwnerFilter
+from api.models import Owner, OwnerSearchToken
+from api.search import tokenize
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
+
+# Names are built from syllables so that, as in a real customer base, a
+# query's first word matches a small slice of the table, not a ninth of it.
+SYLLABLES = ["ad", "a", "lo", "ve", "la", "ce", "tu", "ring", "hop", "per", "mar", "ga"]
+SYLLABLES += ["ret", "ham", "il", "ton", "ken", "rit", "chie", "bar", "lis", "kov", "dijk", "stra"]
+QUERIES = ["ada", "ada love", "hop", "loce turi", "marga", "0791", "zz"]
+
+# Seeded owners are recognisable by this e-mail domain and removed afterwards.
+BENCH_DOMAIN = "bench.invalid"
+
+
+class Command(BaseCommand):
+    help = "Seed a large owners table and time owner search and full-name ordering on it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owners", type=int, default=100_000, help="Owners to seed")
+        parser.add_argument("--runs", type=int, default=50, help="Timed runs per query")
+        parser.add_argument(
+            "--keep", action="store_true", help="Leave the seeded owners in place afterwards"
+        )
+
+    def handle(self, *args, **options):
+        self.seed(options["owners"])
+        try:
+            self.stdout.write(f"{'query':<16}{'median':>10}{'p95':>10}{'hits':>8}")
+            for query in QUERIES:
+                self.report(query, *self.time_search(query, options["runs"]))
+
+            # Page 1 of ?ordering=full_name: the stored, indexed column against
+            # the CONCAT annotation it replaced, which sorts the whole table.
+            computed = Concat(F("first_name"), Value(" "), F("last_name"), output_field=CharField())
+            orderings = {
+                "sort: stored": Owner.objects.order_by("full_name", "id"),
+                "sort: concat": Owner.objects.annotate(_full_name=computed).order_by("_full_name"),
+            }
+            for label, queryset in orderings.items():
+                self.report(label, *self.time_page(queryset, options["runs"]))
+        finally:
+            if not options["keep"]:
+                Owner.objects.filter(email__endswith=f"@{BENCH_DOMAIN}").delete()
+
+    def report(self, label, samples, hits):
+        self.stdout.write(
+            f"{label:<16}{statistics.median(samples):>8.2f}ms{self.p95(samples):>8.2f}ms{hits:>8}"
+        )
+
+    def seed(self, count):
+        """Bulk-insert `count` owners and their tokens (bulk_create skips save and signals)."""
+        self.stdout.write(f"Seeding {count} owners...")
+        rng = random.Random(0)
+        start = Owner.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        for offset in range(0, count, 5000):
+            batch = [
+                Owner(
+                    first_name=self.name(rng, 2),
+                    last_name=self.name(rng, 3),
+                    email=f"owner{start + index}@{BENCH_DOMAIN}",
+                    phone=f"079 {rng.randint(100, 999)} {rng.randint(10, 99)} 00",
+                )
+                for index in range(offset, min(offset + 5000, count))
+            ]
+            for owner in batch:
+                owner.full_name = Owner.join_name(owner.first_name, owner.last_name)
+            with transaction.atomic():
+                Owner.objects.bulk_create(batch)
+                # Re-read the batch: MySQL does not return ids from bulk_create
+                fields = ("id", "first_name", "last_name", "email", "phone")
+                rows = Owner.objects.filter(email__in=[owner.email for owner in batch])
+                OwnerSearchToken.objects.bulk_create(
+                    [
+                        OwnerSearchToken(owner_id=pk, token=token)
+                        for pk, *values in rows.values_list(*fields)
+                        for token in tokenize(*values)
+                    ]
+                )
+
+    @staticmethod
+    def name(rng, syllables):
+        return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+    def time_search(self, query, runs):
+        samples = []
+        hits = 0
+        for _ in range(runs):
+            started = time.perf_counter()
+            # The first page of the list, as the front-end search box asks for it
+            hits = len(OwnerFilter({"search": query}, queryset=Owner.objects.all()).qs[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples, hits
+
+    def time_page(self, queryset, runs):
+        samples = []
+        hits = 0
+        for _ in range(runs):
+            started = time.perf_counter()
+            hits = len(queryset[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples, hits
+
+    @staticmethod
+    def p95(samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
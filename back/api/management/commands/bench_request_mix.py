@@ -0,0 +1,223 @@
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from api.models import Inventory, Owner, Part, Report, Task, TaskTemplate, User, Vehicle
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Seeded rows are recognisable by these markers and removed afterwards.
+SEED_DOMAIN = "loadtest.invalid"
+SEED_PREFIX = "LOADTEST-"
+
+# Requests in the mix that write
+WRITES = {"report update"}
+
+SEARCH_TERMS = ["audi", "mar", "oil", "filter", "079", "ke", "brake", "ga"]
+
+
+class Command(BaseCommand):
+    help = "Replay the front-end's request mix against a running API server and time it"
+
+    # (weight, name): what a workshop's browsers ask for, per screen they poll
+    # or open - the dashboard and report screens dominate, writes are rare.
+    MIX = [
+        (20, "report list"),
+        (10, "report detail"),
+        (15, "dashboard"),
+        (10, "inventory list"),
+        (8, "dashboard invoices"),
+        (8, "owner search"),
+        (6, "vehicle list"),
+        (5, "global search"),
+        (5, "task templates"),
+        (3, "report update"),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True, help="API root, e.g. http://backend:8000/api")
+        parser.add_argument("--duration", type=float, default=60, help="Seconds to run for")
+        parser.add_argument("--concurrency", type=int, default=20, help="Simulated clients")
+        parser.add_argument(
+            "--think", type=float, default=0, help="Milliseconds each client waits between requests"
+        )
+        parser.add_argument(
+            "--read-only", action="store_true", help="Leave the report updates out of the mix"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Reports (with owners and vehicles) to seed first"
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Leave the seeded rows in place afterwards"
+        )
+        parser.add_argument("--email", help="User to mint a token for (default: a superuser)")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options["email"]:
+            user = users.filter(email=options["email"]).first()
+        else:
+            user = users.filter(is_superuser=True).order_by("id").first()
+        if user is None:
+            raise CommandError("No user to authenticate as; pass --email.")
+
+        try:
+            if options["seed"]:
+                self.seed(options["seed"], user)
+            report_ids = list(Report.objects.values_list("id", flat=True)[:1000])
+            if not report_ids:
+                raise CommandError("No reports to request; seed some with --seed.")
+            mix = [
+                (w, name) for w, name in self.MIX if not (options["read_only"] and name in WRITES)
+            ]
+            results = self.run(options, mix, report_ids, f"Bearer {AccessToken.for_user(user)}")
+            self.report(results, options["duration"])
+        finally:
+            if options["seed"] and not options["keep"]:
+                Owner.objects.filter(email__endswith=f"@{SEED_DOMAIN}").delete()
+                Inventory.objects.filter(reference_code__startswith=SEED_PREFIX).delete()
+                TaskTemplate.objects.filter(name__startswith=SEED_PREFIX).delete()
+
+    def seed(self, count, user):
+        """Create `count` reports, two per vehicle and owner, each with two tasks and a part.
+
+        Rows are saved one by one, so search tokens, the change log and the
+        dashboard counters are kept as a real workload keeps them.
+        """
+        self.stdout.write(f"Seeding {count} reports...")
+        rng = random.Random(0)
+        item = Inventory.objects.create(
+            name="Load test part",
+            reference_code=f"{SEED_PREFIX}PART",
+            quantity_in_stock=count * 10,
+            unit_price=10,
+        )
+        templates = [
+            TaskTemplate.objects.create(name=f"{SEED_PREFIX}{name}", price=price)
+            for name, price in (("Oil change", 80), ("Brake check", 60), ("Inspection", 120))
+        ]
+        for start in range(0, count, 200):
+            with transaction.atomic():
+                for index in range(start, min(start + 200, count), 2):
+                    owner = Owner.objects.create(
+                        first_name=rng.choice(["Ada", "Alan", "Grace", "Margaret", "Ken"]),
+                        last_name=rng.choice(["Lovelace", "Turing", "Hopper", "Hamilton"]),
+                        email=f"owner{index}@{SEED_DOMAIN}",
+                        phone=f"079 {rng.randint(100, 999)} {rng.randint(10, 99)} 00",
+                    )
+                    vehicle = Vehicle.objects.create(
+                        owner=owner,
+                        brand=rng.choice(["Audi", "Fiat", "Toyota", "Volvo"]),
+                        model="Test",
+                        year=rng.randint(2000, 2024),
+                        license_plate=f"LT-{index}",
+                    )
+                    for _ in range(min(2, count - index)):
+                        report = Report.objects.create(
+                            vehicle=vehicle,
+                            user=user,
+                            status=rng.choice(["pending", "in_progress", "completed"]),
+                        )
+                        for template in rng.sample(templates, 2):
+                            Task.objects.create(report=report, task_template=template)
+                        Part.objects.create(report=report, part=item, quantity_used=1)
+
+    def run(self, options, mix, report_ids, authorization):
+        """Latencies and errors per request name, from every client requesting until time is up."""
+        weights, names = zip(*mix, strict=True)
+        deadline = time.monotonic() + options["duration"]
+        results = defaultdict(lambda: {"samples": [], "errors": 0})
+        lock = threading.Lock()
+
+        def client(number):
+            rng = random.Random(number)
+            session = requests.Session()
+            session.headers["Authorization"] = authorization
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    ok = self.request(session, options["url"], name, rng, report_ids)
+                except requests.RequestException:
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    results[name]["samples"].append(elapsed)
+                    results[name]["errors"] += not ok
+                if options["think"]:
+                    time.sleep(options["think"] / 1000)
+
+        threads = [
+            threading.Thread(target=client, args=(n,)) for n in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def request(session, url, name, rng, report_ids):
+        """Send one request of kind `name`; True if it succeeded."""
+
+        def get(path, **params):
+            return session.get(f"{url}/{path}", params=params, timeout=60)
+
+        if name == "report list":
+            response = get("reports/", ordering="-updated_at")
+        elif name == "report detail":
+            response = get(f"reports/{rng.choice(report_ids)}/")
+        elif name == "dashboard":
+            response = get("dashboard/summary/")
+        elif name == "inventory list":
+            response = get("inventory/", ordering="name")
+        elif name == "dashboard invoices":
+            response = get("invoices/", ordering="-issued_date", limit=5)
+        elif name == "owner search":
+            response = get("owners/", search=rng.choice(SEARCH_TERMS), limit=20)
+        elif name == "vehicle list":
+            response = get("vehicles/", limit=20, offset=rng.randrange(0, 200, 20))
+        elif name == "global search":
+            response = get("search/", q=rng.choice(SEARCH_TERMS))
+        elif name == "task templates":
+            response = get("task-templates/", ordering="name")
+        else:
+            # Read the report, then change its remarks with the concurrency check
+            detail = get(f"reports/{rng.choice(report_ids)}/")
+            if not detail.ok:
+                return False
+            report = detail.json()
+            response = session.patch(
+                f"{url}/reports/{report['id']}/",
+                json={"remarks": f"load test {rng.random()}", "updated_at": report["updated_at"]},
+                timeout=60,
+            )
+            # Another client updating the same report first is a 409, not a failure
+            return response.ok or response.status_code == 409
+        return response.ok
+
+    def report(self, results, duration):
+        total = sum(len(result["samples"]) for result in results.values())
+        errors = sum(result["errors"] for result in results.values())
+        self.stdout.write(f"{'request':<20}{'count':>8}{'errors':>8}{'median':>10}{'p99':>10}")
+        for name, result in sorted(results.items(), key=lambda item: -len(item[1]["samples"])):
+            samples = result["samples"]
+            self.stdout.write(
+                f"{name:<20}{len(samples):>8}{result['errors']:>8}"
+                f"{statistics.median(samples):>8.1f}ms{self.p99(samples):>8.1f}ms"
+            )
+        every = [sample for result in results.values() for sample in result["samples"]]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total / duration:.1f} requests/s, p99 {self.p99(every):.1f}ms, {errors} errors."
+            )
+        )
+
+    @staticmethod
+    def p99(samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, round(0.99 * (len(ordered) - 1)))]
@@ -0,0 +1,9 @@
+from api.services.changes import RETENTION, prune
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = f"Delete change feed entries older than {RETENTION.days} days"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Deleted {prune()} change feed entries.")
@@ -0,0 +1,10 @@
+from api.models import DashboardCounter
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard counters from the reports, tasks and invoices tables"
+
+    def handle(self, *args, **options):
+        DashboardCounter.rebuild()
+        self.stdout.write(f"Rebuilt {DashboardCounter.objects.count()} dashboard counters.")
@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from api.services import jobs
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus():
+    """CPUs this process may run on - a container's cpuset, not the host's count."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (invoice PDF renders)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the due jobs, then exit instead of polling"
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=available_cpus(),
+            help="Render processes to run jobs on (default: the CPU count). "
+            "1 runs every job in this process.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Job worker started with {options['processes']} process(es).")
+        if options["processes"] <= 1:
+            self.run_serial(options)
+        else:
+            self.run_pool(options)
+        self.stdout.write(self.style.SUCCESS("Job queue drained."))
+
+    def report(self, job, status):
+        self.stdout.write(f"Job {job.id} ({job.kind}) attempt {job.attempts}: {status}")
+
+    def idle(self, options):
+        # A long-lived process outlives CONN_MAX_AGE and MySQL's
+        # wait_timeout; drop stale connections between polls.
+        close_old_connections()
+        time.sleep(options["sleep"])
+
+    def run_serial(self, options):
+        while True:
+            claimed = jobs.claim()
+            if claimed:
+                self.report(claimed[0], jobs.run(claimed[0]))
+                continue
+
+            if options["once"]:
+                return
+            self.idle(options)
+
+    def run_pool(self, options):
+        """
+        Claim jobs here and run them on a pool of forked processes.
+
+        This process keeps the pool full: it claims as many jobs as there are
+        idle processes, and claims again whenever one finishes. Connections
+        are closed before every submit so a newly forked child never inherits
+        (and later shares) this process's MySQL socket.
+
+        A job whose process raised outside `jobs.run` or died is recorded as a
+        failed attempt here. A dead process breaks the whole pool, failing
+        every job on it, so the pool is then replaced with a new one.
+        """
+        size = options["processes"]
+        context = multiprocessing.get_context("fork")
+        running = {}
+        pool = ProcessPoolExecutor(max_workers=size, mp_context=context)
+        try:
+            while True:
+                if len(running) < size:
+                    claimed = jobs.claim(limit=size - len(running))
+                    connections.close_all()
+                    for job in claimed:
+                        running[pool.submit(jobs.run_by_id, job.pk)] = job
+
+                if not running:
+                    if options["once"]:
+                        return
+                    self.idle(options)
+                    continue
+
+                done, _ = wait(running, timeout=options["sleep"], return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    broken |= self.collect(running.pop(future), future)
+                if broken:
+                    for future in list(running):
+                        self.collect(running.pop(future), future)
+                    pool.shutdown()
+                    pool = ProcessPoolExecutor(max_workers=size, mp_context=context)
+        finally:
+            pool.shutdown()
+
+    def collect(self, job, future):
+        """Report a finished future's job. Returns True if the pool broke under it."""
+        try:
+            self.report(job, future.result())
+            return False
+        except Exception as exc:
+            logger.error("Job %s (%s) ended outside the job runner", job.id, job.kind, exc_info=exc)
+            status = jobs.abandon(job, "".join(traceback.format_exception(exc)))
+            self.report(job, status or "gone")
+            return isinstance(exc, BrokenProcessPool)
@@ -0,0 +1,27 @@
+from api.services.ledger import discrepancies, take_snapshot
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Snapshot every item's stock from the ledger, for fast point-in-time stock queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Also list items whose stock column disagrees with the ledger",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Snapshotted {take_snapshot()} items.")
+        if not options["check"]:
+            return
+
+        mismatched = 0
+        for item in discrepancies().order_by("name", "id"):
+            mismatched += 1
+            self.stdout.write(
+                f"{item.reference_code}: {item.quantity_in_stock:.2f} in stock, "
+                f"{item.stock_at:.2f} in the ledger"
+            )
+        self.stdout.write(f"{mismatched} items disagree with the ledger.")
@@ -0,0 +1,163 @@
+"""
+Per-request database middleware.
+
+`ConnectionMetricsMiddleware` tells, for each request that queried the
+database, whether it reused the connection its thread already had, took one
+from the pool or opened a new one, and how long getting it took. It says so
+in the response's `Server-Timing` header and counts it for this worker
+process (`/api/db/stats/`).
+
+`ReadYourWritesMiddleware` pins a user's reads to the primary for
+`settings.REPLICA_PIN_SECONDS` after each request of theirs that may have
+written, so lists that read from the replica (`ReplicaReadMixin`) do not
+show them data from before their own write.
+"""
+
+import os
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# This process's counts since it started
+_stats = {"requests": 0, "reused": 0, "pooled": 0, "opened": 0, "connect_ms": 0.0}
+_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    connection.connects = getattr(connection, "connects", 0) + 1
+
+
+class _QueryCounter:
+    """
+    Counts the queries run on this thread's connection from `start()` to
+    `stop()`, and notes whether the connection was (re)opened meanwhile.
+    """
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def start(self):
+        self.connects = getattr(connection, "connects", 0)
+        connection.execute_wrappers.append(self)
+
+    def stop(self):
+        connection.execute_wrappers.remove(self)
+        if getattr(connection, "connects", 0) == self.connects:
+            self.how, self.duration = "reused", 0.0
+        else:
+            # Backends other than backend.db.mysql do not time their connects
+            self.how, self.duration = getattr(connection, "last_connect", None) or ("opened", 0.0)
+
+
+class ConnectionMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = _QueryCounter()
+        counter.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            counter.stop()
+        return self.report(counter, response)
+
+    async def __acall__(self, request):
+        # Under ASGI the request's queries run on its sync thread (every
+        # thread-sensitive sync_to_async of a request shares one), so that is
+        # the connection to watch, not the event loop's.
+        counter = _QueryCounter()
+        await sync_to_async(counter.start)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counter.stop)()
+        return self.report(counter, response)
+
+    def report(self, counter, response):
+        if not counter.queries:
+            return response
+        with _lock:
+            _stats["requests"] += 1
+            _stats[counter.how] += 1
+            _stats["connect_ms"] += counter.duration
+        response["Server-Timing"] = f'db-connect;dur={counter.duration:.1f};desc="{counter.how}"'
+        return response
+
+
+def stats():
+    """This worker process's counts, and the connection settings they were made under."""
+    database = settings.DATABASES["default"]
+    with _lock:
+        counts = dict(_stats)
+    counts["connect_ms"] = round(counts["connect_ms"], 1)
+    return {
+        "pid": os.getpid(),
+        "conn_max_age": database.get("CONN_MAX_AGE", 0),
+        "health_checks": database.get("CONN_HEALTH_CHECKS", False),
+        "pool_size": database.get("POOL_SIZE", 0),
+        **counts,
+    }
+
+
+class ReadYourWritesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.pins(request):
+            pin_reads(request.user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.pins(request):
+            await sync_to_async(pin_reads)(request.user)
+        return response
+
+    @staticmethod
+    def pins(request):
+        """Whether `request` may have written, as an authenticated user."""
+        # DRF sets the user it authenticated on the underlying request too.
+        # Failed requests pin as well: a 4xx or 5xx can follow a partial write.
+        user = getattr(request, "user", None)
+        return bool(
+            settings.REPLICA_DATABASE
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and user is not None
+            and user.is_authenticated
+        )
+
+
+def pin_reads(user):
+    caches["responses"].set(f"replica-pin:{user.pk}", True, settings.REPLICA_PIN_SECONDS)
+
+
+def reads_pinned(user):
+    """Whether `user` wrote recently enough that their reads must see the primary."""
+    return user.is_authenticated and caches["responses"].get(f"replica-pin:{user.pk}", False)
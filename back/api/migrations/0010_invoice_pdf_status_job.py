@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_invoices(apps, schema_editor):
+    # Invoices created before the job queue were rendered inline: they either
+    # have their PDF or the render crashed and nothing will retry it.
+    Invoice = apps.get_model('api', 'Invoice')
+    Invoice.objects.exclude(pdf='').exclude(pdf__isnull=True).update(pdf_status='ready')
+    Invoice.objects.filter(pdf_status='pending_pdf').update(pdf_status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_remove_invoice_total_cost_alter_invoice_report'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='pdf_status',
+            field=models.CharField(choices=[('pending_pdf', 'PDF pending'), ('ready', 'PDF ready'), ('failed', 'PDF failed')], default='pending_pdf', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_invoices, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='api_job_status_84fd39_idx')],
+            },
+        ),
+    ]
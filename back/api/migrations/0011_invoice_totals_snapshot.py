@@ -0,0 +1,87 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:57
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+VAT_RATE = Decimal('0.2')
+CENT = Decimal('0.01')
+
+
+def freeze_existing_invoices(apps, schema_editor):
+    # Invoices issued before this migration never had a snapshot. The best
+    # available one is today's prices, which is what total_cost showed anyway.
+    # Copied rather than imported: Invoice.build_lines() is not available on
+    # historical models.
+    Invoice = apps.get_model('api', 'Invoice')
+    InvoiceLine = apps.get_model('api', 'InvoiceLine')
+    Task = apps.get_model('api', 'Task')
+    Part = apps.get_model('api', 'Part')
+
+    for invoice in Invoice.objects.all().iterator():
+        priced = []
+        tasks = Task.objects.filter(report_id=invoice.report_id, task_template__isnull=False)
+        for task in tasks.select_related('task_template').order_by('id'):
+            priced.append(('task', task.task_template.name, task.task_template.price, Decimal(1)))
+        for part in Part.objects.filter(report_id=invoice.report_id).select_related('part').order_by('id'):
+            priced.append(('part', part.part.name, part.part.unit_price, part.quantity_used))
+
+        lines = []
+        for position, (kind, name, unit_price, quantity) in enumerate(priced):
+            net = (unit_price * quantity).quantize(CENT)
+            vat = (net * VAT_RATE).quantize(CENT)
+            lines.append(InvoiceLine(
+                invoice=invoice, position=position, kind=kind, name=name,
+                unit_price=unit_price, quantity=quantity, net=net, vat=vat, gross=net + vat,
+            ))
+        InvoiceLine.objects.bulk_create(lines)
+
+        invoice.net_total = sum((line.net for line in lines), Decimal('0.00'))
+        invoice.vat_total = (invoice.net_total * VAT_RATE).quantize(CENT)
+        invoice.gross_total = invoice.net_total + invoice.vat_total
+        invoice.save(update_fields=['net_total', 'vat_total', 'gross_total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_invoice_pdf_status_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='gross_total',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='net_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='vat_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='InvoiceLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('kind', models.CharField(choices=[('task', 'Task'), ('part', 'Part')], max_length=10)),
+                ('name', models.CharField(max_length=255)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('net', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('vat', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('gross', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='api.invoice')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.RunPython(freeze_existing_invoices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_invoice_totals_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['name', 'id'], name='api_invento_name_bffc50_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['issued_date', 'id'], name='api_invoice_issued__f321a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['brand', 'model', 'id'], name='api_vehicle_brand_09ab1c_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:14
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# api.search's tokenizer as it was when this migration was written, copied
+# rather than imported so that replaying the migration builds the same
+# tokens whatever later becomes of api.search. Never edit it.
+MAX_TOKEN_LENGTH = 64
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(value):
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(*values):
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        text = normalize(value)
+        words = WORD.findall(text)
+        if len(words) > 1 and re.fullmatch(r"[\d\s()./+-]+", text):
+            words.append("".join(words))
+        tokens += [word[:MAX_TOKEN_LENGTH] for word in words]
+    return list(dict.fromkeys(tokens))
+
+
+def index_existing_owners(apps, schema_editor):
+    # Owner.post_save keeps the tokens current from now on; this builds them
+    # once for owners that already exist.
+    Owner = apps.get_model("api", "Owner")
+    OwnerSearchToken = apps.get_model("api", "OwnerSearchToken")
+    batch = []
+    for owner in Owner.objects.only("first_name", "last_name", "email", "phone").iterator(
+        chunk_size=2000
+    ):
+        batch += [
+            OwnerSearchToken(owner_id=owner.pk, token=token)
+            for token in tokenize(owner.first_name, owner.last_name, owner.email, owner.phone)
+        ]
+        if len(batch) >= 5000:
+            OwnerSearchToken.objects.bulk_create(batch)
+            batch = []
+    OwnerSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='api.owner')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'owner'], name='api_ownerse_token_16324a_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_owners, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:19
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Trim
+
+
+def fill_full_names(apps, schema_editor):
+    # One UPDATE; Owner.save() keeps the column current from here on.
+    Owner = apps.get_model("api", "Owner")
+    Owner.objects.update(
+        full_name=Trim(Concat(Trim(F("first_name")), Value(" "), Trim(F("last_name"))))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_owner_search_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='owner',
+            name='full_name',
+            field=models.CharField(default='', editable=False, max_length=201),
+        ),
+        migrations.RunPython(fill_full_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='owner',
+            index=models.Index(fields=['full_name', 'id'], name='api_owner_full_na_fa212a_idx'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:23
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# api.search's tokenizers and document builders as they were when this
+# migration was written, copied rather than imported so that replaying the
+# migration builds the same index whatever later becomes of api.search.
+# Never edit them.
+MAX_TOKEN_LENGTH = 64
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(value):
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(*values):
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        text = normalize(value)
+        words = WORD.findall(text)
+        if len(words) > 1 and re.fullmatch(r"[\d\s()./+-]+", text):
+            words.append("".join(words))
+        tokens += [word[:MAX_TOKEN_LENGTH] for word in words]
+    return list(dict.fromkeys(tokens))
+
+
+def code_tokens(*values):
+    tokens = tokenize(*values)
+    for value in values:
+        joined = "".join(WORD.findall(normalize(value or "")))
+        if joined:
+            tokens.append(joined[:MAX_TOKEN_LENGTH])
+    return list(dict.fromkeys(tokens))
+
+
+def owner_document(owner):
+    label = " ".join(filter(None, [owner.first_name, owner.last_name]))
+    return label, tokenize(owner.first_name, owner.last_name, owner.email, owner.phone)
+
+
+def vehicle_document(vehicle):
+    label = f"{vehicle.license_plate} - {vehicle.brand} {vehicle.model}"
+    return label, code_tokens(vehicle.license_plate) + tokenize(vehicle.brand, vehicle.model)
+
+
+def invoice_document(invoice):
+    return invoice.invoice_number, code_tokens(invoice.invoice_number)
+
+
+def inventory_document(item):
+    label = f"{item.name} ({item.reference_code})"
+    return label, code_tokens(item.reference_code) + tokenize(item.name)
+
+
+DOCUMENTS = {
+    "owner": (("first_name", "last_name", "email", "phone"), owner_document),
+    "vehicle": (("license_plate", "brand", "model"), vehicle_document),
+    "invoice": (("invoice_number",), invoice_document),
+    "inventory": (("reference_code", "name"), inventory_document),
+}
+
+MODELS = {"owner": "Owner", "vehicle": "Vehicle", "invoice": "Invoice", "inventory": "Inventory"}
+
+
+def index_existing_objects(apps, schema_editor):
+    # Signals keep the index current from now on; this builds it once for
+    # what already exists.
+    SearchIndexEntry = apps.get_model("api", "SearchIndexEntry")
+    for kind, model_name in MODELS.items():
+        fields, build = DOCUMENTS[kind]
+        batch = []
+        model = apps.get_model("api", model_name)
+        for instance in model.objects.only(*fields).iterator(chunk_size=2000):
+            label, tokens = build(instance)
+            batch += [
+                SearchIndexEntry(kind=kind, object_id=instance.pk, label=label[:255], token=token)
+                for token in dict.fromkeys(tokens)
+            ]
+            if len(batch) >= 5000:
+                SearchIndexEntry.objects.bulk_create(batch)
+                batch = []
+        SearchIndexEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_owner_full_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('owner', 'Owner'), ('vehicle', 'Vehicle'), ('invoice', 'Invoice'), ('inventory', 'Inventory')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('token', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'kind'], name='api_searchi_token_1f0179_idx'), models.Index(fields=['kind', 'object_id'], name='api_searchi_kind_1af169_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_objects, migrations.RunPython.noop),
+    ]
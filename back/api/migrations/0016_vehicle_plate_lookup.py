@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:26
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# api.search's plate keys and trigrams as they were when this migration was
+# written, copied rather than imported so that replaying the migration builds
+# the same lookups whatever later becomes of api.search. Never edit them.
+MAX_TOKEN_LENGTH = 64
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(value):
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def compact(value):
+    return "".join(WORD.findall(normalize(value or "")))[:MAX_TOKEN_LENGTH]
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return list(dict.fromkeys(padded[index : index + 3] for index in range(len(padded) - 2)))
+
+
+def index_existing_plates(apps, schema_editor):
+    # Vehicle.save() and its post_save signal take over from here.
+    Vehicle = apps.get_model("api", "Vehicle")
+    VehiclePlateTrigram = apps.get_model("api", "VehiclePlateTrigram")
+    vehicles = list(Vehicle.objects.only("license_plate"))
+    for vehicle in vehicles:
+        vehicle.plate_key = compact(vehicle.license_plate)
+    Vehicle.objects.bulk_update(vehicles, ["plate_key"], batch_size=1000)
+    VehiclePlateTrigram.objects.bulk_create(
+        [
+            VehiclePlateTrigram(vehicle_id=vehicle.pk, trigram=trigram)
+            for vehicle in vehicles
+            for trigram in trigrams(vehicle.plate_key)
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_global_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='plate_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='VehiclePlateTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plate_trigrams', to='api.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'vehicle'], name='api_vehicle_trigram_4a8ff4_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_plates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:31
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+# api.dashboard's tally as it was when this migration was written, copied
+# rather than imported so that replaying the migration computes the same
+# counters whatever later becomes of api.dashboard. Never edit it.
+def tally(reports, tasks, invoices):
+    totals = Counter()
+    for row in reports.values("status").annotate(count=Count("id")):
+        totals["reports", row["status"]] += row["count"]
+    used = tasks.exclude(task_template=None).values("task_template_id")
+    for row in used.annotate(count=Count("id")):
+        totals["tasks", str(row["task_template_id"])] += row["count"]
+    for invoice in invoices.only("issued_date", "gross_total").iterator():
+        month = timezone.localtime(invoice.issued_date).strftime("%Y-%m")
+        totals["invoices", month] += 1
+        totals["revenue", month] += Decimal(invoice.gross_total)
+    return totals
+
+
+def count_existing_objects(apps, schema_editor):
+    # Signals keep the counters current from now on; this computes them once
+    # for what already exists.
+    DashboardCounter = apps.get_model("api", "DashboardCounter")
+    totals = tally(
+        apps.get_model("api", "Report").objects.all(),
+        apps.get_model("api", "Task").objects.all(),
+        apps.get_model("api", "Invoice").objects.all(),
+    )
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(metric=metric, key=key, value=value) for (metric, key), value in totals.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_vehicle_plate_lookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('reports', 'Reports per status'), ('invoices', 'Invoices per month'), ('revenue', 'Gross revenue per month'), ('tasks', 'Tasks per task template')], max_length=20)),
+                ('key', models.CharField(max_length=50)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['quantity_in_stock', 'id'], name='api_invento_quantit_2ec4f3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardcounter',
+            constraint=models.UniqueConstraint(fields=('metric', 'key'), name='unique_dashboard_counter'),
+        ),
+        migrations.RunPython(count_existing_objects, migrations.RunPython.noop),
+    ]
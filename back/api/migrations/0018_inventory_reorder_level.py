@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:37
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def flag_low_stock(apps, schema_editor):
+    # Every reorder level starts at 0, so this flags what is out of stock
+    Inventory = apps.get_model("api", "Inventory")
+    Inventory.objects.update(
+        low_stock=Case(
+            When(quantity_in_stock__lte=F("reorder_level"), then=Value(True)),
+            default=Value(False),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inventory',
+            name='api_invento_quantit_2ec4f3_idx',
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='low_stock',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='reorder_level',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['low_stock', 'quantity_in_stock', 'id'], name='api_invento_low_sto_9dc2a8_idx'),
+        ),
+        migrations.RunPython(flag_low_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    # The ledger starts here: each item's current stock is its opening movement
+    Inventory = apps.get_model("api", "Inventory")
+    StockMovement = apps.get_model("api", "StockMovement")
+    now = django.utils.timezone.now()
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(inventory_id=pk, change=quantity, reason="initial", created_at=now)
+            for pk, quantity in Inventory.objects.exclude(quantity_in_stock=0)
+            .values_list("pk", "quantity_in_stock")
+            .iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_inventory_reorder_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reason', models.CharField(choices=[('initial', 'Initial stock'), ('used', 'Used in a report'), ('returned', 'Returned from a report'), ('adjustment', 'Manual adjustment')], max_length=20)),
+                ('report_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='api.inventory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inventory', 'created_at'], name='api_stockmo_invento_d07951_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='api.inventory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inventory', 'taken_at'], name='api_stocksn_invento_645525_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('owner', 'Owner'), ('vehicle', 'Vehicle'), ('report', 'Report'), ('inventory', 'Inventory'), ('task_template', 'Task template'), ('invoice', 'Invoice')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='api_changel_created_697be7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:47
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_existing_vehicles(apps, schema_editor):
+    """Copy each existing report's vehicle brand and model onto it."""
+    Report = apps.get_model('api', 'Report')
+    Vehicle = apps.get_model('api', 'Vehicle')
+    vehicle = Vehicle.objects.filter(pk=OuterRef('vehicle_id'))
+    Report.objects.update(
+        vehicle_brand=Subquery(vehicle.values('brand')[:1]),
+        vehicle_model=Subquery(vehicle.values('model')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_change_log'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vehicle',
+            name='api_vehicle_brand_09ab1c_idx',
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='vehicle_brand',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='vehicle_model',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(copy_existing_vehicles, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['vehicle_brand', 'vehicle_model', 'id'], name='api_report_vehicle_40d1c2_idx'),
+        ),
+    ]
@@ -1,6 +1,21 @@
+import hashlib
+from functools import update_wrapper
+from itertools import chain, islice
+
+from asgiref.sync import sync_to_async
+from backend.db.router import read_alias, reading_from
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from .pagination import CustomPagination
+from . import cache as response_cache
+from .exceptions import TooManyRowsException
+from .middleware import reads_pinned
+from .pagination import CustomPagination, KeysetPagination
+from .renderers import astream_json_array, stream_json_array
 
 
 class OptionalPaginationMixin:
@@ -10,14 +25,58 @@ class OptionalPaginationMixin:
     copy of this, identical apart from the default ordering. Set
     `default_ordering` to the ordering applied when the caller supplies none.
 
+    `?cursor=` switches to keyset pages (`KeysetPagination`) over the same
+    ordering, for callers that page deep into a large table.
+
+    The bare array is capped at `settings.LIST_MAX_ROWS` rows, and anything
+    longer than `settings.LIST_STREAM_CHUNK_SIZE` is streamed in chunks read
+    with `.iterator()` rather than built as one list in memory.
+
     The originals assigned `self.pagination_class` before paginating. That was a
     per-request side effect on the view instance and is not reproduced; the
     paginator is constructed directly instead.
     """
 
     default_ordering = "id"
+    # Ordering fields sorted on another column, e.g. a copy on the model's
+    # own table that an index covers: {"vehicle__brand": "vehicle_brand"}
+    ordering_columns = {}
 
     def list(self, request, *args, **kwargs):
+        queryset = self.ordered_queryset(request)
+        if self.is_paged(request):
+            return self.list_page(request, queryset)
+        return self.list_all(queryset)
+
+    async def alist(self, request, *args, **kwargs):
+        """`list` for `AsyncListMixin`: the bare array is read with the async ORM.
+
+        Pages are served by the sync code. A list long enough to stream is
+        streamed from an async iterator, each later chunk read and serialized
+        on the sync thread as the client takes it; a sync iterator would have
+        Django collect the whole body before sending any of it.
+        """
+        queryset = await sync_to_async(self.ordered_queryset)(request)
+        if self.is_paged(request):
+            return await sync_to_async(self.list_page)(request, queryset)
+
+        chunk_size = settings.LIST_STREAM_CHUNK_SIZE
+        max_rows = settings.LIST_MAX_ROWS
+        head = [row async for row in queryset[: chunk_size + 1]]
+        if len(head) <= chunk_size:
+            if len(head) > max_rows:
+                raise TooManyRowsException(max_rows)
+            return Response(self.get_serializer(head, many=True).data)
+
+        if await queryset[max_rows : max_rows + 1].aexists():
+            raise TooManyRowsException(max_rows)
+        chunks = self.serialized_chunks(queryset, head)
+        return StreamingHttpResponse(
+            astream_json_array(aiter_on_sync_thread(chunks)), content_type="application/json"
+        )
+
+    def ordered_queryset(self, request):
+        """The filtered list, in the requested ordering or `default_ordering`."""
         # `.get(key, default)` only substitutes `default_ordering` when the
         # key is absent - a present-but-blank `ordering=` reaches here as
         # `''` and would otherwise become `order_by('')`, which raises
@@ -30,11 +89,302 @@ class OptionalPaginationMixin:
         fields = [field.strip() for field in raw.split(",") if field.strip()]
         if not fields:
             fields = self.default_ordering.split(",")
-        queryset = self.filter_queryset(self.get_queryset()).order_by(*fields)
+        columns = [
+            ("-" if field.startswith("-") else "")
+            + self.ordering_columns.get(field.lstrip("-"), field.lstrip("-"))
+            for field in fields
+        ]
+        return self.filter_queryset(self.get_queryset()).order_by(*columns)
+
+    @staticmethod
+    def is_paged(request):
+        params = request.query_params
+        return (
+            KeysetPagination.cursor_query_param in params
+            or bool(params.get("limit"))
+            or bool(params.get("offset"))
+        )
 
-        if request.query_params.get("limit") or request.query_params.get("offset"):
+    def list_page(self, request, queryset):
+        """One keyset page for `?cursor=`, else one limit/offset page."""
+        if KeysetPagination.cursor_query_param in request.query_params:
+            paginator = KeysetPagination()
+        else:
             paginator = CustomPagination()
-            page = paginator.paginate_queryset(queryset, request)
-            return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def list_all(self, queryset):
+        """Return every row: as a plain response if it fits in one chunk, else streamed."""
+        chunk_size = settings.LIST_STREAM_CHUNK_SIZE
+        max_rows = settings.LIST_MAX_ROWS
+
+        head = list(queryset[: chunk_size + 1])
+        if len(head) <= chunk_size:
+            if len(head) > max_rows:
+                raise TooManyRowsException(max_rows)
+            return Response(self.get_serializer(head, many=True).data)
+
+        if queryset[max_rows : max_rows + 1].exists():
+            raise TooManyRowsException(max_rows)
+        chunks = self.serialized_chunks(queryset, head)
+        return StreamingHttpResponse(stream_json_array(chunks), content_type="application/json")
+
+    def serialized_chunks(self, queryset, head):
+        """The serialized rows of `queryset` up to `LIST_MAX_ROWS`, a chunk at a time.
+
+        The first chunk is `head`, already in hand; the rest is read lazily,
+        one chunk (and its prefetches) at a time, while the response streams.
+        """
+        chunk_size = settings.LIST_STREAM_CHUNK_SIZE
+        rest = queryset[chunk_size : settings.LIST_MAX_ROWS].iterator(chunk_size=chunk_size)
+        chunks = chain([head[:chunk_size]], iter(lambda: list(islice(rest, chunk_size)), []))
+        return (self.get_serializer(chunk, many=True).data for chunk in chunks)
+
+
+async def aiter_on_sync_thread(items):
+    """The sync iterator `items` as an async one, each item produced by `sync_to_async`."""
+    items = iter(items)
+    next_item = sync_to_async(next)
+    done = object()
+    while (item := await next_item(items, done)) is not done:
+        yield item
+
+
+class CachedListMixin:
+    """List responses served from the response cache (`api/cache.py`).
+
+    Set `cache_name` to one of `api.cache.CACHED_LISTS`; signals on the models
+    behind that list invalidate it. Requests differing in host or query
+    string get separate entries, and streamed lists are never cached. Every
+    list response carries `X-Cache: HIT` or `MISS`. Users whose reads are
+    pinned to the primary (`ReplicaReadMixin`) always miss. Lists read from
+    the replica are never stored: one read before the replica caught up
+    with a write would be served for the whole timeout after that write's
+    invalidation.
+    """
+
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        key, data = response_cache.lookup(self.cache_name, request)
+        if data is not None and not getattr(self, "pinned_to_primary", False):
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = super().list(request, *args, **kwargs)
+        if self.storable(response):
+            response_cache.store(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        key, data = await sync_to_async(response_cache.lookup)(self.cache_name, request)
+        if data is not None and not getattr(self, "pinned_to_primary", False):
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = await super().alist(request, *args, **kwargs)
+        if self.storable(response):
+            await sync_to_async(response_cache.store)(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    @staticmethod
+    def storable(response):
+        return (
+            isinstance(response, Response) and response.status_code == 200 and read_alias() is None
+        )
+
+
+class ConditionalGetMixin:
+    """List and detail responses that answer `If-None-Match` with a 304.
+
+    The ETag is derived from `updated_at` instead of the serialized body, so a
+    poll that finds nothing changed costs one small query and no
+    serialization: `MAX(updated_at)` and `COUNT(*)` over the filtered list
+    (a delete lowers the count, any other write raises the maximum), or the
+    row's own `updated_at` for a detail. The URL and renderer are hashed in
+    too, since ordering, paging and format change the body but not the rows.
+
+    Only for models whose every write bumps `updated_at` (the stock UPDATEs
+    set it by hand), and whose representation comes from their own row or
+    rows that bump it. Object permissions are not checked before a 304.
+
+    Keyset pages (`?cursor=`) are served unconditionally: they are read once
+    while scrolling rather than polled, and counting the whole list would
+    cost what the cursor saves.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        state = queryset.aggregate(**self.list_aggregates())
+        return self.respond_conditionally(
+            request, (state["last_update"], state["count"]), super().list, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        state = await queryset.order_by().aaggregate(**self.list_aggregates())
+        etag = self.etag(request, (state["last_update"], state["count"]))
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated_at = get_object_or_404(
+            self.filter_queryset(self.get_queryset()).values_list("updated_at", flat=True),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        return self.respond_conditionally(request, (updated_at,), super().retrieve, *args, **kwargs)
+
+    def respond_conditionally(self, request, state, view, *args, **kwargs):
+        """A 304 if the client's ETag matches `state`, else `view`'s response with the ETag."""
+        etag = self.etag(request, state)
+        response = get_conditional_response(request, etag=etag) or view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+        return response
+
+    @staticmethod
+    def list_aggregates():
+        """The aggregates over the filtered list that its ETag is derived from."""
+        return {"last_update": Max("updated_at"), "count": Count("pk")}
+
+    @staticmethod
+    def etag(request, state):
+        parts = (request.get_host(), request.get_full_path(), request.accepted_renderer.format)
+        digest = hashlib.sha256(repr(parts + state).encode()).hexdigest()
+        return f'W/"{digest[:32]}"'
+
+
+class ReplicaReadMixin:
+    """List GETs that read from the read replica (`settings.REPLICA_DATABASE`).
+
+    The whole list - the ETag aggregate, the cache lookup's miss, the rows,
+    their prefetches and, when streamed, every later chunk - reads from the
+    replica through `backend.db.router`. A user who wrote within
+    `settings.REPLICA_PIN_SECONDS` (`ReadYourWritesMiddleware`) reads from
+    the primary instead, and skips the response cache, whose entry may have
+    been filled from the replica before their write reached it. Responses
+    say which in `X-Read-From`, once a replica is configured.
+
+    Goes before the other list mixins, so that it wraps them.
+    """
+
+    pinned_to_primary = False
+
+    def list(self, request, *args, **kwargs):
+        alias = self.read_alias(reads_pinned(request.user))
+        with reading_from(alias):
+            response = super().list(request, *args, **kwargs)
+        return self.read_from(response, alias)
+
+    async def alist(self, request, *args, **kwargs):
+        alias = self.read_alias(await sync_to_async(reads_pinned)(request.user))
+        with reading_from(alias):
+            response = await super().alist(request, *args, **kwargs)
+        return self.read_from(response, alias)
+
+    def read_alias(self, pinned):
+        """The replica's alias, or None if there is none or the user's reads are pinned."""
+        self.pinned_to_primary = pinned
+        return None if pinned else settings.REPLICA_DATABASE
+
+    @staticmethod
+    def read_from(response, alias):
+        if isinstance(response, StreamingHttpResponse):
+            # The chunks after the first are read while the response streams.
+            # An async iterator stays async, so the ASGI server streams it.
+            read = aread_chunks_from if response.is_async else read_chunks_from
+            response.streaming_content = read(alias, response.streaming_content)
+        if settings.REPLICA_DATABASE:
+            response["X-Read-From"] = "replica" if alias else "primary"
+        return response
+
+
+def read_chunks_from(alias, chunks):
+    """`chunks`, each one produced while reading from `alias`."""
+    chunks = iter(chunks)
+    while True:
+        with reading_from(alias):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+async def aread_chunks_from(alias, chunks):
+    """`read_chunks_from` for an async iterator of chunks."""
+    chunks = aiter(chunks)
+    while True:
+        with reading_from(alias):
+            chunk = await anext(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class AsyncListMixin:
+    """GET on the list route served by an async view, for the ASGI server.
+
+    Under ASGI, Django runs every sync view on the one thread each worker
+    keeps for sync code, so a sync list holds that thread while it queries,
+    serializes and renders. The async view only hands it the parts that
+    touch the database - authentication, filter validation, the queries
+    themselves (through the async ORM) and the response cache - and
+    serializes on the event loop, so one request's serialization overlaps
+    another's queries. Everything else, and every other route and method,
+    is the ordinary sync view.
+
+    The list itself is `alist`, which the list mixins implement alongside
+    `list` (`OptionalPaginationMixin` at least is required). Only active
+    when `settings.ASYNC_LIST_VIEWS` is set when the URLs are loaded: under
+    WSGI an async view costs an event loop per request and gains nothing.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_LIST_VIEWS or actions.get("get") != "list":
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            if request.method != "GET":
+                return await sync_to_async(view)(request, *args, **kwargs)
+
+            # As ViewSetMixin.as_view's view() sets up the instance
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            return await self.adispatch(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`dispatch`, awaiting `alist` instead of calling the handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await self.alist(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
 
-        return Response(self.get_serializer(queryset, many=True).data)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,9 +1,52 @@
+from decimal import Decimal
+
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
-from django.db.models.signals import post_save
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal
 from django.utils import timezone
 
+from . import cache as response_cache
+from .dashboard import changes, invoice_counts, report_counts, tally, task_counts
+from .search import DOCUMENTS, MAX_TOKEN_LENGTH, compact, prefix_match, tokenize, trigrams
+
+# Flat VAT rate applied to every invoice line and to the invoice totals.
+VAT_RATE = Decimal("0.2")
+# Invoice amounts are stored and printed to the cent.
+CENT = Decimal("0.01")
+
+
+class DashboardCounted:
+    """
+    Mixin for models that feed the dashboard counters (`DashboardCounter`).
+
+    Subclasses define `dashboard_counts()`, what an instance adds to the
+    counters, and list the fields it reads in `dashboard_fields`. A save
+    moves the counters by the difference between what the row counted before
+    (read back by the `read_dashboard_counts` signal) and what it counts now.
+    """
+
+    # Fields `dashboard_counts()` reads
+    dashboard_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, "dashboard_counts", None)) or not cls.dashboard_fields:
+            raise TypeError(f"{cls.__name__} must define dashboard_counts() and dashboard_fields")
+
+    @classmethod
+    def dashboard_names(cls):
+        """`dashboard_fields` by name and by column attribute (`task_template_id`)."""
+        fields = [cls._meta.get_field(name) for name in cls.dashboard_fields]
+        return {field.name for field in fields} | {field.attname for field in fields}
+
+    @classmethod
+    def counts_change(cls, update_fields):
+        """Whether a save of `update_fields` (None: every field) can move the counters."""
+        return update_fields is None or bool(set(update_fields) & cls.dashboard_names())
+
 
 # -------------- USER & PROFILE --------------
 class User(AbstractUser):
@@ -61,16 +104,64 @@ class Owner(models.Model):
     address = models.TextField(blank=True, null=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField(unique=True, blank=True, null=True)
+    # "First Last", kept in step by save() so the list can sort on an index
+    # instead of a computed CONCAT.
+    full_name = models.CharField(max_length=201, editable=False, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def full_name(self):
-        return f"{self.first_name} {self.last_name}".strip()
+    class Meta:
+        indexes = [models.Index(fields=["full_name", "id"])]
 
     def __str__(self):
         return self.full_name
 
+    @staticmethod
+    def join_name(first_name, last_name):
+        """The full name for a first and last name, without stray spaces."""
+        return " ".join(
+            part for part in ((first_name or "").strip(), (last_name or "").strip()) if part
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        On save, refresh the stored full name from first and last name.
+        """
+        self.full_name = self.join_name(self.first_name, self.last_name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"first_name", "last_name"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "full_name"}
+        super().save(*args, **kwargs)
+
+
+class OwnerSearchToken(models.Model):
+    """
+    One searchable word of an owner's name, e-mail or phone number.
+
+    Rebuilt from the owner by a post_save signal (see `index_owner`); words
+    are produced by `api.search.tokenize`.
+    """
+
+    owner = models.ForeignKey(Owner, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField(max_length=MAX_TOKEN_LENGTH)
+
+    # Fields of Owner that feed the tokens
+    SOURCE_FIELDS = ("first_name", "last_name", "email", "phone")
+
+    class Meta:
+        # Prefix lookups (token LIKE 'ada%') are range scans on this index
+        indexes = [models.Index(fields=["token", "owner"])]
+
+    def __str__(self):
+        return f"{self.token} -> {self.owner_id}"
+
+    @classmethod
+    def reindex(cls, owner):
+        """Replace the owner's tokens with ones built from its current fields."""
+        cls.objects.filter(owner=owner).delete()
+        values = [getattr(owner, field) for field in cls.SOURCE_FIELDS]
+        cls.objects.bulk_create([cls(owner=owner, token=token) for token in tokenize(*values)])
+
 
 class Vehicle(models.Model):
     """
@@ -82,15 +173,55 @@ class Vehicle(models.Model):
     model = models.CharField(max_length=50)
     license_plate = models.CharField(max_length=20, unique=True)
     year = models.PositiveIntegerField()
+    # The plate without case, accents or separators ("VD 12 345" -> "vd12345"),
+    # kept in step by save() for formatting-insensitive plate lookups.
+    plate_key = models.CharField(max_length=20, db_index=True, editable=False, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.brand} {self.model} ({self.license_plate})"
 
+    def save(self, *args, **kwargs):
+        """
+        On save, refresh the plate key from the license plate.
+        """
+        self.plate_key = compact(self.license_plate)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "license_plate" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "plate_key"}
+        super().save(*args, **kwargs)
+
+
+class VehiclePlateTrigram(models.Model):
+    """
+    One three-character slice of a vehicle's plate key, for fuzzy plate lookups.
+
+    Rebuilt by a post_save signal on Vehicle (see `index_plate`); the
+    (trigram, vehicle) index turns "plates sharing most of these slices"
+    into index lookups instead of a `LIKE '%...%'` scan.
+    """
+
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name="plate_trigrams")
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [models.Index(fields=["trigram", "vehicle"])]
+
+    def __str__(self):
+        return f"{self.trigram!r} -> {self.vehicle_id}"
+
+    @classmethod
+    def reindex(cls, vehicle):
+        """Replace the vehicle's trigrams with ones built from its plate key."""
+        cls.objects.filter(vehicle=vehicle).delete()
+        cls.objects.bulk_create(
+            [cls(vehicle=vehicle, trigram=trigram) for trigram in trigrams(vehicle.plate_key)]
+        )
+
 
 # ---------- REPORT & TASKS ------------
-class Report(models.Model):
+class Report(DashboardCounted, models.Model):
     """
     Inspection or service report associated with a vehicle and a user.
 
@@ -108,12 +239,37 @@ class Report(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     remarks = models.TextField(blank=True, null=True)
+    # The vehicle's brand and model, kept in step by save() and by the
+    # `copy_vehicle_to_reports` signal, so that the list's default ordering
+    # is read off one index of this table instead of a join and a sort.
+    vehicle_brand = models.CharField(max_length=50, editable=False, default="")
+    vehicle_model = models.CharField(max_length=50, editable=False, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    dashboard_fields = ("status",)
+
+    class Meta:
+        # Keyset pages of the report list (default ordering brand, model, id)
+        indexes = [models.Index(fields=["vehicle_brand", "vehicle_model", "id"])]
+
     def __str__(self):
         return f"Report number {self.id} for {self.vehicle} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        """
+        On save, copy the vehicle's brand and model onto the report.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"vehicle", "vehicle_id"} & set(update_fields):
+            self.vehicle_brand, self.vehicle_model = self.vehicle.brand, self.vehicle.model
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "vehicle_brand", "vehicle_model"}
+        super().save(*args, **kwargs)
+
+    def dashboard_counts(self):
+        return report_counts(self)
+
     def get_status_display(self):
         """Returns the user-readable status."""
         return dict(self.STATUS_CHOICES).get(self.status, self.status)
@@ -121,11 +277,14 @@ class Report(models.Model):
     def delete(self, *args, **kwargs):
         """
         On delete, cascade and restore inventory quantities
-        from related parts.
+        from related parts, in one UPDATE for all of them.
         """
-        for part in self.part_set.all():
-            part.delete()
-        super().delete(*args, **kwargs)
+        used = self.part_set.values("part_id").annotate(total=Sum("quantity_used"))
+        with transaction.atomic():
+            Inventory.objects.move(
+                {row["part_id"]: -row["total"] for row in used}, report_id=self.pk
+            )
+            super().delete(*args, **kwargs)
 
 
 class TaskTemplate(models.Model):
@@ -143,7 +302,7 @@ class TaskTemplate(models.Model):
         return self.name
 
 
-class Task(models.Model):
+class Task(DashboardCounted, models.Model):
     """
     Specific task performed as part of a report.
 
@@ -153,12 +312,125 @@ class Task(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE)
     task_template = models.ForeignKey(TaskTemplate, on_delete=models.SET_NULL, null=True)
 
+    dashboard_fields = ("task_template",)
+
     def __str__(self):
         task_template_name = self.task_template.name if self.task_template else "Unknown Task"
         return f"{task_template_name} in Report {self.report.id}"
 
+    def dashboard_counts(self):
+        return task_counts(self)
+
 
 # -------- INVENTORY & REPAIR PARTS --------
+# Sent after stock moves made with UPDATE statements, which send no post_save
+stock_moved = Signal()
+
+
+class InventoryQuerySet(models.QuerySet):
+    """
+    Stock moves as single UPDATE statements.
+
+    The stock check is part of the UPDATE's WHERE clause, so two concurrent
+    withdrawals can never both pass it: the database serializes them on the
+    row, and the second one simply matches no row if the first one emptied
+    it. `updated_at` is bumped by hand because `.update()` skips `auto_now`,
+    and the optimistic-concurrency check on inventory edits relies on it.
+    `low_stock` is recomputed in the same statement (see `_low_stock_after`).
+
+    Every move is also appended to the `StockMovement` ledger in the same
+    transaction; `report_id` names the report the stock went to or came
+    back from.
+    """
+
+    def withdraw(self, pk, quantity, report_id=None):
+        """Take `quantity` out of stock. Returns False, changing nothing, if short."""
+        now = timezone.now()
+        with transaction.atomic():
+            moved = self.filter(pk=pk, quantity_in_stock__gte=quantity).update(
+                low_stock=self._low_stock_after(quantity),
+                quantity_in_stock=F("quantity_in_stock") - quantity,
+                updated_at=now,
+            )
+            if moved:
+                StockMovement.record({pk: -Decimal(quantity)}, report_id=report_id, at=now)
+                stock_moved.send(sender=self.model, pks=[pk])
+        return bool(moved)
+
+    def restock(self, pk, quantity, report_id=None):
+        """Put `quantity` back into stock."""
+        now = timezone.now()
+        with transaction.atomic():
+            self.filter(pk=pk).update(
+                low_stock=self._low_stock_after(-quantity),
+                quantity_in_stock=F("quantity_in_stock") + quantity,
+                updated_at=now,
+            )
+            StockMovement.record({pk: Decimal(quantity)}, report_id=report_id, at=now)
+            stock_moved.send(sender=self.model, pks=[pk])
+
+    def move(self, deltas, report_id=None):
+        """
+        Apply `{inventory_id: quantity}` deltas in one UPDATE, or not at all.
+
+        Positive quantities are withdrawn and negative ones restocked. The
+        stock check is the same WHERE clause as `withdraw`, with a per-row
+        amount; if any item is short or missing, fewer rows match than were
+        asked for, the UPDATE is rolled back and a ValidationError names the
+        item. Restocks always match, since stock is never negative.
+        """
+        if not deltas:
+            return
+
+        amount = Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        )
+        now = timezone.now()
+        with transaction.atomic():
+            moved = self.filter(pk__in=deltas, quantity_in_stock__gte=amount).update(
+                low_stock=self._low_stock_after(amount),
+                quantity_in_stock=F("quantity_in_stock") - amount,
+                updated_at=now,
+            )
+            if moved != len(deltas):
+                transaction.set_rollback(True)
+            else:
+                StockMovement.record(
+                    {pk: -Decimal(delta) for pk, delta in deltas.items()},
+                    report_id=report_id,
+                    at=now,
+                )
+                stock_moved.send(sender=self.model, pks=list(deltas))
+
+        if moved != len(deltas):
+            raise ValidationError(self._shortage(deltas))
+
+    @staticmethod
+    def _low_stock_after(withdrawn):
+        """
+        `low_stock` once `withdrawn` has left stock, computed from the current
+        quantity: `quantity_in_stock - withdrawn <= reorder_level`.
+
+        It must come before `quantity_in_stock` in the UPDATE: MySQL applies
+        SET assignments left to right, each seeing the ones before it, so
+        listed first it reads the old quantity, as other databases always do.
+        """
+        return Case(
+            When(quantity_in_stock__lte=F("reorder_level") + withdrawn, then=Value(True)),
+            default=Value(False),
+        )
+
+    def _shortage(self, deltas):
+        items = self.in_bulk(list(deltas))
+        for pk, delta in deltas.items():
+            if pk not in items:
+                return f"Inventory item {pk} does not exist."
+            if items[pk].quantity_in_stock < delta:
+                return f"Not enough stock for {items[pk].name}."
+        return "Stock changed while saving; please try again."
+
+
 class Inventory(models.Model):
     """
     Represents a stock item that can be used for repairs.
@@ -168,13 +440,138 @@ class Inventory(models.Model):
     reference_code = models.CharField(max_length=50, unique=True)
     category = models.CharField(max_length=50, blank=True, null=True)
     quantity_in_stock = models.DecimalField(max_digits=10, decimal_places=2)
+    # Stock at or below this level needs reordering
+    reorder_level = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # quantity_in_stock <= reorder_level, stored so the alert set is an index read
+    low_stock = models.BooleanField(default=False, editable=False)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = InventoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pages of the inventory list (default ordering name)
+            models.Index(fields=["name", "id"]),
+            # Items to reorder, lowest stock first (?low_stock=true, dashboard)
+            models.Index(fields=["low_stock", "quantity_in_stock", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.reference_code})"
 
+    def save(self, *args, **kwargs):
+        """
+        On save, refresh the low-stock flag from the quantity and reorder level,
+        and record any change to the quantity in the stock ledger: the initial
+        stock of a new item, or a manual adjustment of an existing one.
+        """
+        self.low_stock = Decimal(self.quantity_in_stock) <= Decimal(self.reorder_level)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"quantity_in_stock", "reorder_level"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "low_stock"}
+
+        adding = self._state.adding
+        if not adding and update_fields is not None and "quantity_in_stock" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            previous = Decimal("0")
+            if not adding:
+                # Locked, so a stock move cannot slip between this read and the write
+                stored = (
+                    Inventory.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("quantity_in_stock", flat=True)
+                    .first()
+                )
+                if stored is not None:
+                    previous = stored
+            super().save(*args, **kwargs)
+            change = Decimal(self.quantity_in_stock) - previous
+            if change:
+                reason = "initial" if adding else "adjustment"
+                StockMovement.record({self.pk: change}, reason=reason, at=self.updated_at)
+
+
+class StockMovement(models.Model):
+    """
+    One change to an item's stock, in an append-only ledger.
+
+    Written by `InventoryQuerySet` and `Inventory.save()` in the same
+    transaction as the change itself, so an item's stock at any moment is the
+    sum of its movements up to then; `api/services/ledger.py` starts that sum
+    from the latest `StockSnapshot` rather than from the first movement.
+    `report_id` is a plain column, not a foreign key, so it outlives the report.
+    """
+
+    REASON_CHOICES = [
+        ("initial", "Initial stock"),
+        ("used", "Used in a report"),
+        ("returned", "Returned from a report"),
+        ("adjustment", "Manual adjustment"),
+    ]
+
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name="movements")
+    # Positive into stock, negative out of it
+    change = models.DecimalField(max_digits=12, decimal_places=2)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    report_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # An item's movements over a time range
+        indexes = [models.Index(fields=["inventory", "created_at"])]
+
+    def __str__(self):
+        return f"{self.change:+} x {self.inventory_id} ({self.reason})"
+
+    @classmethod
+    def record(cls, changes, reason=None, report_id=None, at=None):
+        """
+        Append one movement per `{inventory_id: change}`, in one INSERT.
+
+        Without a `reason`, negative changes are "used" and positive ones
+        "returned".
+        """
+        at = at or timezone.now()
+        cls.objects.bulk_create(
+            [
+                cls(
+                    inventory_id=pk,
+                    change=change,
+                    reason=reason or ("used" if change < 0 else "returned"),
+                    report_id=report_id,
+                    created_at=at,
+                )
+                for pk, change in changes.items()
+                if change
+            ]
+        )
+
+
+class StockSnapshot(models.Model):
+    """
+    An item's stock at `taken_at`, summed from the ledger.
+
+    Taken periodically by `manage.py snapshot_stock`. Stock at a past moment
+    starts from the latest snapshot before it and adds the movements since:
+    a short range of the (inventory, created_at) index.
+    """
+
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name="snapshots")
+    taken_at = models.DateTimeField()
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        indexes = [models.Index(fields=["inventory", "taken_at"])]
+
+    def __str__(self):
+        return f"{self.inventory_id}: {self.quantity} at {self.taken_at}"
+
 
 class Part(models.Model):
     """
@@ -194,31 +591,25 @@ class Part(models.Model):
         """
         On save, deduct used quantity from inventory.
 
-        Restores stock if updating an existing part entry.
+        Restores stock if updating an existing part entry. Each move is one
+        conditional UPDATE on the inventory row (see InventoryQuerySet), so
+        the in-memory `self.part` is not refreshed.
         """
         with transaction.atomic():
-            # Fetch the previous state if updating
+            # Give back what the stored version of this part had taken
             if self.pk:
-                previous_part = Part.objects.get(pk=self.pk)
-                previous_inventory = previous_part.part
-
-                # Restore previous inventory quantity if inventory changed or quantity was modified
-                if previous_inventory == self.part:
-                    previous_inventory.quantity_in_stock += previous_part.quantity_used
-                    previous_inventory.save()
-                else:
-                    # If changing inventory item, restore the old one and update the new one
-                    previous_inventory.quantity_in_stock += previous_part.quantity_used
-                    previous_inventory.save()
-
-            # Check if enough quantity is available
-            if self.part.quantity_in_stock < self.quantity_used:
+                previous = (
+                    Part.objects.filter(pk=self.pk).values_list("part_id", "quantity_used").first()
+                )
+                if previous:
+                    Inventory.objects.restock(*previous, report_id=self.report_id)
+
+            # Deduct new quantity, or fail without touching stock
+            if not Inventory.objects.withdraw(
+                self.part_id, self.quantity_used, report_id=self.report_id
+            ):
                 raise ValidationError(f"Not enough stock for {self.part.name}.")
 
-            # Deduct new quantity
-            self.part.quantity_in_stock -= self.quantity_used
-            self.part.save()
-
             super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
@@ -226,40 +617,510 @@ class Part(models.Model):
         On delete, restore inventory quantity.
         """
         with transaction.atomic():
-            self.part.quantity_in_stock += self.quantity_used
-            self.part.save()
+            Inventory.objects.restock(self.part_id, self.quantity_used, report_id=self.report_id)
             super().delete(*args, **kwargs)
 
 
 # -------- INVOICE --------
-class Invoice(models.Model):
+class Invoice(DashboardCounted, models.Model):
     """
     Invoice generated from a report, includes total cost and PDF export.
+
+    Totals and line items are frozen when the invoice is created: later
+    changes to task or stock prices never alter an issued invoice.
+
+    The PDF is rendered by the job worker after the invoice row exists, so
+    `pdf_status` starts at `pending_pdf` and moves to `ready` or `failed`.
     """
 
+    PDF_STATUS_CHOICES = [
+        ("pending_pdf", "PDF pending"),
+        ("ready", "PDF ready"),
+        ("failed", "PDF failed"),
+    ]
+
     invoice_number = models.CharField(max_length=20, unique=True)
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="invoice")
     issued_date = models.DateTimeField(default=timezone.now)
-    """ total_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.00) """
+    net_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    vat_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Indexed for revenue range filters (min_total/max_total on the list).
+    gross_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, db_index=True)
     pdf = models.FileField(upload_to="invoices/", null=True, blank=True)
+    pdf_status = models.CharField(max_length=20, choices=PDF_STATUS_CHOICES, default="pending_pdf")
+
+    class Meta:
+        # Keyset pages of the invoice list (default ordering issued_date)
+        indexes = [models.Index(fields=["issued_date", "id"])]
+
+    dashboard_fields = ("issued_date", "gross_total")
 
     def __str__(self):
         return f"Invoice {self.invoice_number} - {self.total_cost} CHF"
 
+    def dashboard_counts(self):
+        return invoice_counts(self)
+
     @property
     def total_cost(self):
         """
-        Dynamically calculates total cost from tasks and parts.
+        The net total, as frozen when the invoice was issued.
         """
-        task_total = sum(
-            task.task_template.price
-            for task in self.report.task_set.all()
-            if task.task_template and task.task_template.price
+        return self.net_total
+
+    def save(self, *args, **kwargs):
+        """
+        On creation, snapshot the report's tasks and parts into line items
+        and store the totals.
+        """
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            lines = self.build_lines()
+            self.net_total = sum((line.net for line in lines), Decimal("0.00"))
+            self.vat_total = (self.net_total * VAT_RATE).quantize(CENT)
+            self.gross_total = self.net_total + self.vat_total
+            super().save(*args, **kwargs)
+            InvoiceLine.objects.bulk_create(lines)
+
+    def build_lines(self):
+        """Price the report's tasks and parts at today's prices, unsaved."""
+        lines = []
+        tasks = self.report.task_set.select_related("task_template").order_by("id")
+        for task in tasks:
+            # A task whose template was deleted has no price and no name.
+            if task.task_template is None:
+                continue
+            lines.append(
+                InvoiceLine.priced(
+                    self, "task", task.task_template.name, task.task_template.price, 1
+                )
+            )
+        for part in self.report.part_set.select_related("part").order_by("id"):
+            lines.append(
+                InvoiceLine.priced(
+                    self, "part", part.part.name, part.part.unit_price, part.quantity_used
+                )
+            )
+        for position, line in enumerate(lines):
+            line.position = position
+        return lines
+
+
+class InvoiceLine(models.Model):
+    """
+    One frozen line of an invoice: a task or a part at the price it was billed.
+    """
+
+    KIND_CHOICES = [
+        ("task", "Task"),
+        ("part", "Part"),
+    ]
+
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="lines")
+    position = models.PositiveIntegerField(default=0)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    name = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    net = models.DecimalField(max_digits=12, decimal_places=2)
+    vat = models.DecimalField(max_digits=12, decimal_places=2)
+    gross = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"{self.quantity}x {self.name} on {self.invoice.invoice_number}"
+
+    @classmethod
+    def priced(cls, invoice, kind, name, unit_price, quantity):
+        """Build an unsaved line, rounding each amount to the cent as printed."""
+        net = (unit_price * quantity).quantize(CENT)
+        vat = (net * VAT_RATE).quantize(CENT)
+        return cls(
+            invoice=invoice,
+            kind=kind,
+            name=name,
+            unit_price=unit_price,
+            quantity=quantity,
+            net=net,
+            vat=vat,
+            gross=net + vat,
+        )
+
+
+# -------- BACKGROUND JOBS --------
+class Job(models.Model):
+    """
+    A unit of work queued for `manage.py run_jobs`.
+
+    `kind` names a handler in `api.services.jobs.HANDLERS`. A failed run is
+    re-queued with a backoff until `max_attempts` is reached, then left as
+    `failed` with the last traceback in `last_error`. A run whose worker
+    died is claimed again once its lease (`JOB_LEASE_SECONDS`) runs out.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # The worker's claim query filters on both and orders by run_after.
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.kind}) - {self.status}"
+
+    @property
+    def is_last_attempt(self):
+        """True while running the attempt after which no retry is scheduled."""
+        return self.attempts >= self.max_attempts
+
+
+# -------- SEARCH --------
+class SearchIndexEntryQuerySet(models.QuerySet):
+    def search(self, terms, kinds=None):
+        """
+        Objects with a token starting with each of `terms`, best first.
+
+        One grouped query over the (token, kind) index, returning
+        `{"kind", "object_id", "label", "rank"}` rows; see
+        `api.search.prefix_match` for the matching and the rank.
+        """
+        where, having, rank = prefix_match("token", terms)
+        queryset = self.filter(where)
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+        return (
+            queryset.values("kind", "object_id", "label")
+            .annotate(**having, rank=rank)
+            .filter(**{name: 1 for name in having})
+            .values("kind", "object_id", "label", "rank")
+            .order_by("-rank", "label", "kind", "object_id")
         )
-        part_total = sum(
-            part.quantity_used * part.part.unit_price for part in self.report.part_set.all()
+
+
+class SearchIndexEntry(models.Model):
+    """
+    One token of one object, for the global search (`/api/search/`).
+
+    Denormalized on purpose: the object's kind, id and display label are
+    repeated on each of its tokens, so a search is a single grouped query
+    with no joins. Kept current by signals (`index_for_search`); what is
+    indexed for each kind is defined by `api.search.DOCUMENTS`.
+    """
+
+    KIND_CHOICES = [
+        ("owner", "Owner"),
+        ("vehicle", "Vehicle"),
+        ("invoice", "Invoice"),
+        ("inventory", "Inventory"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    label = models.CharField(max_length=255)
+    token = models.CharField(max_length=MAX_TOKEN_LENGTH)
+
+    objects = SearchIndexEntryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["token", "kind"]),
+            models.Index(fields=["kind", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.kind} {self.object_id}"
+
+    @classmethod
+    def reindex(cls, kind, instance):
+        """Replace the entries of `instance` with ones built from its current fields."""
+        cls.objects.filter(kind=kind, object_id=instance.pk).delete()
+        label, tokens = DOCUMENTS[kind][1](instance)
+        cls.objects.bulk_create(
+            [
+                cls(kind=kind, object_id=instance.pk, label=label[:255], token=token)
+                for token in dict.fromkeys(tokens)
+            ]
         )
-        return task_total + part_total
+
+
+# -------- DASHBOARD --------
+class DashboardCounterQuerySet(models.QuerySet):
+    def bump(self, deltas):
+        """
+        Add each amount of `deltas` ({(metric, key): amount}) to its counter.
+
+        Each is an `UPDATE ... SET value = value + amount`, so concurrent bumps
+        never overwrite each other. A missing counter is created; if another
+        request creates it first, the UPDATE is retried. Counters are touched
+        in a fixed order so two transactions cannot lock them crosswise.
+        """
+        for (metric, key), amount in sorted(deltas.items(), key=lambda item: item[0]):
+            counter = self.filter(metric=metric, key=key)
+            if counter.update(value=F("value") + amount):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(metric=metric, key=key, value=amount)
+            except IntegrityError:
+                counter.update(value=F("value") + amount)
+
+
+class DashboardCounter(models.Model):
+    """
+    One precomputed number behind `/api/dashboard/summary/`.
+
+    `key` is a report status, a month ("2025-03") or a task template id,
+    depending on `metric`. Kept current by signals on Report, Task and Invoice
+    (`count_for_dashboard`); `rebuild()` recomputes every counter, for
+    writes that bypass signals (`QuerySet.update()`, bulk loads).
+    """
+
+    METRIC_CHOICES = [
+        ("reports", "Reports per status"),
+        ("invoices", "Invoices per month"),
+        ("revenue", "Gross revenue per month"),
+        ("tasks", "Tasks per task template"),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    key = models.CharField(max_length=50)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    objects = DashboardCounterQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["metric", "key"], name="unique_dashboard_counter")
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.key}: {self.value}"
+
+    @classmethod
+    def rebuild(cls):
+        """Replace every counter with one recomputed from the tables."""
+        with transaction.atomic():
+            totals = tally(Report.objects.all(), Task.objects.all(), Invoice.objects.all())
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(metric=metric, key=key, value=value)
+                    for (metric, key), value in totals.items()
+                ]
+            )
+
+
+# -------- CHANGE FEED --------
+# Sent once the transaction that logged changes commits, to wake the event
+# stream (`api/services/events.py`) of this process
+changes_logged = Signal()
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One create, update or delete of a synced object, for `/api/changes/`.
+
+    Appended by signals (`log_change`) in the same transaction as the write.
+    The auto-increment `id` is the feed's cursor, and an entry only records
+    which object changed: the feed serves the object as it is when read, or
+    a tombstone once it is gone. `api/services/changes.py` reads and prunes it.
+    """
+
+    KIND_CHOICES = [
+        ("owner", "Owner"),
+        ("vehicle", "Vehicle"),
+        ("report", "Report"),
+        ("inventory", "Inventory"),
+        ("task_template", "Task template"),
+        ("invoice", "Invoice"),
+    ]
+    ACTION_CHOICES = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("deleted", "Deleted"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Pruning by age; the feed itself reads a range of the primary key
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} {self.object_id} {self.action}"
+
+    @classmethod
+    def record(cls, kind, object_ids, action):
+        cls.objects.bulk_create([cls(kind=kind, object_id=pk, action=action) for pk in object_ids])
+        transaction.on_commit(lambda: changes_logged.send(sender=cls))
+
+
+def read_dashboard_counts(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Signal to read what a row counted before a save changes it."""
+    if raw or not sender.counts_change(update_fields):
+        return
+    stored = None
+    if instance.pk is not None:
+        rows = sender._base_manager.using(kwargs.get("using")).filter(pk=instance.pk)
+        stored = rows.only(*sender.dashboard_fields).first()
+    instance._dashboard_counts = stored.dashboard_counts() if stored else {}
+
+
+def count_for_dashboard(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Signal to move the dashboard counters by what a save changed."""
+    if raw or not sender.counts_change(update_fields):
+        return
+    previous = instance.__dict__.pop("_dashboard_counts", {})
+    # A counted field left out of a partial save is read back from the row
+    DashboardCounter.objects.bump(changes(previous, instance.dashboard_counts()))
+
+
+def uncount_for_dashboard(sender, instance, **kwargs):
+    """Signal to take an object about to be deleted out of the dashboard counters."""
+    DashboardCounter.objects.bump(changes(instance.dashboard_counts(), {}))
+
+
+def uncount_task_template(sender, instance, **kwargs):
+    """Signal to drop a deleted template's counter (its tasks are nulled by an UPDATE)."""
+    DashboardCounter.objects.filter(metric="tasks", key=str(instance.pk)).delete()
+
+
+for _model in (Report, Task, Invoice):
+    pre_save.connect(read_dashboard_counts, sender=_model)
+    post_save.connect(count_for_dashboard, sender=_model)
+    # Before the row goes, so fields left deferred can still be loaded
+    pre_delete.connect(uncount_for_dashboard, sender=_model)
+post_delete.connect(uncount_task_template, sender=TaskTemplate)
+
+
+# Models covered by the global search, and their kind in SearchIndexEntry
+SEARCH_KINDS = {Owner: "owner", Vehicle: "vehicle", Invoice: "invoice", Inventory: "inventory"}
+
+
+def index_for_search(sender, instance, update_fields=None, **kwargs):
+    """Signal to refresh an object's global search entries when it is saved."""
+    kind = SEARCH_KINDS[sender]
+    fields = DOCUMENTS[kind][0]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    SearchIndexEntry.reindex(kind, instance)
+
+
+def unindex_for_search(sender, instance, **kwargs):
+    """Signal to drop an object's global search entries when it is deleted."""
+    SearchIndexEntry.objects.filter(kind=SEARCH_KINDS[sender], object_id=instance.pk).delete()
+
+
+for _model in SEARCH_KINDS:
+    post_save.connect(index_for_search, sender=_model)
+    post_delete.connect(unindex_for_search, sender=_model)
+
+
+def index_plate(sender, instance, update_fields=None, **kwargs):
+    """Signal to keep a Vehicle's plate trigrams in step with its plate."""
+    if update_fields is not None and "license_plate" not in update_fields:
+        return
+    VehiclePlateTrigram.reindex(instance)
+
+
+post_save.connect(index_plate, sender=Vehicle)
+
+
+def copy_vehicle_to_reports(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Signal to keep the brand and model copied onto a Vehicle's reports in step."""
+    if (
+        created
+        or raw
+        or (update_fields is not None and not {"brand", "model"} & set(update_fields))
+    ):
+        return
+    Report.objects.filter(vehicle=instance).exclude(
+        vehicle_brand=instance.brand, vehicle_model=instance.model
+    ).update(vehicle_brand=instance.brand, vehicle_model=instance.model)
+
+
+post_save.connect(copy_vehicle_to_reports, sender=Vehicle)
+
+
+def index_owner(sender, instance, update_fields=None, **kwargs):
+    """Signal to keep an Owner's search tokens in step with its fields."""
+    if update_fields is not None and not set(update_fields) & set(OwnerSearchToken.SOURCE_FIELDS):
+        return
+    OwnerSearchToken.reindex(instance)
+
+
+post_save.connect(index_owner, sender=Owner)
+
+
+# Cached lists (api/cache.py) and the models whose writes invalidate them
+CACHED_BY = {Inventory: "inventory", TaskTemplate: "task-templates"}
+
+
+def invalidate_responses(sender, **kwargs):
+    """Signal to drop the cached responses of the list a model is shown in."""
+    response_cache.invalidate(CACHED_BY[sender])
+
+
+for _model in CACHED_BY:
+    post_save.connect(invalidate_responses, sender=_model)
+    post_delete.connect(invalidate_responses, sender=_model)
+stock_moved.connect(invalidate_responses, sender=Inventory)
+
+
+# Models in the change feed (`/api/changes/`), and their kind in ChangeLogEntry
+SYNCED_KINDS = {
+    Owner: "owner",
+    Vehicle: "vehicle",
+    Report: "report",
+    Inventory: "inventory",
+    TaskTemplate: "task_template",
+    Invoice: "invoice",
+}
+
+
+def log_change(sender, instance, created, raw=False, **kwargs):
+    """Signal to append a saved object to the change feed."""
+    if raw:
+        return
+    ChangeLogEntry.record(SYNCED_KINDS[sender], [instance.pk], "created" if created else "updated")
+
+
+def log_deletion(sender, instance, **kwargs):
+    """Signal to append a tombstone for a deleted object to the change feed."""
+    ChangeLogEntry.record(SYNCED_KINDS[sender], [instance.pk], "deleted")
+
+
+def log_stock_moved(sender, pks, **kwargs):
+    """Signal to append items whose stock moved by UPDATE to the change feed."""
+    ChangeLogEntry.record("inventory", pks, "updated")
+
+
+for _model in SYNCED_KINDS:
+    post_save.connect(log_change, sender=_model)
+    post_delete.connect(log_deletion, sender=_model)
+stock_moved.connect(log_stock_moved, sender=Inventory)
 
 
 # Signals to create/update UserProfile when a User is created/updated
@@ -0,0 +1,33 @@
+from rest_framework.renderers import JSONRenderer
+
+
+def stream_json_array(chunks):
+    """
+    Render already-serialized lists as one JSON array, one chunk at a time.
+
+    Each chunk goes through DRF's JSONRenderer, so values are encoded exactly
+    as in a regular response; only the enclosing brackets are written here.
+    Memory stays bounded by the chunk size instead of the whole list.
+    """
+    renderer = JSONRenderer()
+    yield b"["
+    separator = b""
+    for data in chunks:
+        if not data:
+            continue
+        yield separator + renderer.render(data)[1:-1]
+        separator = b","
+    yield b"]"
+
+
+async def astream_json_array(chunks):
+    """`stream_json_array` over an async iterator of chunks, for the ASGI server."""
+    renderer = JSONRenderer()
+    yield b"["
+    separator = b""
+    async for data in chunks:
+        if not data:
+            continue
+        yield separator + renderer.render(data)[1:-1]
+        separator = b","
+    yield b"]"
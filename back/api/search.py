@@ -0,0 +1,113 @@
+import re
+import unicodedata
+
+from django.db.models import Case, Max, Q, Sum, When
+
+# Long enough for any real name or e-mail part; longer runs are cut so the
+# token column (and its index) stays narrow.
+MAX_TOKEN_LENGTH = 64
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(value):
+    """Lower-case `value` and strip accents, so "Zoë" and "zoe" are the same word."""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(*values):
+    """
+    Split `values` into search tokens, in order and without duplicates.
+
+    Words are runs of letters and digits, so an e-mail address yields its
+    local part and domain labels. A value made only of digits and separators
+    (a phone number) also yields its digits joined up, so "079 123 45 67"
+    is found by "0791234".
+    """
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        text = normalize(value)
+        words = _WORD.findall(text)
+        if len(words) > 1 and re.fullmatch(r"[\d\s()./+-]+", text):
+            words.append("".join(words))
+        tokens += [word[:MAX_TOKEN_LENGTH] for word in words]
+    return list(dict.fromkeys(tokens))
+
+
+def prefix_match(field, terms):
+    """
+    The pieces of a ranked "every term starts some token" query over `field`.
+
+    Returns `(where, having, rank)`: a Q keeping only token rows that match
+    some term (`token LIKE 'term%'`, a range scan on an index that starts
+    with the token), per-term aggregates that must all equal 1 once rows are
+    grouped per object, and a rank that counts exact token matches twice and
+    prefix-only matches once.
+    """
+    where = Q()
+    for term in terms:
+        where |= Q(**{f"{field}__startswith": term})
+    having = {
+        f"_term_{index}": Max(Case(When(**{f"{field}__startswith": term}, then=1), default=0))
+        for index, term in enumerate(terms)
+    }
+    rank = Sum(Case(When(**{f"{field}__in": terms}, then=2), default=1))
+    return where, having, rank
+
+
+def compact(value):
+    """`value` normalized with every separator dropped: "VD 12-345" -> "vd12345"."""
+    return "".join(_WORD.findall(normalize(value or "")))[:MAX_TOKEN_LENGTH]
+
+
+def code_tokens(*values):
+    """
+    Tokens for codes such as plates or invoice numbers: each part, plus the
+    whole code with its separators dropped, so "VD 12 345" is found by
+    "vd12", "vd 12" and "12".
+    """
+    tokens = tokenize(*values) + [compact(value) for value in values]
+    return [token for token in dict.fromkeys(tokens) if token]
+
+
+def trigrams(key):
+    """
+    The three-character slices of `key`, padded like pg_trgm ("  vd1" ...
+    "45 ") so that the start and end of a plate weigh a little more.
+    """
+    padded = f"  {key} "
+    return list(dict.fromkeys(padded[index : index + 3] for index in range(len(padded) - 2)))
+
+
+def owner_document(owner):
+    label = " ".join(filter(None, [owner.first_name, owner.last_name]))
+    return label, tokenize(owner.first_name, owner.last_name, owner.email, owner.phone)
+
+
+def vehicle_document(vehicle):
+    label = f"{vehicle.license_plate} - {vehicle.brand} {vehicle.model}"
+    return label, code_tokens(vehicle.license_plate) + tokenize(vehicle.brand, vehicle.model)
+
+
+def invoice_document(invoice):
+    return invoice.invoice_number, code_tokens(invoice.invoice_number)
+
+
+def inventory_document(item):
+    label = f"{item.name} ({item.reference_code})"
+    return label, code_tokens(item.reference_code) + tokenize(item.name)
+
+
+# What the global search (`SearchIndexEntry`) indexes for each kind of
+# object: the fields its label and tokens are built from, and the function
+# building them. Migration 0015 keeps its own copy, so these can change
+# without altering what the migration indexed.
+DOCUMENTS = {
+    "owner": (("first_name", "last_name", "email", "phone"), owner_document),
+    "vehicle": (("license_plate", "brand", "model"), vehicle_document),
+    "invoice": (("invoice_number",), invoice_document),
+    "inventory": (("reference_code", "name"), inventory_document),
+}
@@ -1,12 +1,12 @@
 import os
 from datetime import datetime
-from decimal import Decimal
 
 from dateutil.parser import isoparse
 from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.utils.dateformat import format
 from django.utils.timezone import now
 from rest_framework import serializers
@@ -14,17 +14,21 @@ from rest_framework.exceptions import ValidationError
 
 from .exceptions import ConflictException
 from .models import (
+    ChangeLogEntry,
     Inventory,
     Invoice,
     Owner,
     Part,
     Report,
+    SearchIndexEntry,
     Task,
     TaskTemplate,
     User,
     UserProfile,
     Vehicle,
 )
+from .services.lines import add_tasks, replace_tasks
+from .services.stock import add_parts, replace_parts
 
 
 class ConcurrencyCheckMixin:
@@ -159,7 +163,7 @@ class OwnerSerializer(ConcurrencyCheckMixin, serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_full_name(self, obj):
-        return f"{obj.first_name} {obj.last_name}".strip()
+        return obj.full_name
 
 
 class VehicleSerializer(ConcurrencyCheckMixin, serializers.ModelSerializer):
@@ -283,7 +287,8 @@ class ReportSerializer(ConcurrencyCheckMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Report
-        fields = "__all__"
+        # The copied vehicle brand and model only serve the list's ordering
+        exclude = ["vehicle_brand", "vehicle_model"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_formatted_created_at(self, obj):
@@ -302,59 +307,110 @@ class ReportSerializer(ConcurrencyCheckMixin, serializers.ModelSerializer):
         tasks = validated_data.pop("tasks", [])
         parts = validated_data.pop("parts", [])
 
-        report = Report.objects.create(**validated_data)
+        with transaction.atomic():
+            report = Report.objects.create(**validated_data)
 
-        Task.objects.bulk_create(
-            [Task(report=report, task_template_id=task_id) for task_id in tasks]
-        )
+            add_tasks(report, tasks)
 
-        # Create parts one by one to trigger inventory logic
-        for part_data in parts:
-            Part.objects.create(
-                report=report,
-                part_id=part_data["part"],
-                quantity_used=Decimal(part_data["quantity_used"]),
-            )
+            # One aggregated stock move and one INSERT for all parts
+            try:
+                add_parts(report, parts)
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError({"parts": list(exc.messages)}) from exc
 
-        report.updated_at = now()
-        report.save(update_fields=["updated_at"])
+            report.updated_at = now()
+            report.save(update_fields=["updated_at"])
 
         return report
 
     def update(self, instance, validated_data):
         """
-        Updates report, replacing all related tasks and parts.
-        Ensures inventory consistency when parts change.
+        Updates report, replacing its tasks and parts with the posted lists.
+        Only added, removed or modified lines are written, and inventory
+        moves by the net difference.
         """
         tasks = validated_data.pop("tasks", None)
         parts = validated_data.pop("parts", None)
 
-        instance = super().update(instance, validated_data)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
 
-        # Replace all tasks if provided
-        if tasks is not None:
-            instance.task_set.all().delete()
-            Task.objects.bulk_create(
-                [Task(report=instance, task_template_id=task_id) for task_id in tasks]
-            )
+            # Replace tasks and parts if provided, touching only changed rows
+            if tasks is not None:
+                replace_tasks(instance, tasks)
+            if parts is not None:
+                try:
+                    replace_parts(instance, parts)
+                except DjangoValidationError as exc:
+                    raise serializers.ValidationError({"parts": list(exc.messages)}) from exc
 
-        # Replace all parts if provided
-        if parts is not None:
-            # Delete one-by-one to trigger inventory restoration
-            for part in instance.part_set.all():
-                part.delete()
+            instance.updated_at = now()
+            instance.save(update_fields=["updated_at"])
 
-            for part_data in parts:
-                Part.objects.create(
-                    report=instance,
-                    part_id=part_data["part"],
-                    quantity_used=Decimal(part_data["quantity_used"]),
-                )
+        return instance
 
-        instance.updated_at = now()
-        instance.save(update_fields=["updated_at"])
 
-        return instance
+class BulkExportSerializer(serializers.Serializer):
+    """
+    Validates the report ids posted to `reports/bulk-export/`.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500
+    )
+
+
+class PdfProgressSerializer(serializers.Serializer):
+    """
+    Validates the query string of `invoices/pdf-progress/`.
+    """
+
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        try:
+            ids = [int(part) for part in value.split(",") if part.strip()]
+        except ValueError:
+            raise serializers.ValidationError("A comma-separated list of invoice ids.") from None
+        if not ids:
+            raise serializers.ValidationError("At least one invoice id is required.")
+        if len(ids) > 500:
+            raise serializers.ValidationError("At most 500 invoice ids.")
+        return ids
+
+
+# ------------------ SEARCH ------------------
+
+
+class GlobalSearchSerializer(serializers.Serializer):
+    """
+    Validates the query string of `search/`.
+    """
+
+    q = serializers.CharField(max_length=200)
+    type = serializers.MultipleChoiceField(choices=SearchIndexEntry.KIND_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class StockAtSerializer(serializers.Serializer):
+    """
+    Validates the query string of `inventory/stock-at/`.
+    """
+
+    at = serializers.DateTimeField()
+
+
+# ------------------ CHANGE FEED ------------------
+
+
+class ChangesSerializer(serializers.Serializer):
+    """
+    Validates the query string of `changes/`.
+    """
+
+    since = serializers.IntegerField(min_value=0, required=False)
+    type = serializers.MultipleChoiceField(choices=ChangeLogEntry.KIND_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
 
 
 # ------------------ INVOICE ------------------
@@ -363,10 +419,24 @@ class ReportSerializer(ConcurrencyCheckMixin, serializers.ModelSerializer):
 class InvoiceSerializer(serializers.ModelSerializer):
     """
     Serializes invoices and includes human-readable issue date.
+
+    The totals are the columns frozen at export time. `total_cost` is the net
+    total, as it always was, and all four are rendered as numbers.
     """
 
     formatted_issued_date = serializers.SerializerMethodField()
-    total_cost = serializers.ReadOnlyField()
+    total_cost = serializers.DecimalField(
+        source="net_total", max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+    net_total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+    vat_total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+    gross_total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
     owner_full_name = serializers.SerializerMethodField()
     vehicle_plate = serializers.SerializerMethodField()
     pdf_exists = serializers.SerializerMethodField()
@@ -374,6 +444,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
         fields = "__all__"
+        # The PDF and its status belong to the render job (`render_invoice_pdf`)
+        read_only_fields = ["id", "pdf", "pdf_status"]
 
     def get_formatted_issued_date(self, obj):
         return format(obj.issued_date, "F j, Y")
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from api.exceptions import CursorExpiredException
+from api.models import ChangeLogEntry
+from django.utils import timezone
+
+# The cursor handed back only moves past entries at least this old. An entry
+# takes its id when its transaction inserts it but is only seen once that
+# transaction commits, so a lower id may still appear behind a young entry;
+# young entries are sent again on the next read instead of being skipped.
+SETTLE = timedelta(seconds=30)
+
+# How long entries are kept (`manage.py prune_changes`). An older cursor is
+# refused with a 410, and the client reloads its lists.
+RETENTION = timedelta(days=30)
+
+
+def start_cursor():
+    """The cursor for a client that has just loaded its lists: the newest settled entry."""
+    entries = ChangeLogEntry.objects.order_by("-id").values_list("id", flat=True)
+    settled = entries.filter(created_at__lte=timezone.now() - SETTLE).first()
+    if settled is not None:
+        return settled
+    oldest = entries.order_by("id").first()
+    return oldest - 1 if oldest is not None else 0
+
+
+def read(since, sources, kinds=None, limit=500):
+    """
+    The changes after cursor `since`: `(cursor, has_more, changes)`.
+
+    `changes` holds one `(kind, object_id, action, obj)` per changed object,
+    ordered by its latest change (see `resolve`). At most `limit` entries are
+    read; `has_more` says whether more follow.
+    """
+    check_cursor(since)
+    page = entries_after(since, kinds, limit + 1)
+    has_more = len(page) > limit
+    page = page[:limit]
+    return advance(since, page, has_more), has_more, resolve(page, sources)
+
+
+def check_cursor(since):
+    """Refuse a cursor older than the oldest entry kept."""
+    oldest = ChangeLogEntry.objects.order_by("id").values_list("id", flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        raise CursorExpiredException()
+
+
+def entries_after(since, kinds=None, limit=500):
+    """Up to `limit` entries after cursor `since`, oldest first, as dicts."""
+    entries = ChangeLogEntry.objects.filter(id__gt=since).order_by("id")
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    return list(entries.values("id", "kind", "object_id", "action", "created_at")[:limit])
+
+
+def advance(since, page, has_more=False):
+    """The cursor after reading `page`: past its leading run of settled entries."""
+    cursor = since
+    cutoff = timezone.now() - SETTLE
+    for entry in page:
+        if entry["created_at"] > cutoff:
+            break
+        cursor = entry["id"]
+    if has_more and cursor == since:
+        # A full page of young entries: move on rather than re-read it forever
+        cursor = page[-1]["id"]
+    return cursor
+
+
+def resolve(page, sources):
+    """
+    One `(kind, object_id, action, obj)` per object changed in `page`,
+    ordered by its latest change, with `obj` read from `sources[kind]` (a
+    queryset) or None for a deletion. An object created and then updated
+    within the page counts as created; one no longer found counts as deleted.
+    """
+    latest = {}
+    for entry in page:
+        key = entry["kind"], entry["object_id"]
+        previous = latest.pop(key, None)
+        action = entry["action"]
+        latest[key] = "created" if previous == "created" and action == "updated" else action
+
+    wanted = {}
+    for (kind, pk), action in latest.items():
+        if action != "deleted":
+            wanted.setdefault(kind, []).append(pk)
+    found = {kind: sources[kind].in_bulk(pks) for kind, pks in wanted.items()}
+
+    changes = []
+    for (kind, pk), action in latest.items():
+        obj = found.get(kind, {}).get(pk)
+        changes.append((kind, pk, action if obj is not None else "deleted", obj))
+    return changes
+
+
+def prune(now=None):
+    """Delete entries older than RETENTION, keeping the newest so old cursors stay detectable."""
+    newest = ChangeLogEntry.objects.order_by("-id").values_list("id", flat=True).first()
+    cutoff = (now or timezone.now()) - RETENTION
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=cutoff).exclude(id=newest).delete()
+    return deleted
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from api.models import DashboardCounter, Inventory, Report, TaskTemplate
+from django.db.models import Q
+from django.utils import timezone
+
+# How much the dashboard shows
+REVENUE_MONTHS = 12
+LOW_STOCK_ITEMS = 5
+TOP_TASK_TEMPLATES = 5
+
+
+def recent_periods(count, today=None):
+    """The last `count` revenue periods ("2025-03"), oldest first, ending this month."""
+    today = today or timezone.localdate()
+    year, month = today.year, today.month
+    periods = []
+    for _ in range(count):
+        periods.append(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return periods[::-1]
+
+
+def summary():
+    """
+    The dashboard numbers: reports per status, revenue per month, the items
+    to reorder (lowest stock first) and the most used task templates.
+
+    Four small queries, whatever the size of the tables: the counters come
+    from `DashboardCounter`, and the low-stock items from the
+    `(low_stock, quantity_in_stock, id)` index. `low_stock` is a queryset, left to the
+    caller to serialize.
+    """
+    periods = recent_periods(REVENUE_MONTHS)
+    rows = DashboardCounter.objects.filter(
+        Q(metric="reports") | Q(metric__in=["invoices", "revenue"], key__gte=periods[0])
+    ).values_list("metric", "key", "value")
+    counters = {(metric, key): value for metric, key, value in rows}
+
+    top = list(
+        DashboardCounter.objects.filter(metric="tasks", value__gt=0)
+        .order_by("-value", "key")
+        .values_list("key", "value")[:TOP_TASK_TEMPLATES]
+    )
+    templates = TaskTemplate.objects.in_bulk([int(key) for key, _ in top])
+    low_stock = Inventory.objects.filter(low_stock=True).order_by("quantity_in_stock", "id")
+
+    return {
+        "reports_by_status": {
+            status: int(counters.get(("reports", status), 0)) for status, _ in Report.STATUS_CHOICES
+        },
+        "revenue": [
+            {
+                "period": period,
+                "invoices": int(counters.get(("invoices", period), 0)),
+                "gross_total": counters.get(("revenue", period), Decimal("0.00")),
+            }
+            for period in periods
+        ],
+        "low_stock": low_stock[:LOW_STOCK_ITEMS],
+        "top_task_templates": [
+            {"id": int(key), "name": templates[int(key)].name, "uses": int(value)}
+            for key, value in top
+            if int(key) in templates
+        ],
+    }
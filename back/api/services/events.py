@@ -0,0 +1,166 @@
+"""
+The event stream behind `/api/events/`: changes to reports, inventory and
+invoices pushed to connected clients as server-sent events.
+
+One `Broadcaster` per process reads the change log (`ChangeLogEntry`) and
+fans every new entry out to all of its open streams, so the database sees
+one small query per poll however many clients are connected. Writes made in
+this process wake it as soon as they commit (`changes_logged`); writes made
+by other processes are picked up by the poll, every EVENTS_POLL_INTERVAL
+seconds.
+"""
+
+import asyncio
+import logging
+import secrets
+
+from api.models import changes_logged
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from rest_framework.renderers import JSONRenderer
+
+from .changes import advance, entries_after, resolve, start_cursor
+
+logger = logging.getLogger(__name__)
+
+# The kinds of change pushed to clients
+EVENT_KINDS = ("report", "inventory", "invoice")
+
+# Change log entries read per poll
+BATCH = 500
+
+# Messages a stream may fall behind by before it is closed; the client then
+# reconnects and catches up from the change log.
+MAX_PENDING = 100
+
+
+def issue_ticket(user, expires_at):
+    """A single-use ticket to open one stream as `user`, which ends at `expires_at`."""
+    ticket = secrets.token_urlsafe(32)
+    caches["tickets"].set(f"events:{ticket}", {"user": user.pk, "expires_at": expires_at})
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """What `ticket` was issued for, or None if it is unknown, expired or already used."""
+    if not ticket:
+        return None
+    tickets, key = caches["tickets"], f"events:{ticket}"
+    grant = tickets.get(key)
+    # Only the request whose delete removed the ticket may use it
+    if grant is None or not tickets.delete(key):
+        return None
+    return grant
+
+
+def event(name, data, cursor=None):
+    """One server-sent event, rendered as the JSON the list endpoints use."""
+    lines = [] if cursor is None else [f"id: {cursor}"]
+    lines += [f"event: {name}", f"data: {JSONRenderer().render(data).decode()}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def change_event(kind, pk, action, data, cursor):
+    return event("change", {"type": kind, "id": pk, "action": action, "data": data}, cursor)
+
+
+class Subscription:
+    """The messages waiting to be sent down one open stream."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(MAX_PENDING)
+        self.overflowed = False
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broadcaster:
+    """
+    Reads new change log entries and hands them to every subscription.
+
+    `sources` maps each kind to the queryset its objects are read from, and
+    `render(kind, obj)` returns an object's data. Like `/api/changes/`, the
+    cursor only moves past settled entries; entries already sent are
+    remembered until it does, so each is pushed once.
+    """
+
+    def __init__(self, sources, render):
+        self.sources = sources
+        self.render = render
+        self.subscriptions = set()
+        self.cursor = None
+        self.delivered = set()
+        self.loop = None
+        self.wake = None
+        self.task = None
+        changes_logged.connect(self.notify, weak=False)
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            # First stream, or a new event loop (a restarted server, a test):
+            # nothing from the old one carries over.
+            self.loop, self.wake, self.task = loop, asyncio.Event(), None
+            self.subscriptions, self.cursor, self.delivered = set(), None, set()
+        subscription = Subscription()
+        self.subscriptions.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def notify(self, **kwargs):
+        """Signal receiver: poll now (called from whichever thread committed)."""
+        loop = self.loop
+        if loop is not None and self.subscriptions and not loop.is_closed():
+            loop.call_soon_threadsafe(self.wake.set)
+
+    async def run(self):
+        while self.subscriptions:
+            more = False
+            try:
+                messages, more = await sync_to_async(self.collect)()
+            except Exception:
+                logger.exception("Reading the change log for the event stream failed")
+                # Drop the connection if that broke it; the next poll reconnects
+                await sync_to_async(close_old_connections)()
+                messages = []
+            for subscription in list(self.subscriptions):
+                for message in messages:
+                    subscription.push(message)
+            if more:
+                continue
+            try:
+                await asyncio.wait_for(self.wake.wait(), settings.EVENTS_POLL_INTERVAL)
+            except TimeoutError:
+                pass
+            self.wake.clear()
+
+    def collect(self):
+        """The messages for entries not sent yet, and whether more are waiting."""
+        if self.cursor is None:
+            self.cursor = start_cursor()
+
+        page = entries_after(self.cursor, EVENT_KINDS, BATCH + 1)
+        more = len(page) > BATCH
+        page = page[:BATCH]
+        fresh = [entry for entry in page if entry["id"] not in self.delivered]
+
+        self.delivered.update(entry["id"] for entry in fresh)
+        self.cursor = advance(self.cursor, page, more)
+        self.delivered = {pk for pk in self.delivered if pk > self.cursor}
+        messages = [
+            change_event(
+                kind, pk, action, None if obj is None else self.render(kind, obj), self.cursor
+            )
+            for kind, pk, action, obj in resolve(fresh, self.sources)
+        ]
+        return messages, more
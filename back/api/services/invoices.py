@@ -1,78 +1,115 @@
 import os
-from decimal import Decimal
 
-from api.models import Invoice, Part, Task
+from api.models import Invoice
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.template.loader import get_template
-from weasyprint import HTML
+from django.db import transaction
+
+from .jobs import enqueue
+from .rendering import invoice_template, render_pdf
 
 
 def generate_invoice(report, request=None):
+    """
+    Create the invoice for an exported report and queue its PDF render.
+
+    The invoice is returned in `pending_pdf` state; `render_invoice_pdf`
+    attaches the file when `manage.py run_jobs` picks the job up. Both rows
+    are written in one transaction so a worker never sees a job whose
+    invoice does not exist yet.
+    """
     invoice_number = f"INV-{report.id:06d}"
-    invoice = Invoice.objects.create(invoice_number=invoice_number, report=report)
+    with transaction.atomic():
+        invoice = Invoice.objects.create(invoice_number=invoice_number, report=report)
+        queue_invoice_pdf(invoice)
+
+    return invoice
+
+
+def queue_invoice_pdf(invoice):
+    """Queue the render of a new invoice's PDF, in the transaction that created it."""
+    enqueue("render_invoice_pdf", invoice_id=invoice.id)
+
+
+def pdf_progress(invoices):
+    """How far the PDFs of `invoices` have got: how many are in each `pdf_status`,
+    and each invoice's own."""
+    rows = list(invoices.order_by("id").values("id", "invoice_number", "report", "pdf_status"))
+    counts = dict.fromkeys(dict(Invoice.PDF_STATUS_CHOICES), 0)
+    for row in rows:
+        counts[row["pdf_status"]] += 1
+    return {
+        "count": len(rows),
+        **counts,
+        "done": counts["pending_pdf"] == 0,
+        "invoices": rows,
+    }
 
-    html_content = generate_invoice_pdf(invoice)
 
-    base_url = f"file://{settings.STATIC_ROOT}/"
+def render_invoice_pdf(job):
+    """Job handler: render an invoice to PDF and attach it to the row."""
+    invoice = Invoice.objects.select_related("report__vehicle__owner").get(
+        pk=job.payload["invoice_id"]
+    )
 
-    pdf_file = HTML(string=html_content, base_url=base_url).write_pdf()
+    try:
+        html_content = generate_invoice_pdf(invoice)
+        pdf_file = render_pdf(html_content)
+    except Exception:
+        # Retries are the worker's business; only the final failure is
+        # surfaced on the invoice itself.
+        if job.is_last_attempt:
+            invoice.pdf_status = "failed"
+            invoice.save(update_fields=["pdf_status"])
+        raise
 
     os.makedirs(os.path.join(settings.MEDIA_ROOT, "invoices"), exist_ok=True)
-    invoice.pdf.save(f"invoice_{invoice_number}.pdf", ContentFile(pdf_file), save=True)
+    invoice.pdf.save(f"invoice_{invoice.invoice_number}.pdf", ContentFile(pdf_file), save=False)
+    invoice.pdf_status = "ready"
+    invoice.save(update_fields=["pdf", "pdf_status"])
 
-    return invoice
 
+def invoice_pdf_failed(job):
+    """Job failure hook: the render was given up on without raising, e.g. its worker died."""
+    invoice = Invoice.objects.filter(pk=job.payload["invoice_id"]).first()
+    if invoice is not None:
+        invoice.pdf_status = "failed"
+        invoice.save(update_fields=["pdf_status"])
 
-def generate_invoice_pdf(invoice):
-    tasks = Task.objects.filter(report=invoice.report).select_related("task_template")
-    parts = Part.objects.filter(report=invoice.report).select_related("part")
 
-    VAT_RATE = Decimal("0.2")
+def generate_invoice_pdf(invoice):
+    """Render the invoice HTML from its frozen lines and totals."""
     task_data, part_data = [], []
-    net_total = Decimal("0.00")
-
-    for task in tasks:
-        price = task.task_template.price
-        vat = price * VAT_RATE
-        task_data.append(
-            {
-                "name": task.task_template.name,
-                "price": f"{price:.2f}",
-                "vat": f"{vat:.2f}",
-                "total": f"{(price + vat):.2f}",
-            }
-        )
-        net_total += price
-
-    for part in parts:
-        unit_price = part.part.unit_price
-        quantity = part.quantity_used
-        subtotal = unit_price * quantity
-        vat = subtotal * VAT_RATE
-        part_data.append(
-            {
-                "name": part.part.name,
-                "unit_price": f"{unit_price:.2f}",
-                "quantity": str(quantity),
-                "subtotal": f"{subtotal:.2f}",
-                "vat": f"{vat:.2f}",
-                "total": f"{(subtotal + vat):.2f}",
-            }
-        )
-        net_total += subtotal
-
-    vat_total = net_total * VAT_RATE
-    final_total = net_total + vat_total
+
+    for line in invoice.lines.all():
+        if line.kind == "task":
+            task_data.append(
+                {
+                    "name": line.name,
+                    "price": f"{line.net:.2f}",
+                    "vat": f"{line.vat:.2f}",
+                    "total": f"{line.gross:.2f}",
+                }
+            )
+        else:
+            part_data.append(
+                {
+                    "name": line.name,
+                    "unit_price": f"{line.unit_price:.2f}",
+                    "quantity": str(line.quantity),
+                    "subtotal": f"{line.net:.2f}",
+                    "vat": f"{line.vat:.2f}",
+                    "total": f"{line.gross:.2f}",
+                }
+            )
 
     context = {
         "invoice": invoice,
         "tasks": task_data,
         "parts": part_data,
-        "net_total": f"{net_total:.2f}",
-        "vat_total": f"{vat_total:.2f}",
-        "final_total": f"{final_total:.2f}",
+        "net_total": f"{invoice.net_total:.2f}",
+        "vat_total": f"{invoice.vat_total:.2f}",
+        "final_total": f"{invoice.gross_total:.2f}",
     }
 
-    template = get_template("api/invoice_template.html")
-    return template.render(context)
+    return invoice_template().render(context)
@@ -0,0 +1,130 @@
+import traceback
+from datetime import timedelta
+
+from api.models import Job
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# kind -> dotted path of a callable taking the running Job. Resolved lazily so
+# that enqueueing a job never imports the (WeasyPrint-heavy) handler module.
+HANDLERS = {
+    "render_invoice_pdf": "api.services.invoices.render_invoice_pdf",
+}
+
+# kind -> dotted path of a callable taking a Job given up on outside its
+# handler (its worker died mid-run), to show the failure where the handler
+# would have. A handler that raises on its last attempt does this itself.
+ON_FAILURE = {
+    "render_invoice_pdf": "api.services.invoices.invoice_pdf_failed",
+}
+
+# Seconds to wait before retry N (1-based); the last value repeats.
+RETRY_BACKOFF = [10, 60, 300]
+
+
+def enqueue(kind, max_attempts=3, **payload):
+    """Queue a job of `kind` and return it. Runs inside the caller's transaction."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, payload=payload, max_attempts=max_attempts)
+
+
+def claim(limit=1):
+    """
+    Mark up to `limit` due jobs as running and return them.
+
+    SKIP LOCKED lets several workers poll the same table without handing the
+    same row to two of them. A job left `running` for longer than
+    `settings.JOB_LEASE_SECONDS` lost its worker (killed, crashed or
+    redeployed mid-run) and is claimed again, as its next attempt; one that
+    was on its last attempt is failed instead.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    claimed = []
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="queued", run_after__lte=now) | Q(status="running", updated_at__lt=expired)
+            )
+            .order_by("run_after", "id")[:limit]
+        )
+        for job in jobs:
+            if job.status == "running" and job.is_last_attempt:
+                give_up(job, "The worker running this job stopped before it finished.")
+                continue
+            job.status = "running"
+            job.attempts += 1
+            job.save(update_fields=["status", "attempts", "updated_at"])
+            claimed.append(job)
+    return claimed
+
+
+def run(job):
+    """Run one claimed job and record the outcome. Returns the final status."""
+    try:
+        import_string(HANDLERS[job.kind])(job)
+    except Exception:
+        return record_failure(job, traceback.format_exc())
+
+    job.status = "done"
+    job.save(update_fields=["status", "updated_at"])
+    return job.status
+
+
+def record_failure(job, error):
+    """Re-queue `job` with a backoff after a failed attempt, or fail it after its last."""
+    job.last_error = error
+    if job.is_last_attempt:
+        job.status = "failed"
+    else:
+        delay = RETRY_BACKOFF[min(job.attempts, len(RETRY_BACKOFF)) - 1]
+        job.status = "queued"
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+    job.save(update_fields=["status", "run_after", "last_error", "updated_at"])
+    return job.status
+
+
+def abandon(job, error):
+    """
+    Record an attempt that ended outside `run` (the process running it died)
+    as failed. Returns the job's status, or None if the job no longer exists.
+    """
+    try:
+        job.refresh_from_db()
+    except Job.DoesNotExist:
+        return None
+    if job.is_last_attempt:
+        return give_up(job, error)
+    return record_failure(job, error)
+
+
+def give_up(job, error):
+    """Fail `job` for good without running it, and let its kind show the failure."""
+    job.status = "failed"
+    job.last_error = error
+    job.save(update_fields=["status", "last_error", "updated_at"])
+    if job.kind in ON_FAILURE:
+        import_string(ON_FAILURE[job.kind])(job)
+    return job.status
+
+
+def run_by_id(job_id):
+    """Run an already-claimed job by primary key. Entry point for pool processes."""
+    return run(Job.objects.get(pk=job_id))
+
+
+def run_pending(limit=None):
+    """Claim and run due jobs one at a time until none are left. Returns the count run."""
+    count = 0
+    while limit is None or count < limit:
+        jobs = claim()
+        if not jobs:
+            break
+        run(jobs[0])
+        count += 1
+    return count
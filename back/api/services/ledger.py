@@ -0,0 +1,74 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from api.models import Inventory, StockMovement, StockSnapshot
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Snapshots are taken as of this long ago, so that a movement whose
+# transaction is still committing when the snapshot runs is not left out.
+SNAPSHOT_SETTLE = timedelta(minutes=1)
+
+# Before any movement: the lower bound for items that have no snapshot yet
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+QUANTITY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def with_stock_at(items, moment):
+    """
+    `items` (an Inventory queryset) annotated with `stock_at`, each item's
+    quantity in stock at `moment`.
+
+    The latest snapshot at or before `moment`, plus the movements between it
+    and `moment`: two correlated subqueries per item, each a short range read
+    on an (inventory, time) index. Items with no snapshot yet sum every
+    movement up to `moment`.
+    """
+    snapshot = StockSnapshot.objects.filter(
+        inventory=OuterRef("pk"), taken_at__lte=moment
+    ).order_by("-taken_at")
+    moved = (
+        StockMovement.objects.filter(
+            inventory=OuterRef("pk"),
+            created_at__gt=Coalesce(OuterRef("snapshot_at"), Value(EPOCH)),
+            created_at__lte=moment,
+        )
+        .values("inventory")
+        .annotate(total=Sum("change"))
+        .values("total")
+    )
+    zero = Value(Decimal("0"), output_field=QUANTITY)
+    return items.annotate(
+        snapshot_at=Subquery(snapshot.values("taken_at")[:1]),
+        snapshot_quantity=Subquery(snapshot.values("quantity")[:1], output_field=QUANTITY),
+    ).annotate(
+        stock_at=Coalesce(F("snapshot_quantity"), zero)
+        + Coalesce(Subquery(moved, output_field=QUANTITY), zero)
+    )
+
+
+def take_snapshot(at=None):
+    """
+    Store every item's ledger stock at `at` (default: `SNAPSHOT_SETTLE` ago).
+
+    Returns the number of snapshots written.
+    """
+    at = at or timezone.now() - SNAPSHOT_SETTLE
+    items = with_stock_at(Inventory.objects.all(), at)
+    snapshots = StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(inventory_id=pk, taken_at=at, quantity=quantity)
+            for pk, quantity in items.values_list("pk", "stock_at").iterator()
+        ],
+        batch_size=1000,
+    )
+    return len(snapshots)
+
+
+def discrepancies():
+    """Items whose `quantity_in_stock` differs from their ledger stock, with a `stock_at`."""
+    return with_stock_at(Inventory.objects.all(), timezone.now()).exclude(
+        stock_at=F("quantity_in_stock")
+    )
@@ -0,0 +1,57 @@
+from collections import Counter, defaultdict
+
+from api.models import DashboardCounter, Task
+from django.db import transaction
+
+
+def diff(rows, wanted, key):
+    """
+    Match existing `rows` against the `wanted` keys, as multisets.
+
+    Each wanted key claims one row whose `key(row)` equals it; claimed rows are
+    unchanged and keep their ids. Returns `(removed, added)`: the rows nothing
+    claimed and the keys no row matched, both in their original order.
+    """
+    unmatched = defaultdict(list)
+    for row in rows:
+        unmatched[key(row)].append(row)
+
+    added = []
+    for wanted_key in wanted:
+        if unmatched[wanted_key]:
+            unmatched[wanted_key].pop(0)
+        else:
+            added.append(wanted_key)
+
+    leftover = {id(row) for group in unmatched.values() for row in group}
+    removed = [row for row in rows if id(row) in leftover]
+    return removed, added
+
+
+def replace_tasks(report, template_ids):
+    """
+    Make `template_ids` the report's task list, touching only what changed.
+
+    Reads `report.task_set.all()`, so a prefetched task list costs nothing.
+    """
+    removed, added = diff(
+        list(report.task_set.all()), template_ids, key=lambda task: task.task_template_id
+    )
+    with transaction.atomic():
+        if removed:
+            Task.objects.filter(pk__in=[task.pk for task in removed]).delete()
+        add_tasks(report, added)
+
+
+def add_tasks(report, template_ids):
+    """Create one task per id of `template_ids` on `report`, in one INSERT."""
+    if not template_ids:
+        return
+    tasks = Task.objects.bulk_create(
+        [Task(report=report, task_template_id=template_id) for template_id in template_ids]
+    )
+    # bulk_create sends no post_save, so the dashboard counters are moved here
+    counts = Counter()
+    for task in tasks:
+        counts.update(task.dashboard_counts())
+    DashboardCounter.objects.bump(counts)
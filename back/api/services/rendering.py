@@ -0,0 +1,93 @@
+"""
+Process-wide WeasyPrint state for invoice renders.
+
+A render used to rebuild everything from scratch: the template lookup, the
+`<link>`ed stylesheet (fetched and parsed again), the Daruma `@font-face`
+(registered with fontconfig again) and the logo (read from STATIC_ROOT and
+decoded again). None of that changes between invoices, so it is built once
+per process here and reused by every render that process does - a job
+worker's pool processes stay warm for their whole lifetime.
+
+`reset()` drops all of it; `manage.py bench_invoice_render` uses it to time
+the cold path against the warm one.
+"""
+
+import os
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+from weasyprint import CSS, HTML, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+
+INVOICE_TEMPLATE = "api/invoice_template.html"
+INVOICE_STYLESHEET = "css/invoice_template.css"
+
+# url -> fetcher result, for file:// URLs only (fonts, logo, stylesheet).
+_fetched = {}
+# WeasyPrint's own decoded-image cache, shared across renders.
+_images = {}
+
+
+def fetch(url, timeout=10, ssl_context=None):
+    """URL fetcher that keeps local static files in memory after the first read."""
+    if not url.startswith("file://"):
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+    if url not in _fetched:
+        result = default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+        if "file_obj" in result:
+            with result.pop("file_obj") as file_obj:
+                result["string"] = file_obj.read()
+        _fetched[url] = result
+    return dict(_fetched[url])
+
+
+def base_url():
+    return f"file://{settings.STATIC_ROOT}/"
+
+
+@cache
+def font_config():
+    return FontConfiguration()
+
+
+@cache
+def invoice_template():
+    return get_template(INVOICE_TEMPLATE)
+
+
+@cache
+def invoice_stylesheet():
+    # Parsing registers the stylesheet's @font-face rules with font_config(),
+    # so the two must live and die together. The finders locate the source
+    # copy under back/static, which exists even where collectstatic has not
+    # run (the test suite); a missing stylesheet would fail every render,
+    # where the old <link> only logged a warning.
+    path = finders.find(INVOICE_STYLESHEET) or os.path.join(
+        settings.STATIC_ROOT, INVOICE_STYLESHEET
+    )
+    return CSS(
+        filename=path,
+        font_config=font_config(),
+        url_fetcher=fetch,
+    )
+
+
+def render_pdf(html_content):
+    """Render invoice HTML to PDF bytes with the warm stylesheet, fonts and assets."""
+    return HTML(string=html_content, base_url=base_url(), url_fetcher=fetch).write_pdf(
+        stylesheets=[invoice_stylesheet()],
+        font_config=font_config(),
+        cache=_images,
+    )
+
+
+def reset():
+    """Forget every cached resource, so the next render starts cold."""
+    invoice_stylesheet.cache_clear()
+    font_config.cache_clear()
+    invoice_template.cache_clear()
+    _fetched.clear()
+    _images.clear()
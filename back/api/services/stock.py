@@ -0,0 +1,82 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from api.models import Inventory, Part
+from api.services.lines import diff
+from django.db import transaction
+
+
+def net_deltas(old, new):
+    """
+    Net quantity to take out of each inventory item when `old` parts become `new`.
+
+    Both arguments are iterables of `(inventory_id, quantity)` pairs. Positive
+    values are withdrawals, negative ones restocks; items whose total usage
+    did not change are left out.
+    """
+    deltas = defaultdict(Decimal)
+    for inventory_id, quantity in new:
+        deltas[inventory_id] += quantity
+    for inventory_id, quantity in old:
+        deltas[inventory_id] -= quantity
+    return {inventory_id: delta for inventory_id, delta in deltas.items() if delta}
+
+
+def wanted_parts(parts):
+    """Turn the `parts` dicts posted with a report into `(inventory_id, quantity)` pairs."""
+    return [(int(data["part"]), Decimal(data["quantity_used"])) for data in parts]
+
+
+def add_parts(report, parts):
+    """
+    Record `parts` on a new report: one stock UPDATE and one INSERT.
+
+    The Part rows are bulk-created, so `Part.save` - and its per-row stock
+    move - is deliberately bypassed.
+    """
+    wanted = wanted_parts(parts)
+    with transaction.atomic():
+        Inventory.objects.move(net_deltas([], wanted), report_id=report.pk)
+        Part.objects.bulk_create(
+            [Part(report=report, part_id=item, quantity_used=quantity) for item, quantity in wanted]
+        )
+
+
+def replace_parts(report, parts):
+    """
+    Make `parts` the report's part list, touching only what changed.
+
+    Unchanged rows are kept as they are. A changed quantity on an item the
+    report already uses updates that row in place, so it keeps its id; other
+    removed rows are deleted and other new lines bulk-created. Stock moves by
+    the net difference only. Reads `report.part_set.all()`, so a prefetched
+    part list costs nothing.
+    """
+    removed, added = diff(
+        list(report.part_set.all()),
+        wanted_parts(parts),
+        key=lambda part: (part.part_id, part.quantity_used),
+    )
+    deltas = net_deltas([(part.part_id, part.quantity_used) for part in removed], added)
+
+    spare = defaultdict(list)
+    for part in removed:
+        spare[part.part_id].append(part)
+    modified, created = [], []
+    for item, quantity in added:
+        if spare[item]:
+            part = spare[item].pop(0)
+            part.quantity_used = quantity
+            modified.append(part)
+        else:
+            created.append(Part(report=report, part_id=item, quantity_used=quantity))
+    deleted = [part.pk for group in spare.values() for part in group]
+
+    with transaction.atomic():
+        Inventory.objects.move(deltas, report_id=report.pk)
+        if deleted:
+            Part.objects.filter(pk__in=deleted).delete()
+        if modified:
+            Part.objects.bulk_update(modified, ["quantity_used"])
+        if created:
+            Part.objects.bulk_create(created)
@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches: they outlive each test's rolled-back database."""
+    for cache in caches.all():
+        # Database caches are rolled back with the rest of the database
+        if not isinstance(cache, DatabaseCache):
+            cache.clear()
@@ -0,0 +1,169 @@
+"""
+Tests for the async list views (`AsyncListMixin`) served under ASGI.
+
+The URLs are loaded once with ASYNC_LIST_VIEWS off, so these tests build the
+views themselves with the setting on and call them through `async_to_sync`,
+as Django would. Each async list must answer exactly as its sync list does.
+"""
+
+import json
+import warnings
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from api.models import Inventory, Invoice, Owner, Part, Report, Vehicle
+from api.tests.helpers import make_user
+from api.views import InventoryViewSet, InvoiceViewSet, ReportViewSet
+
+ACTIONS = {"get": "list", "post": "create"}
+
+
+def views(viewset):
+    """The sync and the async list view of `viewset`."""
+    with override_settings(ASYNC_LIST_VIEWS=False):
+        sync_view = viewset.as_view(dict(ACTIONS))
+    with override_settings(ASYNC_LIST_VIEWS=True):
+        async_view = viewset.as_view(dict(ACTIONS))
+    return sync_view, async_view
+
+
+class AsyncListTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.factory = APIRequestFactory()
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+        Inventory.objects.create(
+            name="Air filter", reference_code="AF-1", quantity_in_stock=3, unit_price=12
+        )
+        for plate in ("AL-1", "AL-2", "AL-3"):
+            vehicle = Vehicle.objects.create(
+                owner=owner, brand="Audi", model="A3", year=2015, license_plate=plate
+            )
+            report = Report.objects.create(vehicle=vehicle, user=self.user)
+            Part.objects.create(report=report, part=self.item, quantity_used=1)
+        Invoice.objects.create(report=report)
+
+    def get(self, view, params=None, user=None, **headers):
+        request = self.factory.get("/", params or {}, **headers)
+        force_authenticate(request, user=user or self.user)
+        response = async_to_sync(view)(request) if iscoroutinefunction(view) else view(request)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def assertSameResponse(self, viewset, params=None):
+        sync_view, async_view = views(viewset)
+        expected = self.get(sync_view, params)
+        response = self.get(async_view, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    def test_the_views_are_async_only_when_enabled(self):
+        sync_view, async_view = views(ReportViewSet)
+        self.assertFalse(iscoroutinefunction(sync_view))
+        self.assertTrue(iscoroutinefunction(async_view))
+        self.assertTrue(async_view.csrf_exempt)
+
+    def test_each_list_answers_as_the_sync_list_does(self):
+        for viewset in (ReportViewSet, InventoryViewSet, InvoiceViewSet):
+            with self.subTest(viewset.__name__):
+                self.assertSameResponse(viewset)
+
+    def test_filters_ordering_and_pages_are_honoured(self):
+        self.assertSameResponse(ReportViewSet, {"ordering": "-created_at", "status": "pending"})
+        self.assertSameResponse(InventoryViewSet, {"ordering": "-name", "limit": 1})
+        self.assertSameResponse(InvoiceViewSet, {"cursor": "", "limit": 1})
+
+    def test_an_unchanged_list_is_answered_with_a_304(self):
+        _, view = views(ReportViewSet)
+        etag = self.get(view)["ETag"]
+
+        response = self.get(view, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_the_inventory_list_is_served_from_the_cache(self):
+        _, view = views(InventoryViewSet)
+        self.assertEqual(self.get(view)["X-Cache"], "MISS")
+        self.assertEqual(self.get(view)["X-Cache"], "HIT")
+
+        Inventory.objects.restock(self.item.pk, 5)
+        self.assertEqual(self.get(view)["X-Cache"], "MISS")
+
+    def stream(self, response):
+        """The pieces of a streamed `response`, read as the ASGI server reads them.
+
+        Each comes with the number of queries run by the time it arrived.
+        """
+
+        async def read():
+            pieces = []
+            async for piece in response.__aiter__():
+                pieces.append((piece, await sync_to_async(len)(queries)))
+            return pieces
+
+        with CaptureQueriesContext(connection) as queries, warnings.catch_warnings():
+            warnings.filterwarnings("error", message=".*synchronous iterators")
+            return async_to_sync(read)()
+
+    @override_settings(LIST_STREAM_CHUNK_SIZE=2)
+    def test_a_long_list_is_still_streamed(self):
+        _, view = views(ReportViewSet)
+
+        response = self.get(view)
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertTrue(response.is_async)
+        pieces = self.stream(response)
+        self.assertEqual(len(json.loads(b"".join(piece for piece, _ in pieces))), 3)
+
+    @override_settings(LIST_STREAM_CHUNK_SIZE=1)
+    def test_a_streamed_list_is_read_a_chunk_at_a_time(self):
+        _, view = views(ReportViewSet)
+
+        pieces = self.stream(self.get(view))
+
+        # "[", a chunk per report, "]": each later chunk queried as it was sent
+        chunks = [count for piece, count in pieces[1:-1]]
+        self.assertEqual(len(chunks), 3)
+        self.assertLess(chunks[0], chunks[1])
+        self.assertLess(chunks[1], chunks[2])
+
+    @override_settings(LIST_MAX_ROWS=2)
+    def test_a_list_over_the_cap_is_refused(self):
+        _, view = views(ReportViewSet)
+        self.assertEqual(self.get(view).status_code, 400)
+
+    def test_other_methods_go_to_the_sync_view(self):
+        _, view = views(InventoryViewSet)
+        request = self.factory.post(
+            "/",
+            {
+                "name": "Spark plug",
+                "reference_code": "SP-1",
+                "quantity_in_stock": 4,
+                "unit_price": 3,
+            },
+            format="json",
+        )
+        force_authenticate(request, user=self.user)
+
+        response = async_to_sync(view)(request)
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(Inventory.objects.filter(reference_code="SP-1").exists())
+
+    def test_anonymous_requests_are_rejected(self):
+        _, view = views(ReportViewSet)
+        request = self.factory.get("/")
+        self.assertEqual(async_to_sync(view)(request).status_code, 401)
@@ -0,0 +1,124 @@
+"""
+Tests for `POST /api/reports/bulk-export/`.
+
+The endpoint flips every requested report to `exported` and creates its
+invoice in one transaction, queueing the PDF renders rather than running
+them. The last test drains that queue on a real two-process pool, which is
+why it needs a TransactionTestCase: forked processes open their own
+connections and cannot see a TestCase's uncommitted rows.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from api.models import Invoice, Job, Owner, Report, Vehicle
+from api.services import jobs
+from api.tests.helpers import authenticate, make_user
+
+
+def make_reports(user, count, status="completed"):
+    owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+    reports = []
+    for index in range(count):
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate=f"BULK-{index}"
+        )
+        reports.append(Report.objects.create(vehicle=vehicle, user=user, status=status))
+    return reports
+
+
+class BulkExportTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.url = reverse("report-bulk-export")
+
+    def test_every_report_is_exported_and_gets_a_pending_invoice(self):
+        reports = make_reports(self.user, 3)
+
+        response = self.client.post(self.url, {"ids": [r.id for r in reports]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        results = response.data["results"]
+        self.assertEqual([row["result"] for row in results], ["exported"] * 3)
+        self.assertEqual([row["invoice"]["pdf_status"] for row in results], ["pending_pdf"] * 3)
+        self.assertEqual(Report.objects.filter(status="exported").count(), 3)
+        self.assertEqual(Job.objects.filter(kind="render_invoice_pdf").count(), 3)
+
+    def test_already_exported_and_unknown_reports_are_reported_not_failed(self):
+        (done,) = make_reports(self.user, 1, status="exported")
+
+        response = self.client.post(self.url, {"ids": [done.id, 999999]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            [(row["report"], row["result"]) for row in response.data["results"]],
+            [(done.id, "already_exported"), (999999, "not_found")],
+        )
+        self.assertIsNone(response.data["status_url"])
+        self.assertFalse(response.has_header("Location"))
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_a_repeated_id_is_exported_once(self):
+        (report,) = make_reports(self.user, 1)
+
+        response = self.client.post(self.url, {"ids": [report.id, report.id]}, format="json")
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_an_empty_list_is_rejected(self):
+        response = self.client.post(self.url, {"ids": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_progress_is_polled_at_the_status_url_as_renders_finish(self):
+        reports = make_reports(self.user, 3)
+        response = self.client.post(self.url, {"ids": [r.id for r in reports]}, format="json")
+        status_url = response.data["status_url"]
+        self.assertEqual(response["Location"], status_url)
+
+        before = self.client.get(status_url).data
+        with mock.patch("api.services.invoices.render_pdf", return_value=b"%PDF-1.7"):
+            (job,) = jobs.claim()
+            jobs.run(job)
+        during = self.client.get(status_url).data
+
+        self.assertEqual((before["count"], before["pending_pdf"], before["done"]), (3, 3, False))
+        self.assertEqual((during["pending_pdf"], during["ready"], during["failed"]), (2, 1, 0))
+        self.assertFalse(during["done"])
+        ready = Invoice.objects.get(pdf_status="ready")
+        self.assertIn(
+            {
+                "id": ready.id,
+                "invoice_number": ready.invoice_number,
+                "report": ready.report_id,
+                "pdf_status": "ready",
+            },
+            during["invoices"],
+        )
+
+    def test_the_status_url_needs_invoice_ids(self):
+        url = reverse("invoice-pdf-progress")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {"ids": "1,x"}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+
+class BulkExportRenderPoolTests(TransactionTestCase):
+    def test_the_worker_pool_renders_every_queued_invoice(self):
+        user = make_user()
+        reports = make_reports(user, 3)
+        client = authenticate(APIClient(), user)
+        client.post(reverse("report-bulk-export"), {"ids": [r.id for r in reports]}, format="json")
+
+        call_command("run_jobs", "--once", "--processes", "2", stdout=StringIO())
+
+        self.assertEqual(list(Invoice.objects.values_list("pdf_status", flat=True)), ["ready"] * 3)
+        self.assertEqual(set(Job.objects.values_list("status", flat=True)), {"done"})
@@ -0,0 +1,147 @@
+"""
+Tests for the change feed (`/api/changes/`, `ChangeLogEntry`).
+
+Every write to a synced model appends an entry in the same transaction; the
+feed serves the changed objects as they are now, or tombstones, after a
+cursor. The cursor only moves past entries older than `SETTLE`, so most
+tests set it to zero to see it move.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import ChangeLogEntry, Inventory, Owner, Part, Report, TaskTemplate, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+settled_at_once = mock.patch("api.services.changes.SETTLE", timedelta(0))
+
+
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+
+    def feed(self, **params):
+        response = self.client.get(reverse("changes"), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def summary(self, data):
+        return [(change["type"], change["id"], change["action"]) for change in data["changes"]]
+
+    @settled_at_once
+    def test_a_client_starts_from_the_newest_entry(self):
+        start = self.feed()
+
+        self.assertEqual(start["changes"], [])
+        self.assertEqual(self.feed(since=start["cursor"])["changes"], [])
+
+    @settled_at_once
+    def test_created_objects_come_with_their_list_representation(self):
+        cursor = self.feed()["cursor"]
+        vehicle = Vehicle.objects.create(
+            owner=self.owner, brand="Audi", model="A3", year=2015, license_plate="CF-1"
+        )
+
+        data = self.feed(since=cursor)
+
+        self.assertEqual(self.summary(data), [("vehicle", vehicle.pk, "created")])
+        self.assertEqual(data["changes"][0]["data"]["__str__"], "Audi A3 (CF-1)")
+        self.assertEqual(self.feed(since=data["cursor"])["changes"], [])
+
+    @settled_at_once
+    def test_an_object_changed_many_times_is_sent_once_in_its_latest_state(self):
+        cursor = self.feed()["cursor"]
+        template = TaskTemplate.objects.create(name="Oil change", price=50)
+        template.price = 60
+        template.save()
+        self.owner.phone = "079 000 00 00"
+        self.owner.save()
+
+        data = self.feed(since=cursor)
+
+        self.assertEqual(
+            self.summary(data),
+            [("task_template", template.pk, "created"), ("owner", self.owner.pk, "updated")],
+        )
+        self.assertEqual(data["changes"][0]["data"]["price"], "60.00")
+
+    @settled_at_once
+    def test_deleted_objects_leave_a_tombstone(self):
+        cursor = self.feed()["cursor"]
+        self.owner.last_name = "King"
+        self.owner.save()
+        pk = self.owner.pk
+        self.owner.delete()
+
+        data = self.feed(since=cursor)
+
+        self.assertEqual(
+            data["changes"], [{"type": "owner", "id": pk, "action": "deleted", "data": None}]
+        )
+
+    def test_young_entries_are_sent_again_until_they_settle(self):
+        cursor = self.feed()["cursor"]
+        Owner.objects.create(first_name="Alan", last_name="Turing")
+
+        first = self.feed(since=cursor)
+        second = self.feed(since=first["cursor"])
+
+        self.assertEqual(first["cursor"], cursor)
+        self.assertEqual(self.summary(second), self.summary(first))
+
+    @settled_at_once
+    def test_stock_moved_by_a_report_updates_the_item(self):
+        item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+        vehicle = Vehicle.objects.create(
+            owner=self.owner, brand="Audi", model="A3", year=2015, license_plate="CF-2"
+        )
+        report = Report.objects.create(vehicle=vehicle, user=self.user)
+        cursor = self.feed()["cursor"]
+
+        Part.objects.create(report=report, part=item, quantity_used=4)
+
+        data = self.feed(since=cursor, type="inventory")
+        self.assertEqual(self.summary(data), [("inventory", item.pk, "updated")])
+        self.assertEqual(data["changes"][0]["data"]["quantity_in_stock"], "6.00")
+
+    @settled_at_once
+    def test_a_limited_page_says_there_is_more(self):
+        cursor = self.feed()["cursor"]
+        owners = [Owner.objects.create(first_name=name, last_name="X") for name in "ABC"]
+
+        page = self.feed(since=cursor, limit=2)
+        rest = self.feed(since=page["cursor"], limit=2)
+
+        self.assertTrue(page["has_more"])
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(
+            [change["id"] for change in page["changes"] + rest["changes"]],
+            [owner.pk for owner in owners],
+        )
+
+    def test_a_cursor_older_than_the_log_is_refused(self):
+        Owner.objects.create(first_name="Alan", last_name="Turing")
+        Owner.objects.create(first_name="Grace", last_name="Hopper")
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+
+        call_command("prune_changes", stdout=out)
+
+        self.assertEqual(ChangeLogEntry.objects.count(), 1)
+        self.assertIn("Deleted 2 change feed entries.", out.getvalue())
+        response = self.client.get(reverse("changes"), {"since": 0})
+        self.assertEqual(response.status_code, 410)
+
+    def test_anonymous_requests_are_rejected(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse("changes")).status_code, 401)
@@ -0,0 +1,119 @@
+"""
+Tests for conditional GETs (`ConditionalGetMixin`): list and detail responses
+carry an ETag derived from `updated_at`, and a request repeating it with
+`If-None-Match` gets an empty 304 until a row it covers changes.
+"""
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Report, TaskTemplate, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=self.owner, brand="Audi", model="A3", year=2015, license_plate="CG-1"
+        )
+
+    def revalidate(self, url, etag, params=None):
+        return self.client.get(url, params or {}, HTTP_IF_NONE_MATCH=etag)
+
+    def test_an_unchanged_list_is_answered_with_an_empty_304(self):
+        url = reverse("owner-list")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.revalidate(url, etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_a_304_costs_one_query(self):
+        url = reverse("report-list")
+        Report.objects.create(vehicle=self.vehicle, user=self.user)
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_the_list_etag_follows_edits_additions_and_deletions(self):
+        url = reverse("vehicle-list")
+        etags = [self.client.get(url)["ETag"]]
+
+        self.vehicle.model = "A4"
+        self.vehicle.save()
+        etags.append(self.client.get(url)["ETag"])
+        other = Vehicle.objects.create(
+            owner=self.owner, brand="Fiat", model="Panda", year=2012, license_plate="CG-2"
+        )
+        etags.append(self.client.get(url)["ETag"])
+        self.assertEqual(len(set(etags)), 3)
+
+        other.delete()
+        response = self.revalidate(url, etags[2])
+
+        self.assertEqual(response.status_code, 200)
+        # Back to exactly the rows of the second response, so back to its ETag
+        self.assertEqual(response["ETag"], etags[1])
+
+    def test_filters_and_ordering_have_their_own_etags(self):
+        url = reverse("task-template-list")
+        TaskTemplate.objects.create(name="Oil change", price=50)
+        etag = self.client.get(url, {"ordering": "name"})["ETag"]
+
+        self.assertEqual(self.revalidate(url, etag, {"ordering": "-name"}).status_code, 200)
+        self.assertEqual(self.revalidate(url, etag, {"ordering": "name"}).status_code, 304)
+
+    def test_stock_moves_change_the_inventory_etag(self):
+        item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+        url = reverse("inventory-list")
+        etag = self.client.get(url)["ETag"]
+
+        Inventory.objects.withdraw(item.pk, 2)
+
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["quantity_in_stock"], "8.00")
+
+    def test_a_detail_is_revalidated_against_its_own_row(self):
+        url = reverse("owner-detail", kwargs={"pk": self.owner.pk})
+        etag = self.client.get(url)["ETag"]
+        Owner.objects.create(first_name="Alan", last_name="Turing")
+
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        self.owner.phone = "079 000 00 00"
+        self.owner.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_changing_a_reports_lines_changes_its_etag(self):
+        report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        template = TaskTemplate.objects.create(name="Oil change", price=50)
+        url = reverse("report-detail", kwargs={"pk": report.pk})
+        response = self.client.get(url)
+
+        self.client.patch(
+            url, {"tasks": [template.pk], "updated_at": response.data["updated_at"]}, format="json"
+        )
+
+        response = self.revalidate(url, response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["tasks_data"]), 1)
+
+    def test_a_missing_detail_is_still_a_404(self):
+        url = reverse("vehicle-detail", kwargs={"pk": self.vehicle.pk + 100})
+        self.assertEqual(self.revalidate(url, '"anything"').status_code, 404)
+
+    def test_keyset_pages_carry_no_etag(self):
+        response = self.client.get(reverse("report-list"), {"cursor": "", "limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
@@ -0,0 +1,150 @@
+"""
+Tests for database connection reuse: the per-process pool behind the pooled
+MySQL backend (`backend/db/pool.py`), and the per-request metrics
+(`ConnectionMetricsMiddleware`, `/api/db/stats/`).
+
+The suite runs on whatever backend the settings name, so the middleware is
+driven with `connection_created` as any backend sends it.
+"""
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from backend.db.pool import ConnectionPool
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.middleware import ConnectionMetricsMiddleware
+from api.models import Owner
+from api.tests.helpers import authenticate, make_user
+
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.rolled_back = False
+        self.closed = False
+
+    def ping(self):
+        if not self.alive:
+            raise OSError("MySQL server has gone away")
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_a_given_connection_is_rolled_back_and_taken_again(self):
+        pool = ConnectionPool(2)
+        first = FakeConnection()
+
+        pool.give(first)
+
+        self.assertTrue(first.rolled_back)
+        self.assertIs(pool.take(), first)
+        self.assertIsNone(pool.take())
+
+    def test_the_warmest_connection_is_taken_first(self):
+        pool = ConnectionPool(2)
+        older, newer = FakeConnection(), FakeConnection()
+        pool.give(older)
+        pool.give(newer)
+
+        self.assertIs(pool.take(), newer)
+
+    def test_connections_that_fail_the_ping_are_closed_and_skipped(self):
+        pool = ConnectionPool(2)
+        live, dead = FakeConnection(), FakeConnection(alive=False)
+        pool.give(live)
+        pool.give(dead)
+
+        self.assertIs(pool.take(), live)
+        self.assertTrue(dead.closed)
+
+    def test_a_full_pool_closes_what_it_cannot_keep(self):
+        pool = ConnectionPool(1)
+        kept, extra = FakeConnection(), FakeConnection()
+        pool.give(kept)
+
+        pool.give(extra)
+
+        self.assertTrue(extra.closed)
+        self.assertFalse(kept.closed)
+
+
+class ConnectionMetricsTests(APITestCase):
+    def setUp(self):
+        staff = make_user()
+        staff.is_staff = True
+        staff.save()
+        authenticate(self.client, staff)
+        Owner.objects.create(first_name="Ada", last_name="Lovelace")
+
+    def stats(self):
+        response = self.client.get(reverse("db-stats"))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def respond(self, connect=None):
+        """Run the middleware around a view that queries, connecting first as `connect` says."""
+
+        def view(request):
+            if connect:
+                connection.last_connect = connect
+                connection_created.send(sender=type(connection), connection=connection)
+            Owner.objects.count()
+            return HttpResponse()
+
+        try:
+            return ConnectionMetricsMiddleware(view)(RequestFactory().get("/"))
+        finally:
+            connection.__dict__.pop("last_connect", None)
+
+    def test_a_request_on_the_threads_connection_counts_as_reused(self):
+        before = self.stats()
+
+        response = self.client.get(reverse("owner-list"))
+
+        self.assertEqual(response["Server-Timing"], 'db-connect;dur=0.0;desc="reused"')
+        after = self.stats()
+        # The stats request itself runs no query (the test client skips authentication)
+        self.assertEqual(after["reused"] - before["reused"], 1)
+        self.assertEqual(after["requests"] - before["requests"], 1)
+
+    def test_a_new_or_pooled_connection_is_reported_with_its_connect_time(self):
+        opened = self.respond(connect=("opened", 12.34))
+        pooled = self.respond(connect=("pooled", 0.4))
+
+        self.assertEqual(opened["Server-Timing"], 'db-connect;dur=12.3;desc="opened"')
+        self.assertEqual(pooled["Server-Timing"], 'db-connect;dur=0.4;desc="pooled"')
+
+    def test_requests_without_queries_are_not_counted(self):
+        response = ConnectionMetricsMiddleware(lambda request: HttpResponse())(
+            RequestFactory().get("/")
+        )
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_an_async_chain_stays_async(self):
+        async def view(request):
+            await Owner.objects.acount()
+            return HttpResponse()
+
+        middleware = ConnectionMetricsMiddleware(view)
+        response = async_to_sync(middleware)(RequestFactory().get("/"))
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertEqual(response["Server-Timing"], 'db-connect;dur=0.0;desc="reused"')
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_the_stats_show_the_connection_settings(self):
+        data = self.stats()
+        self.assertLessEqual({"pid", "conn_max_age", "health_checks", "pool_size"}, set(data))
+
+    def test_other_users_are_refused(self):
+        authenticate(self.client, make_user(email="other@example.com", username="other"))
+        self.assertEqual(self.client.get(reverse("db-stats")).status_code, 403)
@@ -0,0 +1,220 @@
+"""
+Tests for `dashboard/summary/`, served from the `DashboardCounter` table
+that signals on Report, Task and Invoice keep current.
+
+Whatever path a change takes (the API, the ORM, a cascade), the counters
+must end up equal to a rebuild from the tables.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.dashboard import period
+from api.models import (
+    DashboardCounted,
+    DashboardCounter,
+    Inventory,
+    Invoice,
+    Owner,
+    Report,
+    Task,
+    TaskTemplate,
+    Vehicle,
+)
+from api.tests.helpers import authenticate, make_user
+
+
+class DashboardSummaryTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=self.owner, brand="Audi", model="A3", year=2015, license_plate="DB-1"
+        )
+        self.oil = TaskTemplate.objects.create(name="Oil change", price=Decimal("50.00"))
+        self.brakes = TaskTemplate.objects.create(name="Brakes", price=Decimal("120.00"))
+
+    def summary(self):
+        response = self.client.get(reverse("dashboard-summary"))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def create_report(self, status="pending", tasks=()):
+        response = self.client.post(
+            reverse("report-list"),
+            {"vehicle": self.vehicle.id, "status": status, "tasks": list(tasks)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Report.objects.get(pk=response.data["id"])
+
+    def assertMatchesRebuild(self):
+        def counters():
+            return {
+                (row.metric, row.key): row.value
+                for row in DashboardCounter.objects.exclude(value=0)
+            }
+
+        maintained = counters()
+        DashboardCounter.rebuild()
+        self.assertEqual(maintained, counters())
+
+    def test_reports_are_counted_per_status_as_they_move(self):
+        first = self.create_report()
+        self.create_report()
+        self.client.patch(
+            reverse("report-detail", kwargs={"pk": first.pk}),
+            {"status": "completed", "updated_at": first.updated_at},
+            format="json",
+        )
+
+        counts = self.summary()["reports_by_status"]
+
+        self.assertEqual(counts, {"pending": 1, "in_progress": 0, "completed": 1, "exported": 0})
+        Report.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.summary()["reports_by_status"]["completed"], 0)
+        self.assertMatchesRebuild()
+
+    def test_revenue_is_summed_per_month_for_the_last_twelve(self):
+        report = self.create_report(tasks=[self.oil.id, self.brakes.id])
+        Invoice.objects.create(invoice_number="INV-1", report=report)
+        Invoice.objects.create(
+            invoice_number="INV-OLD",
+            report=report,
+            issued_date=timezone.now() - timedelta(days=800),
+        )
+
+        revenue = self.summary()["revenue"]
+
+        self.assertEqual(len(revenue), 12)
+        self.assertEqual(revenue[-1]["period"], period(timezone.now()))
+        # 170.00 net plus 20% VAT
+        self.assertEqual(revenue[-1]["invoices"], 1)
+        self.assertEqual(Decimal(str(revenue[-1]["gross_total"])), Decimal("204.00"))
+        self.assertEqual(sum(row["invoices"] for row in revenue), 1)
+        self.assertMatchesRebuild()
+
+    def test_task_templates_are_ranked_by_use(self):
+        self.create_report(tasks=[self.oil.id, self.brakes.id])
+        report = self.create_report(tasks=[self.oil.id])
+        Task.objects.create(report=report, task_template=self.oil)
+
+        top = self.summary()["top_task_templates"]
+
+        self.assertEqual(
+            top,
+            [
+                {"id": self.oil.id, "name": "Oil change", "uses": 3},
+                {"id": self.brakes.id, "name": "Brakes", "uses": 1},
+            ],
+        )
+        self.assertMatchesRebuild()
+
+    def test_replacing_and_deleting_tasks_moves_the_template_counts(self):
+        report = self.create_report(tasks=[self.oil.id, self.oil.id])
+        report.refresh_from_db()
+        self.client.patch(
+            reverse("report-detail", kwargs={"pk": report.pk}),
+            {"tasks": [self.brakes.id], "updated_at": report.updated_at},
+            format="json",
+        )
+        self.assertEqual([row["name"] for row in self.summary()["top_task_templates"]], ["Brakes"])
+
+        self.brakes.delete()
+
+        self.assertEqual(self.summary()["top_task_templates"], [])
+        self.assertMatchesRebuild()
+
+    def test_deleting_a_vehicle_uncounts_its_reports_and_invoices(self):
+        report = self.create_report(status="exported", tasks=[self.oil.id])
+        Invoice.objects.create(invoice_number="INV-1", report=report)
+
+        self.vehicle.delete()
+
+        data = self.summary()
+        self.assertEqual(sum(data["reports_by_status"].values()), 0)
+        self.assertEqual(sum(row["invoices"] for row in data["revenue"]), 0)
+        self.assertEqual(data["top_task_templates"], [])
+        self.assertMatchesRebuild()
+
+    def test_partial_and_deferred_saves_are_counted(self):
+        report = self.create_report()
+        invoice = Invoice.objects.create(invoice_number="INV-1", report=report)
+
+        partial = Report.objects.only("id").get(pk=report.pk)
+        partial.status = "completed"
+        partial.save(update_fields=["status"])
+        deferred = Invoice.objects.defer("gross_total").get(pk=invoice.pk)
+        deferred.issued_date = timezone.now() - timedelta(days=40)
+        deferred.save()
+
+        self.assertEqual(self.summary()["reports_by_status"]["completed"], 1)
+        self.assertMatchesRebuild()
+        Report.objects.only("id").get(pk=report.pk).delete()
+        self.assertEqual(self.summary()["reports_by_status"]["completed"], 0)
+        self.assertMatchesRebuild()
+
+    def test_loading_rows_does_not_compute_their_counts(self):
+        self.create_report()
+        with mock.patch.object(Report, "dashboard_counts") as dashboard_counts:
+            self.client.get(reverse("report-list"))
+        dashboard_counts.assert_not_called()
+
+    def test_counted_models_must_say_what_they_count(self):
+        with self.assertRaises(TypeError):
+
+            class Uncounted(DashboardCounted):
+                dashboard_fields = ("status",)
+
+    def test_items_to_reorder_are_listed_lowest_stock_first(self):
+        # (quantity, reorder level): parts 1, 3, 4 and 5 are at or below it
+        levels = [(40, 10), (3, 5), (12, 5), (0, 0), (7, 8), (25, 30)]
+        for index, (quantity, level) in enumerate(levels):
+            Inventory.objects.create(
+                name=f"Part {index}",
+                reference_code=f"P-{index}",
+                quantity_in_stock=quantity,
+                reorder_level=level,
+                unit_price=1,
+            )
+
+        low_stock = self.summary()["low_stock"]
+
+        self.assertEqual([row["name"] for row in low_stock], [f"Part {i}" for i in (3, 1, 4, 5)])
+
+    def test_the_summary_costs_the_same_for_one_report_and_for_many(self):
+        self.create_report(tasks=[self.oil.id])
+        with CaptureQueriesContext(connection) as one:
+            self.summary()
+
+        for status in ["pending", "completed", "exported"] * 5:
+            self.create_report(status=status, tasks=[self.oil.id, self.brakes.id])
+        with CaptureQueriesContext(connection) as many:
+            self.summary()
+
+        self.assertEqual(len(many), len(one))
+
+    def test_the_migration_backfill_counts_as_a_rebuild_does(self):
+        report = self.create_report(status="completed", tasks=[self.oil.id, self.brakes.id])
+        Invoice.objects.create(invoice_number="INV-1", report=report)
+        backfill = import_module("api.migrations.0017_dashboard_counters")
+
+        DashboardCounter.objects.all().delete()
+        backfill.count_existing_objects(apps, None)
+
+        self.assertMatchesRebuild()
+
+    def test_anonymous_requests_are_rejected(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("dashboard-summary"))
+        self.assertEqual(response.status_code, 401)
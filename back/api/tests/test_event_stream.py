@@ -0,0 +1,159 @@
+"""
+Tests for the event stream (`/api/events/`, `api/services/events.py`).
+
+The stream is an async view: these tests drive it with Django's AsyncClient,
+which hands it an ASGI request, and read its first events. Each stream is
+opened with a ticket from `/api/events/ticket/`. Outside a test the
+broadcaster is woken by commits; a TestCase never commits, so the tests that
+wait for a pushed event poll the change log instead.
+"""
+
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Inventory, Invoice, Owner, Report, Vehicle
+from api.services.changes import start_cursor
+from api.services.events import redeem_ticket
+from api.tests.helpers import make_user
+from api.views import broadcaster
+
+settled_at_once = mock.patch("api.services.changes.SETTLE", timedelta(0))
+
+
+class BroadcasterTests(APITestCase):
+    def setUp(self):
+        broadcaster.cursor, broadcaster.delivered = None, set()
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="EV-1"
+        )
+        self.user = make_user()
+
+    def test_each_change_is_pushed_once_and_only_for_pushed_kinds(self):
+        broadcaster.cursor = start_cursor()
+        report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        Owner.objects.create(first_name="Alan", last_name="Turing")
+
+        messages, more = broadcaster.collect()
+
+        self.assertFalse(more)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("event: change", messages[0])
+        self.assertIn(f'"type":"report","id":{report.pk},"action":"created"', messages[0])
+        self.assertEqual(broadcaster.collect(), ([], False))
+
+    def test_stock_moves_and_new_invoices_are_pushed(self):
+        item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+        report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        with settled_at_once:
+            broadcaster.cursor = start_cursor()
+        Inventory.objects.withdraw(item.pk, 2)
+        Invoice.objects.create(invoice_number="INV-EV-1", report=report)
+
+        messages, _ = broadcaster.collect()
+
+        self.assertEqual(len(messages), 2)
+        self.assertIn('"type":"inventory"', messages[0])
+        self.assertIn('"quantity_in_stock":"8.00"', messages[0])
+        self.assertIn('"type":"invoice"', messages[1])
+
+
+class EventStreamTests(APITestCase):
+    def setUp(self):
+        broadcaster.cursor, broadcaster.delivered = None, set()
+        self.user = make_user()
+        self.token = AccessToken.for_user(self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="EV-2"
+        )
+
+    def ticket(self):
+        """A fresh stream ticket for `self.user`."""
+        response = self.client.post(
+            reverse("events-ticket"), headers={"Authorization": f"Bearer {self.token}"}
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data["ticket"]
+
+    async def next_event(self, events):
+        """The next event that is not the reconnect delay or a keepalive."""
+        while True:
+            chunk = (await asyncio.wait_for(anext(events), 5)).decode()
+            if not chunk.startswith(("retry:", ":")):
+                return chunk
+
+    def test_a_ticket_lasts_as_long_as_the_access_token(self):
+        response = self.client.post(
+            reverse("events-ticket"), headers={"Authorization": f"Bearer {self.token}"}
+        )
+
+        self.assertEqual(response.data["expires_in"], 30)
+        self.assertEqual(
+            redeem_ticket(response.data["ticket"]),
+            {"user": self.user.pk, "expires_at": self.token["exp"]},
+        )
+
+    def test_a_ticket_is_used_once(self):
+        ticket = self.ticket()
+
+        self.assertIsNotNone(redeem_ticket(ticket))
+        self.assertIsNone(redeem_ticket(ticket))
+
+    def test_only_an_authenticated_user_gets_a_ticket(self):
+        self.assertEqual(self.client.post(reverse("events-ticket")).status_code, 401)
+
+    async def test_a_valid_ticket_is_required(self):
+        response = await AsyncClient().get(reverse("events"), {"ticket": "garbage"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_an_access_token_does_not_open_a_stream(self):
+        response = await AsyncClient().get(reverse("events"), {"token": str(self.token)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_the_wsgi_server_does_not_serve_streams(self):
+        response = self.client.get(reverse("events"), {"ticket": self.ticket()})
+        self.assertEqual(response.status_code, 501)
+
+    @settled_at_once
+    async def test_a_reconnect_replays_what_changed_since_its_cursor(self):
+        cursor = await sync_to_async(start_cursor)()
+        report = await Report.objects.acreate(vehicle=self.vehicle, user=self.user)
+        ticket = await sync_to_async(self.ticket)()
+
+        response = await AsyncClient().get(
+            reverse("events"), {"ticket": ticket}, headers={"Last-Event-ID": str(cursor)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        try:
+            message = await self.next_event(events)
+        finally:
+            await events.aclose()
+
+        self.assertIn(f'"type":"report","id":{report.pk}', message)
+
+    @settled_at_once
+    @override_settings(EVENTS_POLL_INTERVAL=0.05)
+    async def test_changes_made_while_connected_are_pushed(self):
+        ticket = await sync_to_async(self.ticket)()
+        response = await AsyncClient().get(reverse("events"), {"ticket": ticket})
+        events = aiter(response.streaming_content)
+        try:
+            await asyncio.wait_for(anext(events), 5)  # the reconnect delay
+            await asyncio.sleep(0.2)  # let the broadcaster take its starting cursor
+            report = await Report.objects.acreate(vehicle=self.vehicle, user=self.user)
+            message = await self.next_event(events)
+        finally:
+            await events.aclose()
+
+        self.assertIn(f'"type":"report","id":{report.pk},"action":"created"', message)
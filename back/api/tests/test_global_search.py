@@ -0,0 +1,74 @@
+"""
+Tests for the global search endpoint (`search/`) and the `SearchIndexEntry`
+table behind it, which signals keep in step with owners, vehicles, invoices
+and inventory.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Invoice, Owner, Report, SearchIndexEntry, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+class GlobalSearchTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=self.owner, brand="Audi", model="A3", year=2015, license_plate="VD 12 345"
+        )
+        report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        self.invoice = Invoice.objects.create(invoice_number="INV-2024-007", report=report)
+        self.item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1207", quantity_in_stock=1, unit_price=8
+        )
+
+    def search(self, q, **params):
+        response = self.client.get(reverse("search"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(hit["type"], hit["id"]) for hit in response.data["results"]]
+
+    def test_each_kind_is_found_by_its_identifier(self):
+        self.assertEqual(self.search("lovel"), [("owner", self.owner.id)])
+        self.assertEqual(self.search("vd1234"), [("vehicle", self.vehicle.id)])
+        self.assertEqual(self.search("inv-2024-0"), [("invoice", self.invoice.id)])
+        self.assertEqual(self.search("of12"), [("inventory", self.item.id)])
+
+    def test_hits_are_typed_and_labelled(self):
+        response = self.client.get(reverse("search"), {"q": "audi"})
+        self.assertEqual(
+            response.data["results"],
+            [{"type": "vehicle", "id": self.vehicle.id, "label": "VD 12 345 - Audi A3", "rank": 2}],
+        )
+
+    def test_exact_matches_rank_first_across_kinds(self):
+        other = Owner.objects.create(first_name="Adalbert", last_name="Audiard")
+        self.assertEqual(self.search("audi"), [("vehicle", self.vehicle.id), ("owner", other.id)])
+
+    def test_type_restricts_the_kinds(self):
+        Owner.objects.create(first_name="Oliver", last_name="Filter")
+        self.assertEqual(self.search("filter", type="inventory"), [("inventory", self.item.id)])
+
+    def test_a_search_is_a_single_query(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.search("ada love")
+        self.assertEqual(len(captured), 1)
+
+    def test_edits_and_deletes_reach_the_index(self):
+        self.vehicle.license_plate = "GE 99"
+        self.vehicle.save()
+        self.assertEqual(self.search("vd12"), [])
+        self.assertEqual(self.search("ge99"), [("vehicle", self.vehicle.id)])
+
+        self.owner.delete()
+
+        self.assertEqual(self.search("ge99"), [])
+        self.assertFalse(SearchIndexEntry.objects.filter(kind="invoice").exists())
+
+    def test_a_query_is_required(self):
+        response = self.client.get(reverse("search"))
+        self.assertEqual(response.status_code, 400)
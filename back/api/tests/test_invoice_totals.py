@@ -0,0 +1,143 @@
+"""
+Tests for the invoice totals snapshot and the invoice list built on it.
+
+Creating an `Invoice` freezes the report's tasks and parts into
+`InvoiceLine` rows and stores net/VAT/gross totals on the invoice, including
+the awkward rows: a task whose template was deleted (no price) and
+fractional part quantities. Later price changes must not reach it.
+"""
+
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import (
+    Inventory,
+    Invoice,
+    InvoiceLine,
+    Owner,
+    Part,
+    Report,
+    Task,
+    TaskTemplate,
+    Vehicle,
+)
+from api.tests.helpers import authenticate, make_user
+
+
+class InvoiceTotalsTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.template = TaskTemplate.objects.create(name="Oil change", price=Decimal("50.00"))
+        self.item = Inventory.objects.create(
+            name="Oil",
+            reference_code="OIL-1",
+            quantity_in_stock=Decimal("100.00"),
+            unit_price=Decimal("12.40"),
+        )
+        self.serial = 0
+
+    def make_invoice(self, tasks=(), parts=()):
+        self.serial += 1
+        vehicle = Vehicle.objects.create(
+            owner=self.owner,
+            brand="Audi",
+            model="A3",
+            year=2015,
+            license_plate=f"TOT-{self.serial}",
+        )
+        report = Report.objects.create(vehicle=vehicle, user=self.user, status="exported")
+        for template in tasks:
+            Task.objects.create(report=report, task_template=template)
+        for quantity in parts:
+            Part.objects.create(report=report, part=self.item, quantity_used=Decimal(quantity))
+        return Invoice.objects.create(invoice_number=f"INV-T{self.serial}", report=report)
+
+    def test_creating_an_invoice_stores_its_totals(self):
+        invoice = self.make_invoice(tasks=[self.template, None], parts=["1.50", "2.00"])
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.net_total, Decimal("93.40"))
+        self.assertEqual(invoice.vat_total, Decimal("18.68"))
+        self.assertEqual(invoice.gross_total, Decimal("112.08"))
+        self.assertEqual(invoice.total_cost, invoice.net_total)
+
+    def test_creating_an_invoice_freezes_its_lines(self):
+        invoice = self.make_invoice(tasks=[self.template, None], parts=["1.50"])
+
+        lines = list(invoice.lines.values_list("kind", "name", "quantity", "net", "gross"))
+
+        self.assertEqual(
+            lines,
+            [
+                ("task", "Oil change", Decimal("1.00"), Decimal("50.00"), Decimal("60.00")),
+                ("part", "Oil", Decimal("1.50"), Decimal("18.60"), Decimal("22.32")),
+            ],
+        )
+
+    def test_later_price_changes_do_not_alter_an_issued_invoice(self):
+        invoice = self.make_invoice(tasks=[self.template], parts=["1.00"])
+
+        TaskTemplate.objects.update(price=Decimal("999.00"))
+        Inventory.objects.update(unit_price=Decimal("999.00"))
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.net_total, Decimal("62.40"))
+        self.assertEqual(
+            sorted(InvoiceLine.objects.values_list("unit_price", flat=True)),
+            [Decimal("12.40"), Decimal("50.00")],
+        )
+
+    def test_saving_an_invoice_again_does_not_refreeze_it(self):
+        invoice = self.make_invoice(tasks=[self.template])
+        TaskTemplate.objects.update(price=Decimal("999.00"))
+
+        invoice.pdf_status = "ready"
+        invoice.save()
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.net_total, Decimal("50.00"))
+        self.assertEqual(invoice.lines.count(), 1)
+
+    def test_an_invoice_with_no_lines_totals_zero(self):
+        invoice = self.make_invoice()
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.gross_total, Decimal("0.00"))
+
+    def test_the_list_serializes_every_total(self):
+        self.make_invoice(tasks=[self.template])
+        row = self.client.get(reverse("invoice-list")).data[0]
+        self.assertEqual(Decimal(str(row["total_cost"])), Decimal("50.00"))
+        self.assertEqual(Decimal(str(row["net_total"])), Decimal("50.00"))
+        self.assertEqual(Decimal(str(row["vat_total"])), Decimal("10.00"))
+        self.assertEqual(Decimal(str(row["gross_total"])), Decimal("60.00"))
+
+    def test_listing_invoices_is_a_single_query(self):
+        for _ in range(3):
+            self.make_invoice(tasks=[self.template], parts=["1.00"])
+
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("invoice-list"))
+
+        self.assertEqual(len(captured), 1, [query["sql"] for query in captured])
+
+    def test_the_list_filters_on_the_gross_total(self):
+        cheap = self.make_invoice(parts=["1.00"])
+        self.make_invoice(tasks=[self.template, self.template])
+
+        response = self.client.get(reverse("invoice-list"), {"max_total": "20"})
+
+        self.assertEqual([row["id"] for row in response.data], [cheap.id])
+
+    def test_the_list_orders_by_the_gross_total(self):
+        dear = self.make_invoice(tasks=[self.template, self.template])
+        cheap = self.make_invoice(parts=["1.00"])
+
+        response = self.client.get(reverse("invoice-list"), {"ordering": "-gross_total"})
+
+        self.assertEqual([row["id"] for row in response.data], [dear.id, cheap.id])
@@ -0,0 +1,178 @@
+"""
+Tests for the DB-backed job queue (`api/services/jobs.py`).
+
+The render handler itself is exercised end to end by
+`test_reportviewset.test_update_triggers_invoice`; these tests pin the queue
+mechanics around it - claiming, retry with backoff, the invoice's
+`pdf_status` once retries run out, and the recovery of jobs whose worker
+died. The last of those kills a real pool process, hence its
+TransactionTestCase.
+"""
+
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Invoice, Job, Owner, Report, Vehicle
+from api.services import jobs
+from api.services.invoices import generate_invoice
+from api.tests.helpers import authenticate, make_user
+
+
+def die(job):
+    """A handler that kills the process running it, as the OOM killer would."""
+    os._exit(1)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="JOB-1"
+        )
+        self.report = Report.objects.create(vehicle=vehicle, user=make_user(), status="exported")
+
+    def test_generating_an_invoice_queues_its_render(self):
+        invoice = generate_invoice(self.report)
+
+        self.assertEqual(invoice.pdf_status, "pending_pdf")
+        job = Job.objects.get()
+        self.assertEqual(job.kind, "render_invoice_pdf")
+        self.assertEqual(job.payload, {"invoice_id": invoice.id})
+        self.assertEqual(job.status, "queued")
+
+    def test_claim_skips_jobs_that_are_not_due(self):
+        jobs.enqueue("render_invoice_pdf", invoice_id=1)
+        Job.objects.update(run_after=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(jobs.claim(), [])
+
+    def test_claim_marks_the_job_running_and_counts_the_attempt(self):
+        jobs.enqueue("render_invoice_pdf", invoice_id=1)
+
+        (job,) = jobs.claim()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "running")
+        self.assertEqual(job.attempts, 1)
+
+    def test_a_failed_attempt_is_requeued_with_a_backoff(self):
+        invoice = generate_invoice(self.report)
+        (job,) = jobs.claim()
+
+        with mock.patch("api.services.invoices.render_pdf", side_effect=OSError("boom")):
+            self.assertEqual(jobs.run(job), "queued")
+
+        job.refresh_from_db()
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn("boom", job.last_error)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, "pending_pdf")
+
+    def test_the_last_failed_attempt_marks_the_invoice_failed(self):
+        invoice = generate_invoice(self.report)
+        Job.objects.update(max_attempts=1)
+        (job,) = jobs.claim()
+
+        with mock.patch("api.services.invoices.render_pdf", side_effect=OSError("boom")):
+            self.assertEqual(jobs.run(job), "failed")
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, "failed")
+        self.assertFalse(invoice.pdf)
+
+    def test_unknown_job_kinds_are_refused_at_enqueue_time(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("no_such_job")
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_pending_drains_the_queue(self):
+        generate_invoice(self.report)
+
+        self.assertEqual(jobs.run_pending(), 1)
+
+        self.assertEqual(Job.objects.get().status, "done")
+        self.assertEqual(Invoice.objects.get().pdf_status, "ready")
+
+    @override_settings(JOB_LEASE_SECONDS=60)
+    def test_a_running_job_is_claimed_again_once_its_lease_runs_out(self):
+        jobs.enqueue("render_invoice_pdf", invoice_id=1)
+        jobs.claim()
+        self.assertEqual(jobs.claim(), [])
+
+        Job.objects.update(updated_at=timezone.now() - timedelta(seconds=61))
+        (job,) = jobs.claim()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("running", 2))
+
+    @override_settings(JOB_LEASE_SECONDS=60)
+    def test_an_expired_last_attempt_fails_the_job_and_the_invoice(self):
+        invoice = generate_invoice(self.report)
+        Job.objects.update(max_attempts=1)
+        jobs.claim()
+        Job.objects.update(updated_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(jobs.claim(), [])
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("stopped before it finished", job.last_error)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, "failed")
+
+
+class InvoicePdfApiTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="JOB-3"
+        )
+        self.report = Report.objects.create(vehicle=vehicle, user=self.user, status="exported")
+
+    def test_the_pdf_status_cannot_be_patched(self):
+        invoice = generate_invoice(self.report)
+
+        response = self.client.patch(
+            reverse("invoice-detail", args=[invoice.pk]), {"pdf_status": "ready"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["pdf_status"], "pending_pdf")
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, "pending_pdf")
+
+    def test_an_invoice_posted_to_the_list_queues_its_render(self):
+        response = self.client.post(
+            reverse("invoice-list"),
+            {"invoice_number": "INV-POST-1", "report": self.report.pk, "pdf_status": "ready"},
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["pdf_status"], "pending_pdf")
+        job = Job.objects.get()
+        self.assertEqual(job.kind, "render_invoice_pdf")
+        self.assertEqual(job.payload, {"invoice_id": response.data["id"]})
+
+
+class JobPoolCrashTests(TransactionTestCase):
+    def test_a_dead_render_process_requeues_its_job_and_the_worker_carries_on(self):
+        jobs.enqueue("render_invoice_pdf", invoice_id=1)
+        jobs.enqueue("render_invoice_pdf", invoice_id=2)
+
+        with mock.patch.dict(jobs.HANDLERS, {"render_invoice_pdf": "api.tests.test_jobs.die"}):
+            call_command("run_jobs", "--once", "--processes", "2", stdout=StringIO())
+
+        for job in Job.objects.all():
+            self.assertEqual((job.status, job.attempts), ("queued", 1))
+            self.assertIn("BrokenProcessPool", job.last_error)
+            self.assertGreater(job.run_after, timezone.now())
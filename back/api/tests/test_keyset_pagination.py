@@ -0,0 +1,137 @@
+"""
+Tests for the opt-in `?cursor=` mode of `OptionalPaginationMixin`
+(`KeysetPagination` in `api/pagination.py`).
+
+Walking every page must visit each row exactly once, in list order with `id`
+breaking ties; and a deep page must cost the same number of queries as the
+first one, each of them a range read of an index rather than a sort.
+"""
+
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Invoice, Owner, Report, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        # Repeated brand/model pairs, so the id tie-breaker matters
+        for index in range(12):
+            vehicle = Vehicle.objects.create(
+                owner=owner,
+                brand=["Audi", "BMW", "Audi"][index % 3],
+                model=["A3", "X5"][index % 2],
+                year=2015,
+                license_plate=f"KS-{index}",
+            )
+            report = Report.objects.create(vehicle=vehicle, user=self.user)
+            Invoice.objects.create(invoice_number=f"INV-K{index}", report=report)
+        Invoice.objects.filter(invoice_number__in=["INV-K1", "INV-K2"]).update(
+            gross_total=Decimal("10.00")
+        )
+
+    def walk(self, url, **params):
+        ids, pages = [], 0
+        response = self.client.get(url, {"cursor": "", "limit": 5, **params})
+        while True:
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [row["id"] for row in response.data["results"]]
+            pages += 1
+            if response.data["next"] is None:
+                return ids, pages
+            response = self.client.get(response.data["next"])
+
+    def test_walking_the_pages_visits_every_row_once_in_order(self):
+        url = reverse("report-list")
+        expected = list(
+            Report.objects.order_by("vehicle__brand", "vehicle__model", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+        ids, pages = self.walk(url)
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_descending_orderings_walk_backwards_through_ties(self):
+        url = reverse("invoice-list")
+        expected = list(
+            Invoice.objects.order_by("-gross_total", "-id").values_list("id", flat=True)
+        )
+
+        ids, _ = self.walk(url, ordering="-gross_total")
+
+        self.assertEqual(ids, expected)
+
+    def test_the_count_is_only_computed_on_request(self):
+        url = reverse("inventory-list")
+        Inventory.objects.create(
+            name="Oil", reference_code="OIL-1", quantity_in_stock=1, unit_price=1
+        )
+
+        self.assertNotIn("count", self.client.get(url, {"cursor": ""}).data)
+        self.assertEqual(self.client.get(url, {"cursor": "", "count": "true"}).data["count"], 1)
+
+    def test_a_deep_page_costs_the_same_as_the_first(self):
+        url = reverse("report-list")
+        first = self.client.get(url, {"cursor": "", "limit": 2})
+        with CaptureQueriesContext(connection) as page_one:
+            self.client.get(url, {"cursor": "", "limit": 2})
+
+        response = first
+        for _ in range(4):
+            response = self.client.get(response.data["next"])
+        with CaptureQueriesContext(connection) as page_six:
+            self.client.get(response.data["next"])
+
+        self.assertEqual(len(page_six), len(page_one))
+        self.assertFalse(any("OFFSET" in query["sql"] for query in page_six))
+        self.assertFalse(any("COUNT(" in query["sql"] for query in page_six))
+
+    def test_a_garbled_cursor_is_rejected(self):
+        response = self.client.get(reverse("report-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_a_cursor_from_another_ordering_is_rejected(self):
+        url = reverse("invoice-list")
+        next_url = self.client.get(url, {"cursor": "", "limit": 2}).data["next"]
+
+        response = self.client.get(next_url + "&ordering=-gross_total")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_a_deep_report_page_is_read_off_the_index_without_sorting(self):
+        url = reverse("report-list")
+        response = self.client.get(url, {"cursor": "", "limit": 2})
+        for _ in range(3):
+            response = self.client.get(response.data["next"])
+        with CaptureQueriesContext(connection) as page:
+            self.client.get(response.data["next"])
+
+        (sql,) = (query["sql"] for query in page if "LIMIT" in query["sql"])
+        prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            plan = " ".join(str(row) for row in cursor.fetchall())
+
+        self.assertIn(Report._meta.indexes[0].name, plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertNotIn("filesort", plan)
+
+    def test_renaming_a_vehicle_moves_its_reports_in_the_list(self):
+        vehicle = Report.objects.order_by("id").first().vehicle
+        vehicle.brand = "Alfa Romeo"
+        vehicle.save()
+
+        first = self.client.get(reverse("report-list"), {"cursor": "", "limit": 1})
+
+        self.assertEqual(first.data["results"][0]["vehicle"], vehicle.pk)
@@ -0,0 +1,77 @@
+"""
+Tests for the bare-array mode of `OptionalPaginationMixin` on large lists.
+
+Lists longer than `LIST_STREAM_CHUNK_SIZE` are streamed in chunks, lists
+longer than `LIST_MAX_ROWS` are refused, and short lists are the plain
+response they always were.
+"""
+
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+@override_settings(LIST_STREAM_CHUNK_SIZE=2, LIST_MAX_ROWS=5)
+class ListStreamingTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.item = Inventory.objects.create(
+            name="Oil", reference_code="OIL-1", quantity_in_stock=100, unit_price=8
+        )
+
+    def make_reports(self, count):
+        for index in range(count):
+            vehicle = Vehicle.objects.create(
+                owner=self.owner, brand="Audi", model="A3", year=2015, license_plate=f"ST-{index}"
+            )
+            report = Report.objects.create(vehicle=vehicle, user=self.user)
+            Part.objects.create(report=report, part=self.item, quantity_used=1)
+
+    def test_a_short_list_is_a_plain_response(self):
+        self.make_reports(2)
+
+        response = self.client.get(reverse("report-list"))
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 2)
+
+    def test_a_long_list_is_streamed_as_one_json_array(self):
+        self.make_reports(5)
+
+        response = self.client.get(reverse("report-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            [row["id"] for row in rows],
+            list(
+                Report.objects.order_by("vehicle__brand", "vehicle__model").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.assertTrue(all(len(row["parts_data"]) == 1 for row in rows))
+
+    def test_a_list_over_the_cap_is_refused(self):
+        self.make_reports(6)
+
+        response = self.client.get(reverse("report-list"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit/offset or cursor", response.data["detail"])
+
+    def test_paginated_modes_are_not_capped(self):
+        self.make_reports(6)
+
+        response = self.client.get(reverse("report-list"), {"limit": 10})
+
+        self.assertEqual(len(response.data["results"]), 6)
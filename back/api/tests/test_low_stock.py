@@ -0,0 +1,104 @@
+"""
+Tests for the stored `Inventory.low_stock` flag (quantity at or below
+`reorder_level`) and the `?low_stock=true` inventory filter.
+
+The flag is recomputed inside the same UPDATE that moves stock, so it must
+follow every path that moves it: `Part.save`/`Part.delete`, the report
+endpoints, and edits to the item itself.
+"""
+
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+class LowStockTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="LS-1"
+        )
+        self.report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        self.item = Inventory.objects.create(
+            name="Oil filter",
+            reference_code="OF-1",
+            quantity_in_stock=10,
+            reorder_level=4,
+            unit_price=8,
+        )
+
+    def is_low(self):
+        return Inventory.objects.get(pk=self.item.pk).low_stock
+
+    def test_the_flag_is_set_when_the_item_is_created(self):
+        self.assertFalse(self.item.low_stock)
+        empty = Inventory.objects.create(
+            name="Wiper", reference_code="WP-1", quantity_in_stock=0, unit_price=5
+        )
+        self.assertTrue(Inventory.objects.get(pk=empty.pk).low_stock)
+
+    def test_parts_flag_and_unflag_the_item_as_they_move_stock(self):
+        part = Part.objects.create(report=self.report, part=self.item, quantity_used=5)
+        self.assertFalse(self.is_low())
+
+        part.quantity_used = Decimal("6.00")
+        part.save()
+        self.assertTrue(self.is_low())
+
+        part.delete()
+        self.assertFalse(self.is_low())
+
+    def test_report_endpoints_keep_the_flag_current(self):
+        response = self.client.post(
+            reverse("report-list"),
+            {
+                "vehicle": self.vehicle.id,
+                "status": "pending",
+                "parts": [{"part": self.item.id, "quantity_used": "7.00"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(self.is_low())
+
+        self.client.delete(reverse("report-detail", kwargs={"pk": response.data["id"]}))
+        self.assertFalse(self.is_low())
+
+    def test_changing_the_reorder_level_recomputes_the_flag(self):
+        response = self.client.patch(
+            reverse("inventory-detail", kwargs={"pk": self.item.pk}),
+            {"reorder_level": "10.00", "updated_at": self.item.updated_at},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(response.data["low_stock"])
+        self.assertTrue(self.is_low())
+
+    def test_saving_only_the_quantity_also_saves_the_flag(self):
+        self.item.quantity_in_stock = 2
+        self.item.save(update_fields=["quantity_in_stock"])
+        self.assertTrue(self.is_low())
+
+    def test_the_filter_lists_only_items_to_reorder(self):
+        Inventory.objects.create(
+            name="Brake pad", reference_code="BP-1", quantity_in_stock=1, unit_price=30
+        )
+        Inventory.objects.create(
+            name="Spark plug",
+            reference_code="SP-1",
+            quantity_in_stock=3,
+            reorder_level=5,
+            unit_price=4,
+        )
+
+        response = self.client.get(reverse("inventory-list"), {"low_stock": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["name"] for row in response.data], ["Spark plug"])
@@ -0,0 +1,77 @@
+"""
+Tests for the owner search (`OwnerFilter.full_name` / `search`), backed by
+the `OwnerSearchToken` table and `api.search.tokenize`.
+"""
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Owner, OwnerSearchToken
+from api.search import tokenize
+from api.tests.helpers import authenticate, make_user
+
+
+class TokenizeTests(SimpleTestCase):
+    def test_names_are_lower_cased_and_stripped_of_accents(self):
+        self.assertEqual(tokenize("Zoë", "Müller-Lüdenscheidt"), ["zoe", "muller", "ludenscheidt"])
+
+    def test_an_email_yields_its_parts(self):
+        self.assertEqual(
+            tokenize("ada.lovelace@example.com"), ["ada", "lovelace", "example", "com"]
+        )
+
+    def test_a_phone_number_also_yields_its_joined_digits(self):
+        self.assertEqual(tokenize("079 123 45 67"), ["079", "123", "45", "67", "0791234567"])
+
+
+class OwnerSearchTests(APITestCase):
+    def setUp(self):
+        authenticate(self.client, make_user())
+        self.ada = Owner.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", phone="079 123 45 67"
+        )
+        self.adam = Owner.objects.create(first_name="Adam", last_name="Smith")
+        self.love = Owner.objects.create(first_name="Grace", last_name="Lovell")
+
+    def search(self, value, **params):
+        response = self.client.get(reverse("owner-list"), {"search": value, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data]
+
+    def test_words_match_across_first_and_last_name(self):
+        self.assertEqual(self.search("ada love"), [self.ada.id])
+        self.assertEqual(self.search("love ada"), [self.ada.id])
+
+    def test_exact_words_rank_above_prefixes(self):
+        self.assertEqual(self.search("ada"), [self.ada.id, self.adam.id])
+
+    def test_email_and_phone_are_searchable(self):
+        self.assertEqual(self.search("ada@example"), [self.ada.id])
+        self.assertEqual(self.search("0791234"), [self.ada.id])
+
+    def test_an_explicit_ordering_wins_over_the_rank(self):
+        ids = self.search("love", ordering="-full_name")
+        self.assertEqual(ids, [self.love.id, self.ada.id])
+
+    def test_full_name_runs_the_same_search(self):
+        response = self.client.get(reverse("owner-list"), {"full_name": "ADA lov"})
+        self.assertEqual([row["id"] for row in response.data], [self.ada.id])
+
+    def test_renaming_an_owner_reindexes_it(self):
+        self.ada.last_name = "Byron"
+        self.ada.save()
+
+        self.assertEqual(self.search("lovelace"), [])
+        self.assertEqual(self.search("byron"), [self.ada.id])
+
+    def test_unrelated_updates_leave_the_tokens_alone(self):
+        before = list(OwnerSearchToken.objects.filter(owner=self.ada).values_list("id", flat=True))
+
+        self.ada.address = "12 St James's Square"
+        self.ada.save(update_fields=["address", "updated_at"])
+
+        self.assertEqual(
+            list(OwnerSearchToken.objects.filter(owner=self.ada).values_list("id", flat=True)),
+            before,
+        )
@@ -103,3 +103,30 @@ class TestOwnerAPI(TestCase):
         self.assertEqual(response.status_code, 204)
         # Check that the owner is actually deleted
         self.assertFalse(Owner.objects.filter(pk=owner.pk).exists())
+
+    def test_full_name_is_stored_and_follows_renames(self):
+        """
+        The stored full_name is kept in step by Owner.save(), including
+        saves limited by update_fields.
+        """
+        owner = Owner.objects.create(first_name=" Ada ", last_name="Lovelace")
+        self.assertEqual(Owner.objects.get(pk=owner.pk).full_name, "Ada Lovelace")
+
+        owner.last_name = "Byron"
+        owner.save(update_fields=["last_name"])
+
+        self.assertEqual(Owner.objects.get(pk=owner.pk).full_name, "Ada Byron")
+        response = self.client.get(reverse("owner-detail", args=[owner.id]))
+        self.assertEqual(response.data["full_name"], "Ada Byron")
+
+    def test_ordering_by_full_name_uses_the_stored_column(self):
+        """
+        ?ordering=full_name sorts on the indexed column, with id breaking ties.
+        """
+        zoe = Owner.objects.create(first_name="Zoe", last_name="Adams")
+        first = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        second = Owner.objects.create(first_name="Ada", last_name="Lovelace", email="a@b.ch")
+
+        response = self.client.get(reverse("owner-list"), {"ordering": "-full_name"})
+
+        self.assertEqual([row["id"] for row in response.data], [zoe.id, second.id, first.id])
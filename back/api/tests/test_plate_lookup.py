@@ -0,0 +1,62 @@
+"""
+Tests for the license plate lookups on `vehicles/`: the normalized
+`plate_key` column (prefix) and the `VehiclePlateTrigram` table (fuzzy).
+"""
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Owner, Vehicle, VehiclePlateTrigram
+from api.tests.helpers import authenticate, make_user
+
+
+class PlateLookupTests(APITestCase):
+    def setUp(self):
+        authenticate(self.client, make_user())
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+
+        def vehicle(plate):
+            return Vehicle.objects.create(
+                owner=owner, brand="Audi", model="A3", year=2015, license_plate=plate
+            )
+
+        self.vd = vehicle("VD 12 345")
+        self.vd_other = vehicle("VD-12-999")
+        self.ge = vehicle("GE 771 02")
+
+    def lookup(self, **params):
+        response = self.client.get(reverse("vehicle-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data]
+
+    def test_the_plate_key_drops_case_and_separators(self):
+        self.assertEqual(Vehicle.objects.get(pk=self.vd.pk).plate_key, "vd12345")
+
+    def test_prefix_lookups_ignore_formatting(self):
+        self.assertEqual(
+            sorted(self.lookup(license_plate__startswith="vd 12")),
+            [self.vd.id, self.vd_other.id],
+        )
+        self.assertEqual(self.lookup(license_plate__startswith="VD12-3"), [self.vd.id])
+
+    def test_fuzzy_lookups_find_partial_and_mistyped_plates(self):
+        self.assertEqual(self.lookup(license_plate__fuzzy="12345"), [self.vd.id])
+        self.assertEqual(self.lookup(license_plate__fuzzy="VD 12 354")[0], self.vd.id)
+        self.assertEqual(self.lookup(license_plate__fuzzy="zh 4"), [])
+
+    def test_exact_lookups_are_unchanged(self):
+        self.assertEqual(self.lookup(license_plate="GE 771 02"), [self.ge.id])
+
+    def test_changing_the_plate_rebuilds_its_trigrams(self):
+        self.ge.license_plate = "ZH 1"
+        self.ge.save(update_fields=["license_plate"])
+
+        self.assertEqual(Vehicle.objects.get(pk=self.ge.pk).plate_key, "zh1")
+        self.assertEqual(
+            sorted(
+                VehiclePlateTrigram.objects.filter(vehicle=self.ge).values_list(
+                    "trigram", flat=True
+                )
+            ),
+            sorted(["  z", " zh", "zh1", "h1 "]),
+        )
@@ -15,6 +15,7 @@ from django.urls import reverse
 from rest_framework.test import APITestCase
 
 from api.models import (
+    DashboardCounter,
     Inventory,
     Invoice,
     Owner,
@@ -117,18 +118,81 @@ class ListQueryCountTests(APITestCase):
         report = self.build_report()
         url = reverse("report-detail", kwargs={"pk": report.pk})
         data = {"status": "in_progress", "updated_at": report.updated_at}
+        # The dashboard counter the report moves to, so it is bumped, not created
+        DashboardCounter.objects.create(metric="reports", key="in_progress")
 
         with CaptureQueriesContext(connection) as captured:
             response = self.client.patch(url, data, format="json")
             self.assertEqual(response.status_code, 200)
 
         # 7 queries for a single get_object() (select_related join plus two
-        # prefetch_related queries) followed by validation and the save.
+        # prefetch_related queries) followed by validation and the save,
+        # plus the SAVEPOINT/RELEASE pair of ReportSerializer.update's atomic
+        # block, plus the read of the stored status and the two dashboard
+        # counter UPDATEs for the status change, plus one change feed INSERT
+        # for each of the update's two saves.
         # Before the fix, ReportViewSet.update() called get_object() a second
-        # time, adding the join and both prefetches again for 11 total.
+        # time, adding the join and both prefetches again.
         self.assertEqual(
             len(captured),
-            7,
+            14,
             f"updating a report cost {len(captured)} queries; ReportViewSet.update "
             "must call get_object() only once",
         )
+
+
+class ReportPartsQueryCountTests(APITestCase):
+    """Saving a report's parts costs one stock UPDATE and one INSERT, not
+    a few queries per part."""
+
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="QC-P"
+        )
+        self.items = [
+            Inventory.objects.create(
+                name=f"Item {index}",
+                reference_code=f"IT-{index}",
+                quantity_in_stock=Decimal("1000.00"),
+                unit_price=Decimal("5.00"),
+            )
+            for index in range(30)
+        ]
+        # Creates the pending-reports dashboard counter, which the first POST
+        # would otherwise pay for
+        Report.objects.create(vehicle=self.vehicle, user=self.user, status="pending")
+
+    def parts(self, count):
+        return [{"part": item.id, "quantity_used": "1.50"} for item in self.items[:count]]
+
+    def count_create(self, count):
+        data = {"vehicle": self.vehicle.id, "status": "pending", "parts": self.parts(count)}
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse("report-list"), data, format="json")
+            self.assertEqual(response.status_code, 201, response.data)
+        return len(captured)
+
+    def count_update(self, count):
+        report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        for item in self.items[:count]:
+            Part.objects.create(report=report, part=item, quantity_used=Decimal("1.00"))
+        report.refresh_from_db()
+        url = reverse("report-detail", kwargs={"pk": report.pk})
+        data = {"updated_at": report.updated_at, "parts": self.parts(count)}
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.patch(url, data, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+        return len(captured)
+
+    def test_creating_a_report_costs_the_same_for_one_part_and_for_thirty(self):
+        one = self.count_create(1)
+        thirty = self.count_create(30)
+        self.assertEqual(thirty, one, f"30 parts cost {thirty} queries and 1 part cost {one}")
+
+    def test_replacing_parts_costs_the_same_for_one_part_and_for_thirty(self):
+        one = self.count_update(1)
+        thirty = self.count_update(30)
+        self.assertEqual(thirty, one, f"30 parts cost {thirty} queries and 1 part cost {one}")
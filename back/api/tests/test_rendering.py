@@ -0,0 +1,65 @@
+"""
+Tests for the process-wide render caches in `api/services/rendering.py`.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import Invoice, Owner, Report, Vehicle
+from api.services import rendering
+from api.tests.helpers import make_user
+
+
+class FetchCacheTests(TestCase):
+    def setUp(self):
+        rendering.reset()
+        self.addCleanup(rendering.reset)
+
+    def test_a_local_file_is_read_once(self):
+        with mock.patch.object(
+            rendering, "default_url_fetcher", return_value={"string": b"<svg/>"}
+        ) as fetcher:
+            first = rendering.fetch("file:///static/image/logo-garage.svg")
+            second = rendering.fetch("file:///static/image/logo-garage.svg")
+
+        fetcher.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second, "callers must not share one mutable dict")
+
+    def test_remote_urls_are_not_cached(self):
+        with mock.patch.object(
+            rendering, "default_url_fetcher", return_value={"string": b""}
+        ) as fetcher:
+            rendering.fetch("https://example.com/logo.png")
+            rendering.fetch("https://example.com/logo.png")
+
+        self.assertEqual(fetcher.call_count, 2)
+
+    def test_reset_forgets_fetched_files(self):
+        with mock.patch.object(
+            rendering, "default_url_fetcher", return_value={"string": b""}
+        ) as fetcher:
+            rendering.fetch("file:///static/css/invoice_template.css")
+            rendering.reset()
+            rendering.fetch("file:///static/css/invoice_template.css")
+
+        self.assertEqual(fetcher.call_count, 2)
+
+
+class BenchInvoiceRenderTests(TestCase):
+    def test_the_benchmark_reports_both_modes(self):
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="BENCH-1"
+        )
+        report = Report.objects.create(vehicle=vehicle, user=make_user(), status="exported")
+        Invoice.objects.create(invoice_number="INV-BENCH", report=report)
+        out = StringIO()
+
+        call_command("bench_invoice_render", "--runs", "2", stdout=out)
+
+        self.assertIn("cold", out.getvalue())
+        self.assertIn("warm", out.getvalue())
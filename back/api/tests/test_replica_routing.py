@@ -0,0 +1,184 @@
+"""
+Tests for read-replica routing: `backend.db.router`, the list GETs that read
+through it (`ReplicaReadMixin`) and the read-your-writes pin
+(`ReadYourWritesMiddleware`).
+
+The suite has no second database, so these name the default alias as the
+replica: the router then returns "default" inside a replica read and None
+outside one, which tells the two apart, and `X-Read-From` says which the
+view chose.
+"""
+
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from backend.db.router import ReplicaRouter, read_alias, reading_from
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from api.middleware import ReadYourWritesMiddleware, reads_pinned
+from api.models import Inventory, Owner, Report, Vehicle
+from api.tests.helpers import authenticate, make_user
+from api.views import ReportViewSet
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_go_to_the_primary_outside_a_replica_block(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Report))
+
+    def test_reads_in_a_block_go_to_its_alias_and_writes_never_do(self):
+        router = ReplicaRouter()
+        with reading_from("replica"):
+            self.assertEqual(router.db_for_read(Report), "replica")
+            self.assertIsNone(router.db_for_write(Report))
+            with reading_from(None):
+                self.assertIsNone(router.db_for_read(Report))
+            self.assertEqual(read_alias(), "replica")
+        self.assertIsNone(read_alias())
+
+    def test_only_the_primary_is_migrated(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate("default", "api"))
+        self.assertFalse(router.allow_migrate("replica", "api"))
+
+
+@override_settings(REPLICA_DATABASE="default", REPLICA_PIN_SECONDS=60)
+class ReplicaReadTests(APITestCase):
+    def setUp(self):
+        caches["responses"].clear()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        for plate in ("AL-1", "AL-2", "AL-3"):
+            vehicle = Vehicle.objects.create(
+                owner=owner, brand="Audi", model="A3", year=2015, license_plate=plate
+            )
+            Report.objects.create(vehicle=vehicle, user=self.user)
+
+    def write(self):
+        response = self.client.post(
+            reverse("owner-list"), {"first_name": "Grace", "last_name": "Hopper"}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_the_lists_read_from_the_replica(self):
+        for name in ("report-list", "inventory-list", "invoice-list"):
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["X-Read-From"], "replica")
+
+    def test_a_writer_reads_from_the_primary_and_others_do_not(self):
+        self.write()
+
+        self.assertEqual(self.client.get(reverse("report-list"))["X-Read-From"], "primary")
+        authenticate(self.client, make_user(email="other@example.com", username="other"))
+        self.assertEqual(self.client.get(reverse("report-list"))["X-Read-From"], "replica")
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_the_pin_expires(self):
+        self.write()
+        self.assertEqual(self.client.get(reverse("report-list"))["X-Read-From"], "replica")
+
+    def test_lists_read_from_the_replica_are_not_cached(self):
+        self.assertEqual(self.client.get(reverse("inventory-list"))["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(reverse("inventory-list"))["X-Cache"], "MISS")
+
+    def test_a_writer_is_not_served_a_cached_list(self):
+        Inventory.objects.create(
+            name="Oil", reference_code="OIL-1", quantity_in_stock=100, unit_price=8
+        )
+        with override_settings(REPLICA_DATABASE=None):
+            self.assertEqual(self.client.get(reverse("inventory-list"))["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(reverse("inventory-list"))["X-Cache"], "HIT")
+
+        self.write()
+
+        self.assertEqual(self.client.get(reverse("inventory-list"))["X-Cache"], "MISS")
+
+    def record_reads(self):
+        """Patch the router to note where each read goes, into the list returned."""
+        seen = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            seen.append(db_for_read(router, model, **hints))
+            return seen[-1]
+
+        patch = mock.patch.object(ReplicaRouter, "db_for_read", autospec=True, side_effect=record)
+        patch.start()
+        self.addCleanup(patch.stop)
+        return seen
+
+    def test_every_read_of_a_streamed_list_goes_to_the_replica(self):
+        seen = self.record_reads()
+        with override_settings(LIST_STREAM_CHUNK_SIZE=1):
+            response = self.client.get(reverse("report-list"))
+            rows = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(seen)
+        self.assertEqual(set(seen), {"default"})
+
+    def test_the_async_list_reads_from_the_replica_too(self):
+        with override_settings(ASYNC_LIST_VIEWS=True):
+            view = ReportViewSet.as_view({"get": "list"})
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=self.user)
+
+        self.assertEqual(async_to_sync(view)(request)["X-Read-From"], "replica")
+
+    @override_settings(LIST_STREAM_CHUNK_SIZE=1)
+    def test_every_read_of_an_async_streamed_list_goes_to_the_replica(self):
+        with override_settings(ASYNC_LIST_VIEWS=True):
+            view = ReportViewSet.as_view({"get": "list"})
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=self.user)
+        seen = self.record_reads()
+
+        async def read(response):
+            return b"".join([piece async for piece in response.__aiter__()])
+
+        response = async_to_sync(view)(request)
+        rows = json.loads(async_to_sync(read)(response))
+
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(seen)
+        self.assertEqual(set(seen), {"default"})
+
+    def test_an_async_chain_is_pinned_too(self):
+        async def view(request):
+            return HttpResponse(status=201)
+
+        middleware = ReadYourWritesMiddleware(view)
+        request = RequestFactory().post("/")
+        request.user = self.user
+
+        async_to_sync(middleware)(request)
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertTrue(reads_pinned(self.user))
+
+    def test_other_routes_are_not_routed(self):
+        report = Report.objects.first()
+        response = self.client.get(reverse("report-detail", args=[report.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Read-From"))
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_without_a_replica_nothing_changes(self):
+        self.write()
+        response = self.client.get(reverse("report-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Read-From"))
+        self.assertIsNone(caches["responses"].get(f"replica-pin:{self.user.pk}"))
+
+    def test_anonymous_users_are_refused(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse("report-list")).status_code, 401)
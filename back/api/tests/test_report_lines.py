@@ -0,0 +1,108 @@
+"""
+Tests for updating a report's task and part lists (`api/services/lines.py`
+and `api/services/stock.py`).
+
+An update rewrites only the lines the client changed: untouched tasks and
+parts keep their primary keys, and a part whose quantity changed is updated
+in place rather than deleted and recreated.
+"""
+
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, Task, TaskTemplate, Vehicle
+from api.services.lines import diff
+from api.tests.helpers import authenticate, make_user
+
+
+class DiffTests(SimpleTestCase):
+    def test_duplicate_keys_are_matched_one_for_one(self):
+        removed, added = diff(["a", "a", "b"], ["a", "c", "a", "a"], key=str)
+        self.assertEqual(removed, ["b"])
+        self.assertEqual(added, ["c", "a"])
+
+
+class ReportLineUpdateTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="LN-1"
+        )
+        self.report = Report.objects.create(vehicle=vehicle, user=self.user)
+        self.oil_change = TaskTemplate.objects.create(name="Oil change", price=50)
+        self.brakes = TaskTemplate.objects.create(name="Brakes", price=120)
+        self.oil = Inventory.objects.create(
+            name="Oil", reference_code="OIL-1", quantity_in_stock=20, unit_price=8
+        )
+        self.pads = Inventory.objects.create(
+            name="Pads", reference_code="PAD-1", quantity_in_stock=20, unit_price=30
+        )
+        self.task = Task.objects.create(report=self.report, task_template=self.oil_change)
+        self.oil_part = Part.objects.create(report=self.report, part=self.oil, quantity_used=4)
+        self.pads_part = Part.objects.create(report=self.report, part=self.pads, quantity_used=2)
+
+    def patch(self, **data):
+        self.report.refresh_from_db()
+        url = reverse("report-detail", kwargs={"pk": self.report.pk})
+        response = self.client.patch(
+            url, {"updated_at": self.report.updated_at, **data}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_unchanged_lines_keep_their_ids(self):
+        self.patch(
+            tasks=[self.oil_change.id, self.brakes.id],
+            parts=[
+                {"part": self.oil.id, "quantity_used": "4.00"},
+                {"part": self.pads.id, "quantity_used": "2"},
+            ],
+        )
+
+        self.assertIn(self.task.id, self.report.task_set.values_list("id", flat=True))
+        self.assertEqual(
+            set(self.report.part_set.values_list("id", flat=True)),
+            {self.oil_part.id, self.pads_part.id},
+        )
+        self.assertEqual(self.report.task_set.count(), 2)
+
+    def test_a_changed_quantity_is_updated_in_place(self):
+        self.patch(
+            parts=[
+                {"part": self.oil.id, "quantity_used": "6"},
+                {"part": self.pads.id, "quantity_used": "2"},
+            ]
+        )
+
+        self.oil_part.refresh_from_db()
+        self.oil.refresh_from_db()
+        self.assertEqual(self.oil_part.quantity_used, Decimal("6"))
+        self.assertEqual(self.oil.quantity_in_stock, Decimal("14"))
+
+    def test_removed_lines_are_deleted_and_restocked(self):
+        self.patch(tasks=[], parts=[{"part": self.pads.id, "quantity_used": "2"}])
+
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertEqual(
+            list(self.report.part_set.values_list("id", flat=True)), [self.pads_part.id]
+        )
+        self.oil.refresh_from_db()
+        self.assertEqual(self.oil.quantity_in_stock, Decimal("20"))
+
+    def test_the_response_lists_the_updated_lines(self):
+        response = self.patch(
+            tasks=[self.brakes.id], parts=[{"part": self.oil.id, "quantity_used": "1"}]
+        )
+
+        self.assertEqual(
+            [task["task_template"] for task in response.data["tasks_data"]], [self.brakes.id]
+        )
+        self.assertEqual(
+            [(part["id"], part["quantity_used"]) for part in response.data["parts_data"]],
+            [(self.oil_part.id, "1.00")],
+        )
@@ -8,7 +8,10 @@ Covers:
 - Business logic such as invoice generation on report export
 """
 
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
@@ -111,9 +114,16 @@ class ReportViewSetTest(APITestCase):
         response = self.client.patch(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         invoice = Invoice.objects.get(report=self.report1)
-        self.assertTrue(invoice.pdf.name.endswith(".pdf"))
+        self.assertEqual(response.data["invoice"]["pdf_status"], "pending_pdf")
+        self.assertFalse(invoice.pdf)
         self.assertGreater(invoice.total_cost, 0)
 
+        call_command("run_jobs", "--once", "--processes", "1", stdout=StringIO())
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, "ready")
+        self.assertTrue(invoice.pdf.name.endswith(".pdf"))
+
     def test_get_tasks_for_report(self):
         """
         Test custom action to retrieve tasks associated with a report.
@@ -0,0 +1,111 @@
+"""
+Tests for the response cache in front of the inventory and task-template
+lists (`CachedListMixin`, `api/cache.py`).
+
+A cached list must never outlive a write to the rows it shows, whether the
+write goes through the model (`save`/`delete`) or through the stock UPDATEs
+of `Inventory.objects.withdraw/restock/move`.
+"""
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, TaskTemplate, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+        self.template = TaskTemplate.objects.create(name="Oil change", price=50)
+
+    def get(self, name, params=None):
+        return self.client.get(reverse(name), params or {})
+
+    def test_a_repeated_request_is_served_from_the_cache(self):
+        first = self.get("inventory-list")
+        second = self.get("inventory-list")
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_a_hit_runs_only_the_etag_query(self):
+        self.get("task-template-list")
+        with self.assertNumQueries(1):
+            response = self.get("task-template-list")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_each_query_string_has_its_own_entry(self):
+        Inventory.objects.create(
+            name="Air filter", reference_code="AF-1", quantity_in_stock=3, unit_price=12
+        )
+        self.get("inventory-list", {"ordering": "name"})
+
+        response = self.get("inventory-list", {"ordering": "-name"})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual([row["name"] for row in response.data], ["Oil filter", "Air filter"])
+        self.assertEqual(self.get("inventory-list", {"ordering": "name"})["X-Cache"], "HIT")
+
+    def test_saving_or_deleting_a_template_drops_the_cached_list(self):
+        self.get("task-template-list")
+
+        self.template.name = "Full service"
+        self.template.save()
+        response = self.get("task-template-list")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data[0]["name"], "Full service")
+
+        self.template.delete()
+        response = self.get("task-template-list")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data, [])
+
+    def test_stock_moved_by_a_part_drops_the_cached_inventory(self):
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="RC-1"
+        )
+        report = Report.objects.create(vehicle=vehicle, user=self.user)
+        self.get("inventory-list")
+
+        Part.objects.create(report=report, part=self.item, quantity_used=4)
+        response = self.get("inventory-list")
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data[0]["quantity_in_stock"], "6.00")
+
+    def test_other_lists_stay_cached(self):
+        self.get("task-template-list")
+        Inventory.objects.restock(self.item.pk, 5)
+        self.assertEqual(self.get("task-template-list")["X-Cache"], "HIT")
+
+    def test_error_responses_are_not_cached(self):
+        self.assertEqual(self.get("inventory-list", {"cursor": "bogus"}).status_code, 404)
+        self.assertEqual(self.get("inventory-list", {"cursor": "bogus"}).status_code, 404)
+        self.assertEqual(self.get("inventory-list")["X-Cache"], "MISS")
+
+
+class CacheStatsTests(APITestCase):
+    def test_staff_see_hits_and_misses_per_list(self):
+        staff = make_user()
+        staff.is_staff = True
+        staff.save()
+        authenticate(self.client, staff)
+        self.client.get(reverse("inventory-list"))
+        self.client.get(reverse("inventory-list"))
+
+        response = self.client.get(reverse("cache-stats"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["inventory"], {"hits": 1, "misses": 1})
+        self.assertEqual(response.data["task-templates"], {"hits": 0, "misses": 0})
+
+    def test_other_users_are_refused(self):
+        authenticate(self.client, make_user())
+        self.assertEqual(self.client.get(reverse("cache-stats")).status_code, 403)
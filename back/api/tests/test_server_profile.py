@@ -0,0 +1,79 @@
+"""
+Tests for the gunicorn server profile (`back/gunicorn.conf.py`), which
+entrypoint.sh hands to gunicorn and which reads every setting from the
+environment.
+"""
+
+import runpy
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+CONFIG = Path(__file__).resolve().parents[2] / "gunicorn.conf.py"
+
+
+def load(cpus=2, cpu_max=None, **env):
+    """The settings gunicorn.conf.py defines with `env` set, on a machine with `cpus`."""
+    cgroup = mock.mock_open(read_data=cpu_max or "")
+    if cpu_max is None:
+        cgroup.side_effect = FileNotFoundError
+    with (
+        mock.patch.dict("os.environ", env, clear=True),
+        mock.patch("os.sched_getaffinity", return_value=set(range(cpus))),
+        mock.patch("builtins.open", cgroup),
+    ):
+        return runpy.run_path(str(CONFIG))
+
+
+class ServerProfileTests(SimpleTestCase):
+    def test_sync_workers_follow_the_cpu_count_by_default(self):
+        config = load(cpus=4)
+
+        self.assertEqual(config["wsgi_app"], "backend.wsgi:application")
+        self.assertEqual(config["worker_class"], "sync")
+        self.assertEqual(config["workers"], 9)
+        self.assertEqual((config["threads"], config["max_requests"]), (1, 0))
+        self.assertFalse(config["preload_app"])
+
+    def test_the_container_cpu_quota_wins_over_the_host_cores(self):
+        self.assertEqual(load(cpus=16, cpu_max="150000 100000\n")["workers"], 5)
+        self.assertEqual(load(cpus=16, cpu_max="max 100000\n")["workers"], 33)
+
+    def test_threads_make_gthread_workers_and_fewer_of_them(self):
+        config = load(cpus=2, GUNICORN_THREADS="4")
+
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertEqual(config["workers"], 3)
+
+    def test_asgi_mode_runs_uvicorn_workers_on_the_asgi_app(self):
+        config = load(SERVER_MODE="asgi")
+
+        self.assertEqual(config["wsgi_app"], "backend.asgi:application")
+        self.assertEqual(config["worker_class"], "uvicorn.workers.UvicornWorker")
+
+    def test_every_setting_can_be_given(self):
+        config = load(
+            GUNICORN_WORKERS="6",
+            GUNICORN_WORKER_CLASS="gthread",
+            GUNICORN_THREADS="8",
+            GUNICORN_MAX_REQUESTS="1000",
+            GUNICORN_MAX_REQUESTS_JITTER="50",
+            GUNICORN_PRELOAD="true",
+            GUNICORN_TIMEOUT="60",
+        )
+
+        self.assertEqual(
+            [config[name] for name in ("workers", "worker_class", "threads", "timeout")],
+            [6, "gthread", 8, 60],
+        )
+        self.assertEqual((config["max_requests"], config["max_requests_jitter"]), (1000, 50))
+        self.assertTrue(config["preload_app"])
+
+    def test_empty_variables_count_as_unset(self):
+        config = load(GUNICORN_WORKER_CLASS="", GUNICORN_WORKERS="", GUNICORN_BIND="")
+        self.assertEqual((config["worker_class"], config["workers"]), ("sync", 5))
+        self.assertEqual(config["bind"], "0.0.0.0:8000")
+
+    def test_the_jitter_defaults_to_a_tenth_of_max_requests(self):
+        self.assertEqual(load(GUNICORN_MAX_REQUESTS="500")["max_requests_jitter"], 50)
@@ -0,0 +1,208 @@
+"""
+Tests for stock moves made by `Part.save` / `Part.delete` and by the report
+endpoints (`api/services/stock.py`).
+
+Each move is one conditional UPDATE on the inventory rows, so concurrent
+withdrawals cannot both pass the stock check. The stress test runs real
+threads, each on its own database connection, which is why it needs a
+`TransactionTestCase`: a plain `TestCase` transaction is invisible to them.
+"""
+
+import threading
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, Vehicle
+from api.tests.helpers import authenticate, make_user
+
+
+def make_report(plate, user=None):
+    owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+    vehicle = Vehicle.objects.create(
+        owner=owner, brand="Audi", model="A3", year=2015, license_plate=plate
+    )
+    return Report.objects.create(vehicle=vehicle, user=user or make_user())
+
+
+class StockMoveTests(TestCase):
+    def setUp(self):
+        self.report = make_report("STK-1")
+        self.item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+
+    def test_editing_a_part_moves_only_the_difference(self):
+        part = Part.objects.create(report=self.report, part=self.item, quantity_used=4)
+
+        part.quantity_used = 7
+        part.save()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_in_stock, Decimal("3"))
+
+    def test_an_edit_that_would_overdraw_leaves_stock_untouched(self):
+        part = Part.objects.create(report=self.report, part=self.item, quantity_used=4)
+
+        part.quantity_used = 11
+        with self.assertRaisesMessage(ValidationError, "Not enough stock"):
+            part.save()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_in_stock, Decimal("6"))
+        self.assertEqual(Part.objects.get(pk=part.pk).quantity_used, Decimal("4"))
+
+    def test_moving_a_part_to_another_item_restocks_the_first(self):
+        other = Inventory.objects.create(
+            name="Air filter", reference_code="AF-1", quantity_in_stock=5, unit_price=9
+        )
+        part = Part.objects.create(report=self.report, part=self.item, quantity_used=4)
+
+        part.part = other
+        part.save()
+
+        self.item.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.item.quantity_in_stock, Decimal("10"))
+        self.assertEqual(other.quantity_in_stock, Decimal("1"))
+
+    def test_a_stock_move_bumps_the_inventory_timestamp(self):
+        before = self.item.updated_at
+
+        Part.objects.create(report=self.report, part=self.item, quantity_used=1)
+
+        self.item.refresh_from_db()
+        self.assertGreater(self.item.updated_at, before)
+
+    def test_creating_a_part_does_not_read_the_inventory_row(self):
+        with CaptureQueriesContext(connection) as captured:
+            Part.objects.create(report=self.report, part=self.item, quantity_used=1)
+
+        selects = [q["sql"] for q in captured if q["sql"].startswith("SELECT")]
+        self.assertEqual(selects, [])
+
+
+class ReportStockTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.report = make_report("STK-3", self.user)
+        self.oil = Inventory.objects.create(
+            name="Oil", reference_code="OIL-1", quantity_in_stock=10, unit_price=8
+        )
+        self.filter = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-3", quantity_in_stock=2, unit_price=9
+        )
+
+    def stock(self):
+        self.oil.refresh_from_db()
+        self.filter.refresh_from_db()
+        return self.oil.quantity_in_stock, self.filter.quantity_in_stock
+
+    def put_parts(self, parts):
+        self.report.refresh_from_db()
+        url = reverse("report-detail", kwargs={"pk": self.report.pk})
+        data = {"updated_at": self.report.updated_at, "parts": parts}
+        return self.client.patch(url, data, format="json")
+
+    def test_creating_a_report_withdraws_the_summed_quantities(self):
+        data = {
+            "vehicle": self.report.vehicle_id,
+            "status": "pending",
+            "parts": [
+                {"part": self.oil.id, "quantity_used": "1.5"},
+                {"part": self.oil.id, "quantity_used": "2"},
+                {"part": self.filter.id, "quantity_used": "1"},
+            ],
+        }
+
+        response = self.client.post(reverse("report-list"), data, format="json")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data["parts_data"]), 3)
+        self.assertEqual(self.stock(), (Decimal("6.5"), Decimal("1")))
+
+    def test_replacing_parts_moves_only_the_net_difference(self):
+        Part.objects.create(report=self.report, part=self.oil, quantity_used=4)
+
+        response = self.put_parts(
+            [
+                {"part": self.oil.id, "quantity_used": "3"},
+                {"part": self.filter.id, "quantity_used": "2"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.stock(), (Decimal("7"), Decimal("0")))
+
+    def test_a_short_item_rejects_the_whole_request(self):
+        Part.objects.create(report=self.report, part=self.oil, quantity_used=4)
+
+        response = self.put_parts(
+            [
+                {"part": self.oil.id, "quantity_used": "1"},
+                {"part": self.filter.id, "quantity_used": "3"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["parts"], ["Not enough stock for Oil filter."])
+        self.assertEqual(self.stock(), (Decimal("6"), Decimal("2")))
+        self.assertEqual(
+            list(self.report.part_set.values_list("quantity_used", flat=True)), [Decimal("4")]
+        )
+
+    def test_deleting_a_report_restocks_every_part(self):
+        Part.objects.create(report=self.report, part=self.oil, quantity_used=4)
+        Part.objects.create(report=self.report, part=self.oil, quantity_used=1)
+        Part.objects.create(report=self.report, part=self.filter, quantity_used=2)
+
+        self.report.delete()
+
+        self.assertEqual(self.stock(), (Decimal("10"), Decimal("2")))
+
+
+class StockStressTests(TransactionTestCase):
+    THREADS = 12
+    STOCK = 5
+
+    def test_concurrent_withdrawals_never_overdraw(self):
+        report = make_report("STK-2")
+        item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-2", quantity_in_stock=self.STOCK, unit_price=8
+        )
+        start = threading.Barrier(self.THREADS)
+        outcomes = []
+        lock = threading.Lock()
+
+        def consume():
+            try:
+                start.wait()
+                try:
+                    Part.objects.create(report=report, part=item, quantity_used=1)
+                    outcome = "ok"
+                except ValidationError:
+                    outcome = "short"
+            except Exception as exc:  # surfaced by the assertion below
+                outcome = repr(exc)
+            finally:
+                connection.close()
+            with lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=consume) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+        self.assertEqual(sorted(set(outcomes)), ["ok", "short"], outcomes)
+        self.assertEqual(outcomes.count("ok"), self.STOCK)
+        self.assertEqual(item.quantity_in_stock, Decimal("0"))
+        self.assertEqual(Part.objects.filter(part=item).count(), self.STOCK)
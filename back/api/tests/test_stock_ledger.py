@@ -0,0 +1,162 @@
+"""
+Tests for the `StockMovement` ledger, `StockSnapshot` and the point-in-time
+stock they answer (`api/services/ledger.py`, `inventory/stock-at/`).
+
+Every path that changes stock must leave a movement, so that the ledger
+always sums to `quantity_in_stock`; and a point-in-time answer must be the
+same whether or not snapshots were taken in between.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Inventory, Owner, Part, Report, StockMovement, StockSnapshot, Vehicle
+from api.services.ledger import discrepancies, take_snapshot, with_stock_at
+from api.tests.helpers import authenticate, make_user
+
+
+class StockLedgerTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        owner = Owner.objects.create(first_name="Ada", last_name="Lovelace")
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, brand="Audi", model="A3", year=2015, license_plate="LG-1"
+        )
+        self.report = Report.objects.create(vehicle=self.vehicle, user=self.user)
+        self.item = Inventory.objects.create(
+            name="Oil filter", reference_code="OF-1", quantity_in_stock=10, unit_price=8
+        )
+
+    def ledger(self):
+        return list(
+            StockMovement.objects.filter(inventory=self.item)
+            .order_by("id")
+            .values_list("change", "reason", "report_id")
+        )
+
+    def stock_at(self, moment):
+        return with_stock_at(Inventory.objects.filter(pk=self.item.pk), moment).get().stock_at
+
+    def test_parts_write_a_movement_for_every_stock_change(self):
+        part = Part.objects.create(report=self.report, part=self.item, quantity_used=3)
+        part.quantity_used = Decimal("4.00")
+        part.save()
+        part.delete()
+
+        self.assertEqual(
+            self.ledger(),
+            [
+                (Decimal("10.00"), "initial", None),
+                (Decimal("-3.00"), "used", self.report.pk),
+                (Decimal("3.00"), "returned", self.report.pk),
+                (Decimal("-4.00"), "used", self.report.pk),
+                (Decimal("4.00"), "returned", self.report.pk),
+            ],
+        )
+
+    def test_report_endpoints_and_edits_keep_the_ledger_in_step(self):
+        response = self.client.post(
+            reverse("report-list"),
+            {
+                "vehicle": self.vehicle.id,
+                "status": "pending",
+                "parts": [{"part": self.item.id, "quantity_used": "2.50"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.item.refresh_from_db()
+        self.client.patch(
+            reverse("inventory-detail", kwargs={"pk": self.item.pk}),
+            {"quantity_in_stock": "20.00", "updated_at": self.item.updated_at},
+            format="json",
+        )
+        self.client.delete(reverse("report-detail", kwargs={"pk": response.data["id"]}))
+
+        self.assertEqual(
+            [reason for _, reason, _ in self.ledger()],
+            ["initial", "used", "adjustment", "returned"],
+        )
+        self.assertEqual(list(discrepancies()), [])
+        self.assertEqual(Inventory.objects.get(pk=self.item.pk).quantity_in_stock, Decimal("22.50"))
+
+    def test_a_short_move_leaves_no_movement_behind(self):
+        Part.objects.create(report=self.report, part=self.item, quantity_used=3)
+
+        with self.assertRaises(ValidationError):
+            Part.objects.create(report=self.report, part=self.item, quantity_used=50)
+
+        self.assertEqual(len(self.ledger()), 2)
+
+    def test_saving_other_fields_writes_no_movement(self):
+        self.item.name = "Oil filter XL"
+        self.item.save()
+        self.item.save(update_fields=["name"])
+
+        self.assertEqual(len(self.ledger()), 1)
+
+    def test_point_in_time_stock_is_the_same_with_or_without_snapshots(self):
+        start = timezone.now()
+        StockMovement.objects.filter(inventory=self.item).update(
+            created_at=start - timedelta(days=30)
+        )
+        # Three dated withdrawals: 20, 10 and 5 days ago
+        for days, quantity in [(20, 1), (10, 2), (5, 3)]:
+            Inventory.objects.withdraw(self.item.pk, quantity)
+            StockMovement.objects.filter(pk=StockMovement.objects.latest("id").pk).update(
+                created_at=start - timedelta(days=days)
+            )
+        moments = [start - timedelta(days=days) for days in (25, 15, 7, 1)]
+        expected = [Decimal("10"), Decimal("9"), Decimal("7"), Decimal("4")]
+
+        self.assertEqual([self.stock_at(moment) for moment in moments], expected)
+
+        take_snapshot(at=start - timedelta(days=12))
+        take_snapshot(at=start - timedelta(days=3))
+        self.assertEqual(StockSnapshot.objects.count(), 2)
+        self.assertEqual([self.stock_at(moment) for moment in moments], expected)
+
+    def test_the_stock_at_endpoint_answers_for_every_item(self):
+        before = timezone.now()
+        Inventory.objects.withdraw(self.item.pk, 4)
+        later = Inventory.objects.create(
+            name="Wiper", reference_code="WP-1", quantity_in_stock=2, unit_price=5
+        )
+
+        response = self.client.get(reverse("inventory-stock-at"), {"at": before.isoformat()})
+
+        self.assertEqual(response.status_code, 200)
+        rows = {row["id"]: row["quantity_in_stock"] for row in response.data["results"]}
+        self.assertEqual(rows, {self.item.pk: Decimal("10.00"), later.pk: Decimal("0")})
+
+    def test_the_stock_at_endpoint_needs_a_moment(self):
+        response = self.client.get(reverse("inventory-stock-at"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_point_in_time_stock_costs_one_query_for_any_history(self):
+        for _ in range(20):
+            Inventory.objects.withdraw(self.item.pk, Decimal("0.10"))
+
+        with CaptureQueriesContext(connection) as captured:
+            self.stock_at(timezone.now())
+
+        self.assertEqual(len(captured), 1)
+
+    def test_the_snapshot_command_reports_disagreements(self):
+        Inventory.objects.filter(pk=self.item.pk).update(quantity_in_stock=7)
+        out = StringIO()
+
+        call_command("snapshot_stock", "--check", stdout=out)
+
+        self.assertIn("OF-1: 7.00 in stock, 10.00 in the ledger", out.getvalue())
+        self.assertIn("1 items disagree with the ledger.", out.getvalue())
@@ -3,6 +3,12 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
+    CacheStatsView,
+    ChangesView,
+    DashboardSummaryView,
+    DatabaseStatsView,
+    EventTicketView,
+    GlobalSearchView,
     InventoryViewSet,
     InvoiceViewSet,
     LoginView,
@@ -13,6 +19,7 @@ from .views import (
     UserProfileViewSet,
     UserViewSet,
     VehicleViewSet,
+    event_stream,
 )
 
 # DRF Router for ViewSets
@@ -31,6 +38,20 @@ urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    # Search across owners, vehicles, invoices and inventory
+    path("search/", GlobalSearchView.as_view(), name="search"),
+    # Precomputed numbers for the dashboard
+    path("dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard-summary"),
+    # Change feed: objects created, updated or deleted since a cursor
+    path("changes/", ChangesView.as_view(), name="changes"),
+    # The same changes pushed as server-sent events (ASGI server only), and
+    # the single-use tickets that open a stream
+    path("events/", event_stream, name="events"),
+    path("events/ticket/", EventTicketView.as_view(), name="events-ticket"),
+    # Response cache hit/miss counters (staff only)
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    # Database connection reuse counters of the answering worker (staff only)
+    path("db/stats/", DatabaseStatsView.as_view(), name="db-stats"),
     # Include ViewSet routes
     path("", include(router.urls)),
 ]
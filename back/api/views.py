@@ -14,32 +14,76 @@ Each view enforces appropriate permissions, typically requiring authentication,
 to interact with corresponding serializers and models for structured input/output handling.
 """
 
-from django.db.models import CharField, F, Value
-from django.db.models.functions import Concat
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .filters import OwnerFilter
-from .mixins import OptionalPaginationMixin
-from .models import Inventory, Invoice, Owner, Report, TaskTemplate, User, UserProfile, Vehicle
+from . import cache as response_cache
+from .exceptions import CursorExpiredException
+from .filters import InvoiceFilter, OwnerFilter, VehicleFilter
+from .middleware import stats as connection_stats
+from .mixins import (
+    AsyncListMixin,
+    CachedListMixin,
+    ConditionalGetMixin,
+    OptionalPaginationMixin,
+    ReplicaReadMixin,
+)
+from .models import (
+    Inventory,
+    Invoice,
+    Owner,
+    Report,
+    SearchIndexEntry,
+    TaskTemplate,
+    User,
+    UserProfile,
+    Vehicle,
+)
+from .search import tokenize
 from .serializers import (
+    BulkExportSerializer,
+    ChangesSerializer,
+    GlobalSearchSerializer,
     InventorySerializer,
     InvoiceSerializer,
     LoginSerializer,
     OwnerSerializer,
     PartSerializer,
+    PdfProgressSerializer,
     ReportSerializer,
+    StockAtSerializer,
     TaskSerializer,
     TaskTemplateSerializer,
     UserProfileSerializer,
     UserSerializer,
     VehicleSerializer,
 )
-from .services.invoices import generate_invoice
+from .services.changes import read, start_cursor
+from .services.dashboard import summary
+from .services.events import (
+    EVENT_KINDS,
+    Broadcaster,
+    change_event,
+    event,
+    issue_ticket,
+    redeem_ticket,
+)
+from .services.invoices import generate_invoice, pdf_progress, queue_invoice_pdf
+from .services.ledger import with_stock_at
 
 
 # Authentication Views
@@ -90,6 +134,90 @@ class LoginView(APIView):
         )
 
 
+# Search Views
+class GlobalSearchView(APIView):
+    """
+    API endpoint searching owners, vehicles, invoices and inventory at once.
+
+    Every word of `?q=` must start a word of the hit (a name, e-mail, phone,
+    plate, invoice number or reference code), so partial input works.
+    `?type=` (repeatable) restricts the kinds and `?limit=` caps the hits
+    (default 20). Hits come from the prebuilt `SearchIndexEntry` table in a
+    single query, best first.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = GlobalSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        terms = tokenize(params.validated_data["q"])
+        if not terms:
+            return Response({"results": []})
+
+        hits = SearchIndexEntry.objects.search(terms, kinds=params.validated_data.get("type"))
+        return Response(
+            {
+                "results": [
+                    {
+                        "type": hit["kind"],
+                        "id": hit["object_id"],
+                        "label": hit["label"],
+                        "rank": hit["rank"],
+                    }
+                    for hit in hits[: params.validated_data["limit"]]
+                ]
+            }
+        )
+
+
+class DashboardSummaryView(APIView):
+    """
+    API endpoint with everything the dashboard shows, in one small response.
+
+    Reports per status, invoice count and gross revenue for each of the last
+    12 months, up to 5 items at or below their reorder level (lowest stock
+    first) and the 5 most used task templates. The counts are precomputed in
+    `DashboardCounter`, so the cost does not grow with the number of reports
+    or invoices.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        data = summary()
+        data["low_stock"] = InventorySerializer(data["low_stock"], many=True).data
+        return Response(data)
+
+
+class CacheStatsView(APIView):
+    """
+    API endpoint with the response cache's hit and miss counts per cached list.
+
+    With the default per-process cache the counts are those of the worker
+    that answers; with a shared backend they cover every worker.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+
+class DatabaseStatsView(APIView):
+    """
+    API endpoint with the answering worker's database connection counts: of
+    its requests that queried, how many reused their thread's connection,
+    took one from the pool or opened one, and the time spent connecting.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(connection_stats())
+
+
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to retrieve user data.
@@ -139,7 +267,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
 
 # Owners Views
-class OwnerViewSet(viewsets.ModelViewSet):
+class OwnerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing vehicle owners.
 
@@ -159,19 +287,16 @@ class OwnerViewSet(viewsets.ModelViewSet):
         queryset = Owner.objects.all()
         ordering = self.request.query_params.get("ordering")
 
+        # full_name is a stored, indexed column; id breaks ties between namesakes
         if ordering in ["full_name", "-full_name"]:
             direction = "" if ordering == "full_name" else "-"
-            queryset = queryset.annotate(
-                _full_name=Concat(
-                    F("first_name"), Value(" "), F("last_name"), output_field=CharField()
-                )
-            ).order_by(f"{direction}_full_name")
+            queryset = queryset.order_by(f"{direction}full_name", f"{direction}id")
 
         return queryset
 
 
 # Vehicles Views
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing vehicles.
 
@@ -185,12 +310,18 @@ class VehicleViewSet(viewsets.ModelViewSet):
 
     # To set up filters from the backend side
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ["brand", "model", "year", "license_plate", "owner"]
+    filterset_class = VehicleFilter
     ordering_fields = ["brand", "model"]
 
 
 # Reports Views
-class ReportViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
+class ReportViewSet(
+    AsyncListMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    OptionalPaginationMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint for managing maintenance reports.
 
@@ -210,6 +341,8 @@ class ReportViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
     # disable Pagination
     pagination_class = None
     default_ordering = "vehicle__brand,vehicle__model"
+    # Copies on the report row, so (brand, model, id) is one index
+    ordering_columns = {"vehicle__brand": "vehicle_brand", "vehicle__model": "vehicle_model"}
 
     # To set up filters from the backend side
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -234,14 +367,73 @@ class ReportViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
         super().perform_update(serializer)
 
     def update(self, request, *args, **kwargs):
-        """Update the report, and generate an invoice the first time it is exported."""
+        """Update the report, and generate an invoice the first time it is exported.
+
+        The invoice comes back in `pending_pdf` state; its PDF is rendered by
+        the job worker, not inside this request.
+        """
         response = super().update(request, *args, **kwargs)
 
         if self._previous_status != "exported" and self._updated_instance.status == "exported":
-            generate_invoice(self._updated_instance, request)
+            invoice = generate_invoice(self._updated_instance, request)
+            response.data["invoice"] = InvoiceSerializer(invoice).data
 
         return response
 
+    @action(detail=False, methods=["post"], url_path="bulk-export")
+    def bulk_export(self, request):
+        """Export many reports at once and queue one PDF render per invoice.
+
+        All status flips and invoice rows are written in one transaction,
+        committed before the `202` is sent; the renders themselves run on
+        the job worker's process pool. The response lists one entry per
+        requested id under `results`. Progress is exposed through each
+        invoice's `pdf_status`: `status_url` (also the `Location` header)
+        is `invoices/pdf-progress/` for the invoices created, which counts
+        how many are still `pending_pdf`, `ready` or `failed` as the worker
+        renders them one by one. It is null when nothing was exported.
+        """
+        serializer = BulkExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+
+        results, invoice_ids = [], []
+        with transaction.atomic():
+            reports = Report.objects.select_for_update().in_bulk(ids)
+            for report_id in ids:
+                report = reports.get(report_id)
+                if report is None:
+                    results.append({"report": report_id, "result": "not_found", "invoice": None})
+                    continue
+                if report.status == "exported":
+                    results.append(
+                        {"report": report_id, "result": "already_exported", "invoice": None}
+                    )
+                    continue
+
+                report.status = "exported"
+                report.save(update_fields=["status", "updated_at"])
+                invoice = generate_invoice(report, request)
+                invoice_ids.append(invoice.id)
+                results.append(
+                    {
+                        "report": report_id,
+                        "result": "exported",
+                        "invoice": InvoiceSerializer(invoice).data,
+                    }
+                )
+
+        status_url, headers = None, {}
+        if invoice_ids:
+            url = reverse("invoice-pdf-progress", request=request)
+            status_url = f"{url}?ids={','.join(map(str, invoice_ids))}"
+            headers["Location"] = status_url
+        return Response(
+            {"results": results, "status_url": status_url},
+            status=status.HTTP_202_ACCEPTED,
+            headers=headers,
+        )
+
     @action(detail=True, methods=["get"])
     def tasks(self, request, pk=None):
         """Get tasks related to a report"""
@@ -259,13 +451,16 @@ class ReportViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TaskTemplateViewSet(viewsets.ModelViewSet):
+class TaskTemplateViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing task templates.
 
     Allows full CRUD operations and supports filtering and ordering by name or description.
+    The list is served from the response cache until a template changes.
     """
 
+    cache_name = "task-templates"
+
     queryset = TaskTemplate.objects.all()
     serializer_class = TaskTemplateSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -276,14 +471,24 @@ class TaskTemplateViewSet(viewsets.ModelViewSet):
     ordering_fields = ["name"]
 
 
-class InventoryViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
+class InventoryViewSet(
+    AsyncListMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedListMixin,
+    OptionalPaginationMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint for managing inventory items.
 
     Provides CRUD functionality, with filtering and ordering on inventory fields.
     Pagination is disabled unless limit/offset parameters are specified.
+    The list is served from the response cache until an item or its stock changes.
     """
 
+    cache_name = "inventory"
+
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -294,11 +499,43 @@ class InventoryViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
 
     # To set up filters from the backend side
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ["name", "reference_code", "category", "updated_at"]
+    # low_stock=true: items at or below their reorder level
+    filterset_fields = ["name", "reference_code", "category", "updated_at", "low_stock"]
     ordering_fields = ["name"]
 
+    @action(detail=False, methods=["get"], url_path="stock-at")
+    def stock_at(self, request):
+        """Each item's stock at `?at=` (ISO date-time), from the stock ledger.
+
+        Takes the same filters as the list. Each item costs two short index
+        reads: its latest snapshot before `at` and its movements since.
+        """
+        params = StockAtSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        moment = params.validated_data["at"]
+
+        items = with_stock_at(self.filter_queryset(self.get_queryset()), moment)
+        return Response(
+            {
+                "at": moment,
+                "results": [
+                    {
+                        "id": item["id"],
+                        "name": item["name"],
+                        "reference_code": item["reference_code"],
+                        "quantity_in_stock": item["stock_at"],
+                    }
+                    for item in items.order_by("name", "id").values(
+                        "id", "name", "reference_code", "stock_at"
+                    )
+                ],
+            }
+        )
+
 
-class InvoiceViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
+class InvoiceViewSet(
+    AsyncListMixin, ReplicaReadMixin, OptionalPaginationMixin, viewsets.ModelViewSet
+):
     """
     API endpoint for managing invoices.
 
@@ -307,13 +544,9 @@ class InvoiceViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
     """
 
     # The serializer reads report.vehicle.owner for owner_full_name and
-    # vehicle_plate, and Invoice.total_cost walks report.task_set.task_template
-    # and report.part_set.part. All four paths are loaded up front.
-    queryset = (
-        Invoice.objects.select_related("report__vehicle__owner")
-        .prefetch_related("report__task_set__task_template", "report__part_set__part")
-        .all()
-    )
+    # vehicle_plate, which the join loads. The totals are columns frozen on
+    # the invoice itself, so tasks and parts are never fetched at all.
+    queryset = Invoice.objects.select_related("report__vehicle__owner").all()
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -323,5 +556,193 @@ class InvoiceViewSet(OptionalPaginationMixin, viewsets.ModelViewSet):
 
     # To set up filters from the backend side
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ["invoice_number"]
-    ordering_fields = ["issued_date"]
+    filterset_class = InvoiceFilter
+    ordering_fields = ["issued_date", "net_total", "gross_total"]
+
+    @action(detail=False, methods=["get"], url_path="pdf-progress")
+    def pdf_progress(self, request):
+        """How far the PDFs of the invoices in `?ids=` (comma-separated) have got.
+
+        `reports/bulk-export/` links here for the invoices it created. Counts
+        per `pdf_status`, `done` once none is pending, and each invoice's
+        own status.
+        """
+        params = PdfProgressSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(pdf_progress(Invoice.objects.filter(id__in=params.validated_data["ids"])))
+
+    def perform_create(self, serializer):
+        """Queue the new invoice's PDF, as `generate_invoice` does."""
+        with transaction.atomic():
+            queue_invoice_pdf(serializer.save())
+
+
+# Where the change feed and the event stream read each kind from, and how
+# they render it: as its list endpoint does
+SYNCED_VIEWSETS = {
+    "owner": OwnerViewSet,
+    "vehicle": VehicleViewSet,
+    "report": ReportViewSet,
+    "inventory": InventoryViewSet,
+    "task_template": TaskTemplateViewSet,
+    "invoice": InvoiceViewSet,
+}
+SYNCED_SOURCES = {kind: viewset.queryset for kind, viewset in SYNCED_VIEWSETS.items()}
+
+
+def render_synced(kind, obj, request=None):
+    return SYNCED_VIEWSETS[kind].serializer_class(obj, context={"request": request}).data
+
+
+class ChangesView(APIView):
+    """
+    API endpoint with what changed since a cursor, so clients can sync
+    instead of reloading whole lists.
+
+    Without `?since=` it only returns a starting `cursor`; a client takes it,
+    loads its lists, then polls `?since=<cursor>` and replaces `cursor` with
+    the one returned. Each change is `{type, id, action, data}`: the object
+    as its list endpoint renders it, or `data: null` with action "deleted".
+    Changes may repeat across polls and are meant to be applied as upserts.
+    `?type=` (repeatable) restricts the kinds, `?limit=` caps the log
+    entries read (default 500) and `has_more` says to poll again at once. A
+    cursor older than the log's retention gets a 410.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = ChangesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        if "since" not in params.validated_data:
+            return Response({"cursor": start_cursor(), "has_more": False, "changes": []})
+
+        cursor, has_more, changes = read(
+            params.validated_data["since"],
+            SYNCED_SOURCES,
+            kinds=params.validated_data.get("type"),
+            limit=params.validated_data["limit"],
+        )
+        return Response(
+            {
+                "cursor": cursor,
+                "has_more": has_more,
+                "changes": [
+                    {
+                        "type": kind,
+                        "id": pk,
+                        "action": action,
+                        "data": None if obj is None else render_synced(kind, obj, request),
+                    }
+                    for kind, pk, action, obj in changes
+                ],
+            }
+        )
+
+
+# One per process: fans change log entries out to every open event stream
+broadcaster = Broadcaster(SYNCED_SOURCES, render_synced)
+
+# Seconds between comments sent on an idle stream, so proxies keep it open
+EVENTS_HEARTBEAT = 15
+
+# Backlog entries replayed on reconnect; a longer backlog asks for a reload
+EVENTS_REPLAY_LIMIT = 1000
+
+
+def replay(since):
+    """The events for what changed after cursor `since`, or a `reload` if that is too much."""
+    try:
+        cursor, has_more, changes = read(
+            since, SYNCED_SOURCES, kinds=EVENT_KINDS, limit=EVENTS_REPLAY_LIMIT
+        )
+    except CursorExpiredException:
+        return [event("reload", {})]
+    if has_more:
+        return [event("reload", {})]
+    return [
+        change_event(kind, pk, action, None if obj is None else render_synced(kind, obj), cursor)
+        for kind, pk, action, obj in changes
+    ]
+
+
+class EventTicketView(APIView):
+    """
+    API endpoint that issues a single-use ticket for opening the event stream.
+
+    EventSource cannot send an Authorization header, and an access token put
+    in the stream's URL would be written to every access log on the way, so
+    the client authenticates here instead and opens `/api/events/?ticket=`
+    within `EVENTS_TICKET_SECONDS`. The stream it opens ends when the access
+    token used here expires.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if request.auth is not None:
+            expires_at = request.auth["exp"]
+        else:
+            expires_at = time.time() + jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        return Response(
+            {
+                "ticket": issue_ticket(request.user, expires_at),
+                "expires_in": settings.EVENTS_TICKET_SECONDS,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+async def event_stream(request):
+    """
+    Server-sent events for changes to reports, inventory and invoices.
+
+    A plain async view rather than an APIView, which cannot stream
+    asynchronously, so it authenticates by hand: with a single-use `?ticket=`
+    from `/api/events/ticket/`. The stream ends when the access token the
+    ticket was issued for expires, and the client reconnects with a new one.
+    `?since=` (or the `Last-Event-ID` header of a reconnect) first replays
+    what changed after that cursor; if that is too far back the stream
+    sends a `reload` event instead. Each `change` event has the shape of a
+    change from `/api/changes/`. Only the ASGI server can hold streams open.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Events are served by the ASGI server."}, status=501)
+
+    grant = await sync_to_async(redeem_ticket)(request.GET.get("ticket"))
+    if grant is None:
+        return JsonResponse({"detail": "A valid stream ticket is required."}, status=401)
+
+    since = request.headers.get("Last-Event-ID") or request.GET.get("since")
+    params = ChangesSerializer(data={} if since is None else {"since": since})
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=400)
+    since = params.validated_data.get("since")
+    expires_at = grant["expires_at"]
+
+    async def stream():
+        subscription = broadcaster.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            if since is not None:
+                for message in await sync_to_async(replay)(since):
+                    yield message
+            while not subscription.overflowed:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    yield await asyncio.wait_for(
+                        subscription.queue.get(), min(EVENTS_HEARTBEAT, remaining)
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingHttpResponse(
+        stream(),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
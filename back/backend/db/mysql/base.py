@@ -0,0 +1,46 @@
+"""
+Django's MySQL backend, plus optional connection pooling and connect timing.
+
+Without pooling, Django opens a connection the first time a thread queries
+and closes it at the end of the request, unless CONN_MAX_AGE keeps it. With
+`POOL_SIZE` set in the database settings, closing hands the connection to a
+per-process pool (backend/db/pool.py) and opening takes it back out after a
+ping, so even connections Django closes after every request (CONN_MAX_AGE=0,
+or threads that come and go) skip the TCP and authentication handshakes.
+
+Every wrapper records how its latest connection was obtained and how long
+that took, for api.middleware.ConnectionMetricsMiddleware.
+"""
+
+import time
+
+from django.db.backends.mysql import base
+
+from backend.db.pool import pool_for
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # ("opened" or "pooled", milliseconds) for the latest connect
+    last_connect = None
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        pool = self.pool()
+        connection = pool.take() if pool else None
+        how = "pooled"
+        if connection is None:
+            connection = super().get_new_connection(conn_params)
+            how = "opened"
+        self.last_connect = (how, (time.perf_counter() - started) * 1000)
+        return connection
+
+    def _close(self):
+        pool = self.pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.give(self.connection)
+
+    def pool(self):
+        size = self.settings_dict.get("POOL_SIZE") or 0
+        return pool_for(self.alias, size) if size > 0 else None
@@ -0,0 +1,73 @@
+"""
+Per-process pools of idle database connections, for the pooled MySQL backend
+(backend/db/mysql). Kept free of any driver import so it can be tested alone.
+
+A pool never makes anyone wait: taking from an empty pool returns None (the
+caller opens a new connection), and giving to a full one closes the
+connection. Its size is therefore the number of idle connections a process
+keeps, not a cap on open ones.
+"""
+
+import logging
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, size):
+        # Last in, first out: the warmest connection is reused, and ones that
+        # sit at the bottom long enough for MySQL to drop them fail the ping.
+        self.idle = queue.LifoQueue(size)
+
+    def take(self):
+        """An idle connection that answers a ping, or None if there is none."""
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return None
+            try:
+                connection.ping()
+                return connection
+            except Exception:
+                discard(connection)
+
+    def give(self, connection):
+        """Keep `connection` for reuse, with any open transaction rolled back."""
+        try:
+            connection.rollback()
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            discard(connection)
+        except Exception:
+            logger.warning("Discarding a connection that failed to roll back", exc_info=True)
+            discard(connection)
+
+    def clear(self):
+        while True:
+            try:
+                discard(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def pool_for(alias, size):
+    """This process's pool for database `alias` (a forked worker never inherits its parent's)."""
+    key = (alias, os.getpid())
+    with _lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size)
+        return _pools[key]
+
+
+def discard(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
@@ -0,0 +1,46 @@
+"""
+Database router for the read replica (settings.REPLICA_DATABASE).
+
+Nothing goes to the replica unless the code asks for it: reads made inside
+`reading_from(alias)` go to `alias`, everything else - every write, and every
+read outside such a block - goes to the primary as before. The alias lives in
+a context variable, so it covers exactly the code run in the block, including
+what it hands to sync_to_async, and never leaks into another request or
+thread. `api.mixins.ReplicaReadMixin` is what opens the block.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+@contextmanager
+def reading_from(alias):
+    """Send the reads made in this block to `alias` (None: the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_alias():
+    """Where reads made here go: an alias, or None for the primary."""
+    return _read_alias.get()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema by replication
+        return db == "default"
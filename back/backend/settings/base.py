@@ -14,6 +14,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -96,6 +98,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its Server-Timing header covers every query of the request
+    "api.middleware.ConnectionMetricsMiddleware",
+    # Keeps a user's list reads on the primary for a while after they write
+    "api.middleware.ReadYourWritesMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -106,6 +112,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The front-end revalidates lists with If-None-Match (api.mixins.ConditionalGetMixin),
+# so that header must be allowed in and ETag must be readable cross-origin.
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -116,6 +127,66 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
 }
 
+# Bare-array list responses (OptionalPaginationMixin without limit, offset or
+# cursor): lists longer than one chunk are streamed chunk by chunk, and lists
+# longer than the cap are refused in favour of the paginated modes.
+LIST_STREAM_CHUNK_SIZE = int(os.getenv("LIST_STREAM_CHUNK_SIZE", "500"))
+LIST_MAX_ROWS = int(os.getenv("LIST_MAX_ROWS", "10000"))
+
+# "wsgi" runs gunicorn's sync workers, "asgi" its uvicorn workers
+# (entrypoint.sh). Under ASGI the report, inventory and invoice lists are
+# served by async views (AsyncListMixin).
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+ASYNC_LIST_VIEWS = SERVER_MODE == "asgi"
+
+# Event stream (api/services/events.py): seconds between reads of the change
+# log for writes made by other processes; this process's own writes are pushed
+# as soon as they commit.
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "2"))
+# EventSource cannot send an Authorization header, so a client POSTs to
+# /api/events/ticket/ for a single-use ticket, valid this many seconds, and
+# opens the stream with that rather than with its access token, which would
+# then be written to every access log. Tickets are kept in the database
+# (the "tickets" cache), which the backend and the events service share.
+EVENTS_TICKET_SECONDS = int(os.getenv("EVENTS_TICKET_SECONDS", "30"))
+
+# Job worker (manage.py run_jobs): seconds a claimed job may stay `running`
+# before it is taken to have lost its worker and is claimed again. Longer
+# than any render should take.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+
+# Cached list responses (api/cache.py). "locmem" keeps entries in each worker
+# process, so a write invalidates only the worker that handled it and the
+# others catch up within RESPONSE_CACHE_TIMEOUT seconds; "db" (run
+# `manage.py createcachetable`) or "file" (a directory shared by the workers,
+# RESPONSE_CACHE_LOCATION) share entries and invalidations between workers.
+RESPONSE_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+_RESPONSE_CACHE_LOCATIONS = {
+    "locmem": "responses",
+    "file": "/tmp/workshop-response-cache",
+    "db": "api_response_cache",
+}
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": {
+        "BACKEND": RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+        "LOCATION": os.getenv(
+            "RESPONSE_CACHE_LOCATION", _RESPONSE_CACHE_LOCATIONS[RESPONSE_CACHE_BACKEND]
+        ),
+        "TIMEOUT": int(os.getenv("RESPONSE_CACHE_TIMEOUT", "60")),
+    },
+    "tickets": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "api_stream_tickets",
+        "TIMEOUT": EVENTS_TICKET_SECONDS,
+    },
+}
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -140,20 +211,60 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections: DB_CONN_MAX_AGE is how many seconds a thread keeps its
+# connection between requests (0 closes it after every request, "none" keeps
+# it for good). With DB_CONN_HEALTH_CHECKS a kept connection is checked before
+# the first query of each request, so one MySQL has dropped (wait_timeout, a
+# restart) is replaced instead of failing that request. DB_POOL_SIZE > 0 keeps
+# up to that many closed connections per process for reuse (backend/db/mysql),
+# which is what saves the handshakes when connections are not kept.
+DB_CONN_MAX_AGE = os.getenv("DB_CONN_MAX_AGE", "60")
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        # django.db.backends.mysql with optional pooling and connect timing
+        "ENGINE": "backend.db.mysql",
         "NAME": os.getenv("MYSQL_DATABASE"),
         "USER": MYSQL_USER,
         "PASSWORD": MYSQL_PASSWORD,
         "HOST": MYSQL_HOST,
         "PORT": os.getenv("MYSQL_PORT"),
+        "CONN_MAX_AGE": None if DB_CONN_MAX_AGE.lower() == "none" else int(DB_CONN_MAX_AGE),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower()
+        in ("1", "true", "yes"),
+        "POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "0")),
         "TEST": {
             "NAME": f"test_{os.getenv('MYSQL_DATABASE')}",
         },
     }
 }
 
+# Read replica: with DB_REPLICA_HOST set, GETs of the report, inventory and
+# invoice lists read from it (api.mixins.ReplicaReadMixin), with the primary's
+# name and credentials. Everything else stays on the primary, and so do a
+# user's list reads for DB_REPLICA_PIN_SECONDS after any write they make, so
+# they see it before it has replicated. The pin is kept in the "responses"
+# cache, so a replica needs a RESPONSE_CACHE_BACKEND the workers share: with
+# per-worker "locmem" a user's next read would mostly land on a worker that
+# never saw the pin.
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+if DB_REPLICA_HOST and RESPONSE_CACHE_BACKEND == "locmem":
+    raise ImproperlyConfigured(
+        'DB_REPLICA_HOST needs RESPONSE_CACHE_BACKEND "file" or "db", which the '
+        "workers share, to keep a user's reads on the primary after they write."
+    )
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.getenv("DB_REPLICA_PORT") or DATABASES["default"]["PORT"],
+        # Tests read the test database through it
+        "TEST": {"MIRROR": "default"},
+    }
+REPLICA_DATABASE = "replica" if DB_REPLICA_HOST else None
+REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "10"))
+DATABASE_ROUTERS = ["backend.db.router.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
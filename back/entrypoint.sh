@@ -10,6 +10,9 @@ echo "MySQL is up."
 
 echo "Applying Django migrations..."
 python manage.py migrate --noinput
+# Creates the event stream tickets table, and the response cache table when
+# RESPONSE_CACHE_BACKEND=db
+python manage.py createcachetable
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
@@ -28,5 +31,8 @@ else
   echo "SEED_DEMO_DATA is not true - skipping demo data seeding."
 fi
 
+# Workers, threads, worker class and the rest come from GUNICORN_* variables
+# (gunicorn.conf.py); SERVER_MODE=asgi runs the ASGI app under uvicorn workers,
+# and the report, inventory and invoice lists are then async views.
 echo "Starting Gunicorn..."
-exec gunicorn backend.wsgi:application --bind 0.0.0.0:8000 --workers 3
+exec gunicorn --config gunicorn.conf.py
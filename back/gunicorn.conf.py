@@ -0,0 +1,75 @@
+"""
+Gunicorn settings, read from the environment. entrypoint.sh starts gunicorn
+with this file; every GUNICORN_* variable is optional, and empty counts as
+unset.
+
+Without GUNICORN_WORKERS the worker count follows the CPUs the container may
+actually use (its cgroup quota, not the host's core count): 2 per CPU + 1 for
+sync workers, 1 per CPU + 1 when each worker has threads or an event loop to
+overlap waiting with work. `manage.py bench_request_mix` measures a profile.
+"""
+
+import math
+import os
+
+
+def env_int(name, default):
+    value = os.getenv(name, "")
+    return int(value) if value.strip() else default
+
+
+def env_bool(name, default=False):
+    value = os.getenv(name, "")
+    return value.strip().lower() in ("1", "true", "yes") if value.strip() else default
+
+
+def available_cpus():
+    """CPUs this process may use: the cgroup v2 quota if set, else its affinity mask."""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+asgi = os.getenv("SERVER_MODE", "wsgi") == "asgi"
+
+wsgi_app = "backend.asgi:application" if asgi else "backend.wsgi:application"
+bind = os.getenv("GUNICORN_BIND") or "0.0.0.0:8000"
+
+threads = env_int("GUNICORN_THREADS", 1)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or (
+    "uvicorn.workers.UvicornWorker" if asgi else "sync"
+)
+if worker_class == "sync" and threads > 1:
+    # What gunicorn would switch to anyway; named so the profile logs it
+    worker_class = "gthread"
+concurrent = worker_class != "sync"
+workers = env_int("GUNICORN_WORKERS", available_cpus() * (1 if concurrent else 2) + 1)
+
+# Recycle each worker after this many requests (0: never), staggered by up to
+# the jitter so the workers do not all restart at once
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+# Load the app once in the master and fork it: faster restarts and shared
+# memory pages, but code changes then need a full restart, not a HUP
+preload_app = env_bool("GUNICORN_PRELOAD")
+
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+
+
+def when_ready(server):
+    server.log.info(
+        "Server profile: %s, %s workers x %s threads, max_requests=%s (+%s), preload=%s",
+        worker_class,
+        workers,
+        threads,
+        max_requests,
+        max_requests_jitter,
+        preload_app,
+    )
@@ -23,6 +23,8 @@ import TaskTemplateFetcher from './components/fetchers/TaskTemplateFetcher'
 import InvoiceFetcher from './components/fetchers/InvoiceFetcher'
 import ReportFetcher from './components/fetchers/ReportFetcher'
 import UserFetcher from './components/fetchers/UserFetcher'
+import DashboardFetcher from './components/fetchers/DashboardFetcher'
+import LiveUpdatesFetcher from './components/fetchers/LiveUpdatesFetcher'
 // Contexts
 import { AuthProvider, useAuth } from './contexts/AuthContext'
 import { GlobalProvider, useGlobalContext } from './contexts/GlobalContext'
@@ -58,6 +60,8 @@ const Main = () => {
           <OwnerFetcher />
           <InventoryFetcher />
           <TaskTemplateFetcher />
+          <DashboardFetcher />
+          <LiveUpdatesFetcher />
           <div className="container">
             <div className="left-menu">
               <Sidebar />
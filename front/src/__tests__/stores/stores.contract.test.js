@@ -6,6 +6,7 @@ vi.mock('../../utils/axiosInstance')
 import axiosInstance from '../../utils/axiosInstance'
 import useOwnerStore from '../../stores/useOwnerStore'
 import useInventoryStore from '../../stores/useInventoryStore'
+import useDashboardStore from '../../stores/useDashboardStore'
 
 describe('useOwnerStore', () => {
   beforeEach(() => {
@@ -54,6 +55,7 @@ describe('useInventoryStore', () => {
       pagination: null,
       loading: false,
       error: null,
+      query: null,
     })
   })
 
@@ -92,4 +94,49 @@ describe('useInventoryStore', () => {
 
     expect(axiosInstance.get).toHaveBeenCalledWith('/inventory/?name=Oil')
   })
+
+  it('refetches the query of the last fetch', async () => {
+    axiosInstance.get.mockResolvedValue({ data: [] })
+
+    await act(async () => {
+      await useInventoryStore.getState().fetchInventory({ name: 'Oil', limit: 10 })
+      await useInventoryStore.getState().refetch()
+    })
+
+    expect(axiosInstance.get).toHaveBeenCalledTimes(2)
+    expect(axiosInstance.get).toHaveBeenLastCalledWith('/inventory/?name=Oil&limit=10')
+  })
+
+  it('does not refetch a list that was never fetched', async () => {
+    await act(async () => {
+      await useInventoryStore.getState().refetch()
+    })
+
+    expect(axiosInstance.get).not.toHaveBeenCalled()
+  })
+})
+
+describe('useDashboardStore', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+    useDashboardStore.setState({ loading: false, error: null })
+  })
+
+  it('stores the summary from the single dashboard request', async () => {
+    const summary = {
+      reports_by_status: { pending: 2 },
+      revenue: [{ period: '2025-03', invoices: 1, gross_total: 120 }],
+      low_stock: [{ id: 1, name: 'Oil' }],
+      top_task_templates: [],
+    }
+    axiosInstance.get.mockResolvedValue({ data: summary })
+
+    await act(async () => {
+      await useDashboardStore.getState().fetchSummary()
+    })
+
+    expect(axiosInstance.get).toHaveBeenCalledWith('/dashboard/summary/')
+    expect(useDashboardStore.getState().summary).toEqual(summary)
+    expect(useDashboardStore.getState().loading).toBe(false)
+  })
 })
@@ -7,7 +7,7 @@ vi.mock('../../utils/authUtils', () => ({
   logout: vi.fn(),
 }))
 
-import axiosInstance, { setAxiosToken } from '../../utils/axiosInstance'
+import axiosInstance, { forgetRememberedResponses, setAxiosToken } from '../../utils/axiosInstance'
 import { refreshToken, logout } from '../../utils/authUtils'
 
 /**
@@ -129,3 +129,62 @@ describe('axiosInstance', () => {
     expect(logout).toHaveBeenCalledTimes(0)
   })
 })
+
+describe('conditional GETs', () => {
+  const ifNoneMatch = (config) =>
+    typeof config.headers?.get === 'function'
+      ? config.headers.get('If-None-Match')
+      : config.headers?.['If-None-Match']
+
+  beforeEach(() => {
+    vi.clearAllMocks()
+    forgetRememberedResponses()
+  })
+
+  it('revalidates a tagged response and reuses its body on 304', async () => {
+    const body = [{ id: 1, name: 'Oil filter' }]
+    const seen = []
+    axiosInstance.defaults.adapter = async (config) => {
+      seen.push(config)
+      if (seen.length === 1) {
+        return { data: body, status: 200, statusText: 'OK', headers: { etag: 'W/"v1"' }, config }
+      }
+      return { data: '', status: 304, statusText: 'Not Modified', headers: {}, config }
+    }
+
+    await axiosInstance.get('/inventory/?ordering=name')
+    const response = await axiosInstance.get('/inventory/?ordering=name')
+
+    expect(ifNoneMatch(seen[0])).toBeFalsy()
+    expect(ifNoneMatch(seen[1])).toBe('W/"v1"')
+    expect(response.status).toBe(200)
+    expect(response.data).toBe(body)
+  })
+
+  it('keeps one validator per URL', async () => {
+    const seen = []
+    axiosInstance.defaults.adapter = async (config) => {
+      seen.push(config)
+      return { data: [], status: 200, statusText: 'OK', headers: { etag: 'W/"v1"' }, config }
+    }
+
+    await axiosInstance.get('/owners/?ordering=full_name')
+    await axiosInstance.get('/owners/?ordering=-full_name')
+
+    expect(ifNoneMatch(seen[1])).toBeFalsy()
+  })
+
+  it('forgets every validator on logout', async () => {
+    const seen = []
+    axiosInstance.defaults.adapter = async (config) => {
+      seen.push(config)
+      return { data: [], status: 200, statusText: 'OK', headers: { etag: 'W/"v1"' }, config }
+    }
+
+    await axiosInstance.get('/vehicles/')
+    forgetRememberedResponses()
+    await axiosInstance.get('/vehicles/')
+
+    expect(ifNoneMatch(seen[1])).toBeFalsy()
+  })
+})
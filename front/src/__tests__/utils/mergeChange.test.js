@@ -0,0 +1,33 @@
+import { describe, it, expect } from 'vitest'
+import { mergeChange } from '../../utils/mergeChange'
+
+const items = [
+  { id: 1, name: 'Oil filter' },
+  { id: 2, name: 'Air filter' },
+]
+
+describe('mergeChange', () => {
+  it('replaces an updated item in place', () => {
+    const change = { id: 2, action: 'updated', data: { id: 2, name: 'Cabin filter' } }
+    expect(mergeChange(items, change)).toEqual([items[0], { id: 2, name: 'Cabin filter' }])
+  })
+
+  it('drops a deleted item', () => {
+    expect(mergeChange(items, { id: 1, action: 'deleted', data: null })).toEqual([items[1]])
+  })
+
+  it('leaves a created item to a refetch of the current query', () => {
+    const change = { id: 3, action: 'created', data: { id: 3, name: 'Spark plug' } }
+    expect(mergeChange(items, change)).toBe(items)
+  })
+
+  it('does not append a created item twice', () => {
+    const change = { id: 2, action: 'created', data: { id: 2, name: 'Air filter' } }
+    expect(mergeChange(items, change)).toHaveLength(2)
+  })
+
+  it('ignores updates to items the list does not hold', () => {
+    const change = { id: 9, action: 'updated', data: { id: 9, name: 'Brake pad' } }
+    expect(mergeChange(items, change)).toBe(items)
+  })
+})
@@ -0,0 +1,48 @@
+// Zustand
+import useDashboardStore from '../stores/useDashboardStore'
+// Components
+import LoadingScreen from './LoadingScreen'
+// Utils
+import { capitalizeFirstLetter } from '../utils/stringUtils'
+
+const DashboardSummary = () => {
+  const { summary, loading } = useDashboardStore()
+  const thisMonth = summary.revenue[summary.revenue.length - 1]
+
+  if (loading && !thisMonth) return <LoadingScreen fullscreen={false} />
+
+  return (
+    <div className="dashboard-summary">
+      <div className="summary-block">
+        <h3>Reports</h3>
+        <ul>
+          {Object.entries(summary.reports_by_status).map(([status, count]) => (
+            <li key={status}>
+              {capitalizeFirstLetter(status.replace('_', ' '))}: {count}
+            </li>
+          ))}
+        </ul>
+      </div>
+      <div className="summary-block">
+        <h3>This month</h3>
+        {thisMonth && (
+          <ul>
+            <li>Invoices: {thisMonth.invoices}</li>
+            <li>Revenue: {Number(thisMonth.gross_total).toFixed(2)} CHF</li>
+          </ul>
+        )}
+      </div>
+      <div className="summary-block">
+        <h3>Top tasks</h3>
+        <ul>
+          {summary.top_task_templates.map((template) => (
+            <li key={template.id}>
+              {template.name}: {template.uses}
+            </li>
+          ))}
+        </ul>
+      </div>
+    </div>
+  )
+}
+export default DashboardSummary
@@ -0,0 +1,24 @@
+import { useEffect } from 'react'
+import { useLocation } from 'react-router-dom'
+// Zustand stores
+import useDashboardStore from '../../stores/useDashboardStore'
+import useInventoryStore from '../../stores/useInventoryStore'
+import useReportStore from '../../stores/useReportStore'
+
+const DashboardFetcher = () => {
+  const location = useLocation()
+  const { fetchSummary } = useDashboardStore()
+  const { inventory } = useInventoryStore()
+  const { reports } = useReportStore()
+
+  // Refetch when a card on the dashboard edits or deletes an item
+  useEffect(() => {
+    if (location.pathname === '/dashboard') {
+      fetchSummary()
+    }
+  }, [location.pathname, inventory, reports, fetchSummary])
+
+  return null
+}
+
+export default DashboardFetcher
@@ -5,10 +5,10 @@ import useInventoryStore from '../../stores/useInventoryStore'
 
 const InventoryFetcher = () => {
   const location = useLocation()
-  const { inventory, fetchInventory } = useInventoryStore()
+  const { fetchInventory } = useInventoryStore()
 
   useEffect(() => {
-    const paths = ['/inventory', '/tasktemplate', '/dashboard', '/report']
+    const paths = ['/inventory', '/tasktemplate', '/report']
     if (paths.includes(location.pathname)) {
       let filters = {}
       let ordering = 'name'
@@ -17,7 +17,7 @@ const InventoryFetcher = () => {
 
       fetchInventory({ ...filters, ordering, limit, offset })
     }
-  }, [location.pathname, inventory.length, fetchInventory])
+  }, [location.pathname, fetchInventory])
 
   return null
 }
@@ -5,7 +5,7 @@ import useInvoiceStore from '../../stores/useInvoiceStore'
 
 const InvoiceFetcher = () => {
   const location = useLocation()
-  const { invoices, fetchInvoices } = useInvoiceStore()
+  const { fetchInvoices } = useInvoiceStore()
 
   useEffect(() => {
     const paths = ['/invoices', '/dashboard']
@@ -25,7 +25,7 @@ const InvoiceFetcher = () => {
 
       fetchInvoices({ ...filters, ordering, limit, offset })
     }
-  }, [location.pathname, invoices.length, fetchInvoices])
+  }, [location.pathname, fetchInvoices])
 
   return null
 }
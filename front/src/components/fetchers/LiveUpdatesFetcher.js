@@ -0,0 +1,98 @@
+import { useEffect } from 'react'
+// Zustand stores
+import useReportStore from '../../stores/useReportStore'
+import useInventoryStore from '../../stores/useInventoryStore'
+import useInvoiceStore from '../../stores/useInvoiceStore'
+// Utils
+import axiosInstance, { API_BASE_URL } from '../../utils/axiosInstance'
+import { mergeChange } from '../../utils/mergeChange'
+
+const RECONNECT_DELAY = 5000
+// A burst of creations (a bulk import, several terminals) refetches once
+const REFETCH_DELAY = 500
+
+// The store and list each kind of change lands in
+const TARGETS = {
+  report: [useReportStore, 'reports'],
+  inventory: [useInventoryStore, 'inventory'],
+  invoice: [useInvoiceStore, 'invoices'],
+}
+
+const LiveUpdatesFetcher = () => {
+  useEffect(() => {
+    let source = null
+    let cursor = null
+    let retry = null
+    let closed = false
+    const refetches = new Map()
+
+    const reload = () => {
+      Object.values(TARGETS).forEach(([store]) => store.getState().refetch())
+    }
+
+    // Only the server knows whether a new item falls in the filters, order and
+    // page a list was fetched with, so a creation refetches that query.
+    const refetchSoon = (store) => {
+      if (refetches.has(store)) return
+      refetches.set(
+        store,
+        setTimeout(() => {
+          refetches.delete(store)
+          store.getState().refetch()
+        }, REFETCH_DELAY),
+      )
+    }
+
+    // EventSource cannot send the access token as a header, and the stream's
+    // URL ends up in access logs, so it is opened with a single-use ticket.
+    // The ticket is asked for through axios, which refreshes an expired token.
+    const connect = async () => {
+      if (!localStorage.getItem('token')) return
+      let ticket
+      try {
+        ticket = (await axiosInstance.post('/events/ticket/')).data.ticket
+      } catch {
+        if (!closed) retry = setTimeout(connect, RECONNECT_DELAY)
+        return
+      }
+      if (closed) return
+
+      const params = new URLSearchParams({ ticket })
+      if (cursor) params.append('since', cursor)
+      source = new EventSource(`${API_BASE_URL}/events/?${params}`)
+
+      source.addEventListener('change', (event) => {
+        cursor = event.lastEventId || cursor
+        const change = JSON.parse(event.data)
+        const target = TARGETS[change.type]
+        if (!target) return
+        const [store, key] = target
+        store.setState((state) => ({ [key]: mergeChange(state[key], change) }))
+        if (change.action === 'created') refetchSoon(store)
+      })
+      source.addEventListener('reload', (event) => {
+        cursor = event.lastEventId || null
+        reload()
+      })
+      // The stream ends when the token expires or the server restarts: start
+      // again from the last cursor, with a fresh ticket.
+      source.onerror = () => {
+        source.close()
+        if (!closed) retry = setTimeout(connect, RECONNECT_DELAY)
+      }
+    }
+
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(retry)
+      refetches.forEach(clearTimeout)
+      if (source) source.close()
+    }
+  }, [])
+
+  return null
+}
+
+export default LiveUpdatesFetcher
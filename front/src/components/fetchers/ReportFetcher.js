@@ -10,7 +10,7 @@ import { getReportFilters } from '../../utils/getReportFilters'
 const ReportFetcher = () => {
   const location = useLocation()
   const { modalState } = useGlobalContext()
-  const { reports, fetchReports } = useReportStore()
+  const { fetchReports } = useReportStore()
 
   // Fetch reports when the pathname changes
   useEffect(() => {
@@ -19,7 +19,7 @@ const ReportFetcher = () => {
       const { filters, ordering, limit, offset } = getReportFilters(location.pathname)
       fetchReports({ ...filters, ordering, limit, offset })
     }
-  }, [location.pathname, reports.length, fetchReports])
+  }, [location.pathname, fetchReports])
 
   // Automatically fetch the report (and related tasks and parts) when the selectedItem changes
   useEffect(() => {
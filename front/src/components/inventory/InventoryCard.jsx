@@ -23,10 +23,6 @@ const InventoryCard = ({ item }) => {
     'Vehicle deleted successfully!',
   )
 
-  const isLowerThan10 = (item) => {
-    if (item.quantity_in_stock < 10) return true
-    return false
-  }
 
   // Open viewing modal
   const handleCardClick = (e) => {
@@ -47,7 +43,7 @@ const InventoryCard = ({ item }) => {
   return (
     <div
       key={item.id}
-      className={isLowerThan10(item) ? 'card low-inventory' : 'card'}
+      className={item.low_stock ? 'card low-inventory' : 'card'}
       title="View inventory part"
       onClick={handleCardClick}
     >
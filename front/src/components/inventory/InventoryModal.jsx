@@ -39,6 +39,7 @@ const InventoryModal = () => {
     reference_code: modalState.selectedItem?.reference_code || '',
     category: modalState.selectedItem?.category || '',
     quantity_in_stock: modalState.selectedItem?.quantity_in_stock || '',
+    reorder_level: modalState.selectedItem?.reorder_level ?? '0.00',
     unit_price: modalState.selectedItem?.unit_price || '',
   }
 
@@ -182,6 +183,22 @@ const InventoryModal = () => {
               />
             </FormField>
 
+            <FormField
+              label="Reorder level"
+              error={touched.reorder_level && errors.reorder_level}
+            >
+              <input
+                className={touched.reorder_level && errors.reorder_level ? 'invalid' : 'valid'}
+                type="text"
+                name="reorder_level"
+                value={data.reorder_level}
+                onChange={handleChange}
+                onBlur={handleBlur}
+                placeholder="Reorder at or below this quantity"
+                disabled={modalState.readonly}
+              />
+            </FormField>
+
             <FormField label="Unit price" error={touched.unit_price && errors.unit_price}>
               <input
                 className={touched.unit_price && errors.unit_price ? 'invalid' : 'valid'}
@@ -1,18 +1,17 @@
 // Zustand
-import useInventoryStore from '../../stores/useInventoryStore'
+import useDashboardStore from '../../stores/useDashboardStore'
 // Components
 import InventoryCard from './InventoryCard'
 import LoadingScreen from '../LoadingScreen'
 
 const LowestInventory = () => {
-  const { inventory, loading } = useInventoryStore()
-  const lowStockInventory = [...inventory]
-    .sort((a, b) => a.quantity_in_stock - b.quantity_in_stock)
-    .slice(0, 5)
+  const { summary, loading } = useDashboardStore()
+  // At or below their reorder level, lowest stock first, as sorted by the API
+  const lowStockInventory = summary.low_stock
 
   return (
     <>
-      <h3>Lowest Inventory parts</h3>
+      <h3>Parts to reorder</h3>
       {/* latest reports list with card display */}
       <div className="list">
         {loading ? (
@@ -20,7 +19,7 @@ const LowestInventory = () => {
         ) : lowStockInventory.length > 0 ? (
           lowStockInventory.map((item) => <InventoryCard key={item.id} item={item} />)
         ) : (
-          <p>No parts found.</p>
+          <p>No parts at or below their reorder level.</p>
         )}
       </div>
     </>
@@ -6,6 +6,7 @@ const initialErrors = {
   reference_code: '',
   category: '',
   quantity_in_stock: '',
+  reorder_level: '',
   unit_price: '',
 }
 
@@ -73,6 +74,18 @@ export const useInventoryForm = (initialData, inventory, selectedItem) => {
     )
   }, [data.quantity_in_stock])
 
+  useEffect(() => {
+    const reorderLevelError =
+      data.reorder_level.toString().trim() === ''
+        ? 'This field is required.'
+        : isValidQuantityInStock(data.reorder_level.toString())
+    setErrors((prevErrors) =>
+      prevErrors.reorder_level !== reorderLevelError
+        ? { ...prevErrors, reorder_level: reorderLevelError }
+        : prevErrors,
+    )
+  }, [data.reorder_level])
+
   useEffect(() => {
     const priceError =
       data.unit_price.toString().trim() === ''
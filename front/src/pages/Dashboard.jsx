@@ -1,6 +1,7 @@
 import React from 'react'
 
 // Components
+import DashboardSummary from '../components/DashboardSummary'
 import LatestReports from '../components/reports/LatestReports'
 import LowestInventory from '../components/inventory/LowestInventory'
 import LatestInvoices from '../components/invoices/LatestInvoices'
@@ -20,6 +21,7 @@ const Dashboard = () => {
       <div className="dashboard-header">
         Dashboard - You are logged in as {capitalizeFirstLetter(authenticatedUser.username)}
       </div>
+      <DashboardSummary />
       <div className="dashboard">
         <section className="lowest-inventory">
           <LowestInventory />
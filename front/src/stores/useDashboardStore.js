@@ -0,0 +1,28 @@
+import { create } from 'zustand'
+import axiosInstance from '../utils/axiosInstance'
+
+const DASHBOARD_API_URL = '/dashboard/summary/'
+
+// The dashboard's numbers, precomputed by the API in one small response
+const useDashboardStore = create((set) => ({
+  summary: {
+    reports_by_status: {},
+    revenue: [],
+    low_stock: [],
+    top_task_templates: [],
+  },
+  loading: false,
+  error: null,
+
+  fetchSummary: async () => {
+    set({ loading: true })
+    try {
+      const response = await axiosInstance.get(DASHBOARD_API_URL)
+      set({ summary: response.data, loading: false })
+    } catch (error) {
+      set({ error: error.message, loading: false })
+    }
+  },
+}))
+
+export default useDashboardStore
@@ -3,14 +3,16 @@ import axiosInstance from '../utils/axiosInstance'
 
 const INVENTORY_API_URL = '/inventory/'
 
-const useInventoryStore = create((set) => ({
+const useInventoryStore = create((set, get) => ({
   inventory: [],
   pagination: null,
   loading: false,
   error: null,
+  // The params of the last fetch, which `refetch` repeats (null: none yet)
+  query: null,
 
   fetchInventory: async (params = {}) => {
-    set({ loading: true })
+    set({ loading: true, query: params })
     try {
       const cleanParams = Object.fromEntries(Object.entries(params).filter(([_, v]) => v != null))
       const queryParams = new URLSearchParams(cleanParams)
@@ -34,6 +36,8 @@ const useInventoryStore = create((set) => ({
     }
   },
 
+  refetch: () => get().query && get().fetchInventory(get().query),
+
   createInventory: async (part) => {
     try {
       const response = await axiosInstance.post(INVENTORY_API_URL, part)
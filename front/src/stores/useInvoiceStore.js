@@ -3,14 +3,16 @@ import axiosInstance from '../utils/axiosInstance'
 
 const INVOICE_API_URL = '/invoices/'
 
-const useInvoiceStore = create((set) => ({
+const useInvoiceStore = create((set, get) => ({
   invoices: [],
   pagination: null,
   loading: false,
   error: null,
+  // The params of the last fetch, which `refetch` repeats (null: none yet)
+  query: null,
 
   fetchInvoices: async (params = {}) => {
-    set({ loading: true })
+    set({ loading: true, query: params })
     try {
       const cleanParams = Object.fromEntries(Object.entries(params).filter(([_, v]) => v != null))
       const queryParams = new URLSearchParams(cleanParams)
@@ -34,6 +36,8 @@ const useInvoiceStore = create((set) => ({
     }
   },
 
+  refetch: () => get().query && get().fetchInvoices(get().query),
+
   createInvoice: async (invoice) => {
     try {
       const response = await axiosInstance.post(INVOICE_API_URL, invoice)
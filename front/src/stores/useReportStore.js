@@ -3,14 +3,16 @@ import axiosInstance from '../utils/axiosInstance'
 
 const REPORT_API_URL = '/reports/'
 
-const useReportStore = create((set) => ({
+const useReportStore = create((set, get) => ({
   reports: [],
   pagination: null,
   loading: false,
   error: null,
+  // The params of the last fetch, which `refetch` repeats (null: none yet)
+  query: null,
 
   fetchReports: async (params = {}) => {
-    set({ loading: true })
+    set({ loading: true, query: params })
     try {
       const cleanParams = Object.fromEntries(Object.entries(params).filter(([_, v]) => v != null))
       const queryParams = new URLSearchParams(cleanParams)
@@ -34,6 +36,8 @@ const useReportStore = create((set) => ({
     }
   },
 
+  refetch: () => get().query && get().fetchReports(get().query),
+
   createReport: async (report) => {
     try {
       const response = await axiosInstance.post(`${REPORT_API_URL}`, report)
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import { API_BASE_URL, setAxiosToken } from './axiosInstance'
+import { API_BASE_URL, forgetRememberedResponses, setAxiosToken } from './axiosInstance'
 
 export const refreshToken = async () => {
   const refreshToken = localStorage.getItem('refreshToken')
@@ -27,4 +27,5 @@ export const refreshToken = async () => {
 export const logout = () => {
   localStorage.removeItem('token')
   localStorage.removeItem('refreshToken')
+  forgetRememberedResponses()
 }
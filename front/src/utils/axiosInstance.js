@@ -9,6 +9,40 @@ export const API_BASE_URL = import.meta.env.VITE_API_URL
 
 const axiosInstance = axios.create({
   baseURL: API_BASE_URL,
+  // 304 is how the API answers a GET whose If-None-Match still matches
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+})
+
+/**
+ * Conditional GETs. The API tags list and detail responses with an ETag, so
+ * the last body seen for each URL is kept here and a repeat GET of that URL
+ * sends If-None-Match. On 304 Not Modified the kept body is handed back as a
+ * normal 200: the stores receive the very same objects, and components
+ * selecting them do not re-render.
+ */
+const MAX_REMEMBERED_URLS = 50
+const remembered = new Map()
+
+const readHeader = (headers, name) =>
+  typeof headers?.get === 'function' ? headers.get(name) : headers?.[name.toLowerCase()]
+
+const remember = (url, etag, data) => {
+  remembered.delete(url)
+  remembered.set(url, { etag, data })
+  if (remembered.size > MAX_REMEMBERED_URLS) {
+    remembered.delete(remembered.keys().next().value)
+  }
+}
+
+export const forgetRememberedResponses = () => remembered.clear()
+
+axiosInstance.interceptors.request.use((config) => {
+  const seen = config.method === 'get' ? remembered.get(axiosInstance.getUri(config)) : null
+  if (seen) {
+    config._revalidating = seen
+    config.headers = { ...(config.headers || {}), 'If-None-Match': seen.etag }
+  }
+  return config
 })
 
 // Set the token dynamically (after login, or after a refresh).
@@ -17,7 +51,17 @@ export const setAxiosToken = (token) => {
 }
 
 axiosInstance.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const { config } = response
+    if (response.status === 304 && config._revalidating) {
+      return { ...response, status: 200, data: config._revalidating.data }
+    }
+    const etag = readHeader(response.headers, 'ETag')
+    if (config.method === 'get' && etag) {
+      remember(axiosInstance.getUri(config), etag, response.data)
+    }
+    return response
+  },
   async (error) => {
     const { response, config } = error
 
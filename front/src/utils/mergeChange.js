@@ -0,0 +1,14 @@
+/**
+ * Applies one change pushed by `/api/events/` to a list held in a store.
+ * Updates replace the item in place and deletions drop it. A creation, or an
+ * update for an item the list does not hold, is ignored: whether it belongs
+ * depends on the filters, ordering and page the list was fetched with, so the
+ * caller refetches that query instead (the store's `refetch`).
+ */
+export const mergeChange = (items, { id, action, data }) => {
+  if (action === 'deleted') return items.filter((item) => item.id !== id)
+  if (items.some((item) => item.id === id)) {
+    return items.map((item) => (item.id === id ? data : item))
+  }
+  return items
+}
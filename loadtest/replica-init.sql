@@ -0,0 +1,10 @@
+-- Run once by the mysql-replica container's entrypoint, on its first start:
+-- follow the primary from its first transaction. Root is the replication user
+-- because nothing here outlives the stack.
+CHANGE REPLICATION SOURCE TO
+  SOURCE_HOST = 'mysql',
+  SOURCE_USER = 'root',
+  SOURCE_PASSWORD = 'loadtest',
+  SOURCE_AUTO_POSITION = 1,
+  GET_SOURCE_PUBLIC_KEY = 1;
+START REPLICA;
@@ -0,0 +1,34 @@
+#!/bin/bash
+# Runs the request mix against each server profile in turn, on a fresh stand-in
+# stack each time, and prints the harness's table for each. A profile is a
+# space-separated list of environment assignments for loadtest/docker-compose.yml:
+#
+#   loadtest/run_profiles.sh "GUNICORN_WORKERS=3" "GUNICORN_THREADS=4" "SERVER_MODE=asgi"
+#
+# With no arguments, compares the default profile with a few alternatives.
+set -euo pipefail
+
+compose=(docker compose -f "$(dirname "$0")/docker-compose.yml")
+profiles=("$@")
+if [ ${#profiles[@]} -eq 0 ]; then
+  profiles=(
+    ""
+    "GUNICORN_WORKERS=3"
+    "GUNICORN_THREADS=4"
+    "GUNICORN_THREADS=4 GUNICORN_MAX_REQUESTS=1000 GUNICORN_PRELOAD=true"
+    "SERVER_MODE=asgi"
+    "DB_CONN_MAX_AGE=0"
+    "DB_CONN_MAX_AGE=0 DB_POOL_SIZE=4"
+    "DB_REPLICA_HOST=mysql-replica RESPONSE_CACHE_BACKEND=db"
+  )
+fi
+
+"${compose[@]}" build --quiet
+for profile in "${profiles[@]}"; do
+  echo "=== Profile: ${profile:-defaults}"
+  "${compose[@]}" down --volumes --remove-orphans >/dev/null 2>&1
+  # shellcheck disable=SC2086  # the profile is deliberately word-split
+  env $profile "${compose[@]}" run --rm loadgen
+  "${compose[@]}" logs backend | grep "Server profile" || true
+done
+"${compose[@]}" down --volumes --remove-orphans >/dev/null 2>&1